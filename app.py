@@ -1,19 +1,20 @@
 import streamlit as st
 import time
 from datetime import date,timedelta
-import pandas as pd
 import os
 from PIL import Image
 import uuid
-from utils.parse_docsuments import parser
 from utils.hiring_agent import HiringAgent
 from utils.get_JDs import get_jd_options
-import asyncio
+from utils.llm_client import run_sync, submit, iter_sync
+from utils.session_state import check_resume_token, get_session_store, issue_resume_token
+from utils.jd_store import get_jd_store
+from utils.ingestion import get_ingestion_pipeline
+from utils.candidate_store import get_candidate_store
 
 JDs = get_jd_options()
 jd_position_options = list(JDs.keys()) if JDs else ["No JD files found"]
 
-parser=parser()
 resume_details={}
 add_data={}
 candidate_data={}
@@ -31,28 +32,85 @@ if "form_submitted" not in st.session_state:
     st.session_state.form_submitted = False
 if "active_tab" not in st.session_state:
     st.session_state.active_tab = 0
-if "jd_content_dict" not in st.session_state:
-    st.session_state.jd_content_dict = {}
 if "resume_details" not in st.session_state:
     st.session_state.resume_details={}
 
 # Function to parse and store JD content
 def parse_and_store_jd_content():
-    """Parse JD files and store their content in session state"""
-    if JDs and st.session_state.jd_content_dict == {}: 
-        for jd_position, jd_file_path in JDs.items():
-            if jd_file_path and os.path.exists(jd_file_path):
-                try:
-                    jd_content = parser.extract_text(doc_path=jd_file_path)
-                    st.session_state.jd_content_dict[jd_position] = jd_content
-                except Exception as e:
-                    print(f"Error parsing JD file {jd_file_path}: {str(e)}")
-                    st.session_state.jd_content_dict[jd_position] = f"Error parsing JD: {str(e)}"
-            else:
-                st.session_state.jd_content_dict[jd_position] = "JD file not found or path is empty"
+    """Share the process-wide JD store with this session; each file is parsed once and shared by all sessions
+
+    ``get_jd_options`` already registered the JD folder's files with the store.
+    """
+    if "jd_content_dict" not in st.session_state:
+        st.session_state.jd_content_dict = get_jd_store().view()
 
 parse_and_store_jd_content()
 
+def restore_session():
+    """Resume a stored interview when the URL carries ?session=<id>&token=<secret> and this browser session has no agent yet"""
+    session_id = st.query_params.get("session")
+    if not session_id or "agent" in st.session_state:
+        return
+    try:
+        state = get_session_store().get(session_id)
+        if state is None:
+            return
+        if not check_resume_token(state, st.query_params.get("token")):
+            print(f"[WARNING] Refused to resume session {session_id}: missing or invalid token")
+            st.query_params.clear()
+            return
+        agent = HiringAgent.from_state(state, st.session_state.jd_content_dict)
+    except Exception as e:
+        print(f"[ERROR] Failed to restore session {session_id}: {e}")
+        return
+    st.session_state.session_id = session_id
+    st.session_state.agent = agent
+    st.session_state.resume_token_hash = state.resume_token_hash
+    st.session_state.form_submitted = True
+    st.session_state.interaction_count = state.interaction_count
+    if state.chat_messages:
+        st.session_state.chat_messages = state.chat_messages
+    if state.session_start_time:
+        st.session_state.session_start_time = state.session_start_time
+    if not agent.questions_generated:
+        st.session_state.agent_init = submit(agent.init_func())
+    # A link works for one resume only: whoever resumes gets a fresh token
+    issue_session_link()
+    save_session()
+    print(f"[SESSION] Restored session {session_id} in phase {agent.interview_phase}")
+
+def issue_session_link():
+    """Put the session id and a new secret resume token in the URL; only the token's hash is stored"""
+    token, st.session_state.resume_token_hash = issue_resume_token()
+    st.query_params["session"] = st.session_state.session_id
+    st.query_params["token"] = token
+
+def save_session():
+    """Write the compact interview state to the session store so any replica can resume it"""
+    agent = st.session_state.get("agent")
+    if agent is None:
+        return
+    try:
+        state = agent.to_state(
+            chat_messages=st.session_state.get("chat_messages", []),
+            interaction_count=st.session_state.get("interaction_count", 0),
+            session_start_time=st.session_state.get("session_start_time"),
+        )
+        state.resume_token_hash = st.session_state.get("resume_token_hash")
+        get_session_store().put(state)
+    except Exception as e:
+        print(f"[ERROR] Failed to save session {agent.session_id}: {e}")
+
+def log_turn(role: str, content):
+    """Append a chat message to the interview log; this only queues it, the write happens in the background"""
+    agent = st.session_state.get("agent")
+    if agent is None:
+        return
+    turn = len(st.session_state.get("chat_messages", []))
+    agent.log_event("turn", {"role": role, "content": str(content)}, turn=turn)
+
+restore_session()
+
 col1, col2 = st.columns([1, 4])
 with col1:
     if os.path.exists("assets/logo.png"):
@@ -72,18 +130,28 @@ with col2:
 tab1, tab2 = st.tabs(["📝 Candidate Form", "🤖 AI Chat"])
 
 # Functions
+def start_agent(agent=None, agent_init=None):
+    """Create the HiringAgent (or adopt one pre-warmed by the ingestion pipeline) and kick off question generation and resume summary in the background"""
+    if agent is None:
+        agent = HiringAgent(
+            candidate_details=st.session_state.get("candidate_data", {}),
+            resume_details=st.session_state.get("resume_details", {}),
+            add_details=st.session_state.get("add_data", {}),
+            jd_details=st.session_state.get("jd_content_dict", {}),
+            session_id=st.session_state.session_id
+        )
+        agent_init = submit(agent.init_func())
+    st.session_state.agent = agent
+    st.session_state.agent_init = agent_init
+    # The agent holds the resume text until its questions exist; no second copy per session
+    st.session_state.resume_details = {}
+    # Make the session resumable from its URL
+    issue_session_link()
+    save_session()
+    return agent
+
 def is_duplicate(first_name, last_name, email, phone):
-    if os.path.exists("submissions/candidates.csv"):
-        existing_df = pd.read_csv("submissions/candidates.csv")
-        if len(existing_df) > 0:
-            match = existing_df[
-                (existing_df["first_name"].str.lower() == first_name.lower()) &
-                (existing_df["last_name"].str.lower() == last_name.lower()) &
-                (existing_df["email"].str.lower() == email.lower()) &
-                (existing_df["phone"] == phone)
-            ]
-            return not match.empty
-    return False
+    return get_candidate_store().is_duplicate(first_name, last_name, email, phone)
 
 def switch_to_chat_tab():
     """Switch to AI Chat tab and disable form"""
@@ -96,29 +164,28 @@ with tab1:
     
     if form_disabled:
         st.info("✅ Form has been submitted successfully! Please use the AI Chat tab for further interactions.")
+        if st.session_state.pop("show_balloons", False):
+            st.balloons()
         st.markdown("---")
         
         
         # Show submitted data summary
-        if os.path.exists("submissions/candidates.csv"):
-            df = pd.read_csv("submissions/candidates.csv")
-            latest_submission = df[df["session_id"] == st.session_state.session_id].tail(1)
-            if not latest_submission.empty:
-                st.subheader("Submitted Candidate Details:")
-                submission = latest_submission.iloc[0]
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.write(f"**Name:** {submission['first_name']} {submission['last_name']}")
-                    st.write(f"**Email:** {submission['email']}")
-                    st.write(f"**Phone:** {submission['phone']}")
-                    st.write(f"**Position:** {submission['position_applied']}")
-                    st.write(f"**Current Location:** {submission.get('current_location', 'N/A')}")
-                with col2:
-                    st.write(f"**Current Company:** {submission.get('current_company', 'N/A')}")
-                    st.write(f"**Experience:** {submission['years_experience']} years")
-                    # st.write(f"**Hiring Stage:** {submission['hiring_stage']}")
-                    st.write(f"**Ready to Relocate:** {'Yes' if submission.get('ready_to_relocate', False) else 'No'}")
-                    st.write(f"**Submission Date:** {submission['submission_date']}")
+        submission = get_candidate_store().get_by_session(st.session_state.session_id)
+        if submission:
+            st.subheader("Submitted Candidate Details:")
+            col1, col2 = st.columns(2)
+            with col1:
+                st.write(f"**Name:** {submission['first_name']} {submission['last_name']}")
+                st.write(f"**Email:** {submission['email']}")
+                st.write(f"**Phone:** {submission['phone']}")
+                st.write(f"**Position:** {submission['position_applied']}")
+                st.write(f"**Current Location:** {submission.get('current_location', 'N/A')}")
+            with col2:
+                st.write(f"**Current Company:** {submission.get('current_company', 'N/A')}")
+                st.write(f"**Experience:** {submission['years_experience']} years")
+                # st.write(f"**Hiring Stage:** {submission['hiring_stage']}")
+                st.write(f"**Ready to Relocate:** {'Yes' if submission.get('ready_to_relocate', False) else 'No'}")
+                st.write(f"**Submission Date:** {submission['submission_date']}")
         
         # Button to reset form (for new submission)
         # if st.button("🔄 Start New Submission", type="secondary"):
@@ -247,21 +314,22 @@ with tab1:
                 print(f"\ncandidate_details: {candidate_data}\n")
                 print(f"Available JD positions: {list(JDs.keys())}\n")
                 print(f"Selected JD file: {JDs.get(position_applied, 'Not found')}\n")
-                print(f"JD Content Dictionary: {st.session_state.jd_content_dict}\n")
-                
-                # Save resume with session ID
-                if uploaded_file:
-                    os.makedirs("submissions/resumes", exist_ok=True)
-                    resume_path = f"submissions/resumes/{first_name}_{last_name}_{st.session_state.session_id}_resume.{uploaded_file.name.split('.')[-1]}"
-                    with open(resume_path, "wb") as f:
-                        f.write(uploaded_file.getbuffer())
-                    resume_details_ = parser.extract_text(doc_path=resume_path)
-                    print(f"\nparsed_resume_data: \n {resume_details_}")
-                    candidate_data["resume_path"] = resume_path
+                jd_document = st.session_state.jd_content_dict.document(position_applied)
+                print(f"JD id: {jd_document.jd_id if jd_document else 'Not found'}\n")
                 
+                # Saving, parsing, recording and interview preparation run on the ingestion workers;
+                # the chat tab polls the job, so the submit returns right away
+                job = get_ingestion_pipeline().submit(
+                    candidate_data=candidate_data,
+                    resume_bytes=bytes(uploaded_file.getbuffer()),
+                    resume_ext=uploaded_file.name.split('.')[-1],
+                    add_data=add_data,
+                    jd_details=st.session_state.jd_content_dict,
+                    job_id=st.session_state.session_id,
+                )
                 st.session_state.candidate_data = candidate_data
-                st.session_state.resume_details= {"resume_details": str(resume_details_)}
                 st.session_state.add_data = add_data
+                st.session_state.ingestion_job_id = job.job_id
 
 
                 # Save additional files with session ID
@@ -277,21 +345,11 @@ with tab1:
 
                 #     candidate_data["additional_files"] = str(additional_paths)
                 
-                # Save to CSV
-                df = pd.DataFrame([candidate_data])
-                if not os.path.exists("submissions/candidates.csv"):
-                    df.to_csv("submissions/candidates.csv", index=False)
-                else:
-                    existing_df = pd.read_csv("submissions/candidates.csv")
-                    updated_df = pd.concat([existing_df, df], ignore_index=True)
-                    updated_df.to_csv("submissions/candidates.csv", index=False)
-                
                 st.success("✅ Candidate submitted successfully!")
-                st.balloons()
-                time.sleep(2)
 
-                # Set form submitted state
+                # Set form submitted state; the balloons are shown once after the rerun
                 st.session_state.form_submitted = True
+                st.session_state.show_balloons = True
                 st.session_state.active_tab = 1  # Switch to Tab 2
                 st.session_state.show_switch_button = True  # Enable manual switch button
                 st.rerun()
@@ -342,9 +400,10 @@ with tab2:
             st.session_state.timeout_occurred = False
             st.session_state.limit_reached = False
             # Clear other session data
-            for key in ["chat_messages", "agent", "session_start_time", "elapsed_time", "elapsed_seconds"]:
+            for key in ["chat_messages", "agent", "agent_init", "session_start_time", "elapsed_time", "elapsed_seconds", "resume_token_hash"]:
                 if key in st.session_state:
                     del st.session_state[key]
+            st.query_params.clear()
             st.rerun()
         st.stop()
 
@@ -390,9 +449,10 @@ with tab2:
             st.session_state.timeout_occurred = False
             if "chat_messages" in st.session_state:
                 del st.session_state.chat_messages
-            for key in ["agent", "session_start_time", "elapsed_time", "elapsed_seconds"]:
+            for key in ["agent", "agent_init", "session_start_time", "elapsed_time", "elapsed_seconds", "resume_token_hash"]:
                 if key in st.session_state:
                     del st.session_state[key]
+            st.query_params.clear()
             st.rerun()
         st.stop()
 
@@ -404,30 +464,51 @@ with tab2:
         st.error("🚫 Chat session disabled due to reaching the interaction limit.")
         st.stop()
 
-    # Initialize agent
+    # Wait for the submission to be processed; the agent is pre-warmed by the ingestion job
+    job_id = st.session_state.get("ingestion_job_id")
+    job = get_ingestion_pipeline().get(job_id) if job_id and "agent" not in st.session_state else None
+    if job is not None and not job.finished:
+        @st.fragment(run_every=1.0)
+        def ingestion_status():
+            current = get_ingestion_pipeline().get(job_id)
+            if current is None or current.finished:
+                st.rerun()
+            st.progress(current.progress, text=f"⏳ {current.label}...")
+        ingestion_status()
+        st.stop()
+    if job is not None:
+        del st.session_state["ingestion_job_id"]
+        if job.status == "failed" and job.stage != "prewarm":
+            # Nothing usable was recorded: let the candidate submit the form again
+            st.session_state.form_submitted = False
+            st.error(f"Submission processing failed: {job.error}. Please submit the form again.")
+            st.stop()
+        st.session_state.candidate_data = job.candidate_data
+        st.session_state.resume_details = {"resume_details": str(job.resume_text)}
+        if job.agent is not None:
+            start_agent(job.agent, job.agent_init)
+
+    # Initialize agent (normally already started in the background by the ingestion job)
     if "agent" not in st.session_state:
         try:
-            agent = HiringAgent(
-                candidate_details=st.session_state.get("candidate_data", {}),
-                resume_details=st.session_state.get("resume_details", {}),
-                add_details=st.session_state.get("add_data", {}),
-                jd_details=st.session_state.get("jd_content_dict", {})
-            )
-            
-            asyncio.run(agent.init_func())
-            st.session_state.agent = agent 
-
+            start_agent()
         except Exception as e:
             st.error(f"Agent Initialization Failed: {e}")
             st.stop()
     
     agent = st.session_state.agent
 
+    agent_init = st.session_state.get("agent_init")
+    if agent_init is not None and agent_init.done() and agent_init.exception():
+        print(f"[ERROR] Background interview preparation failed: {agent_init.exception()}")
+
     # Initialize chat
     if "chat_messages" not in st.session_state:
         st.session_state.chat_messages = [
             {"role": "assistant", "content": agent.greet_candidate()}
         ]
+        log_turn("assistant", st.session_state.chat_messages[0]["content"])
+        save_session()
 
     # Display chat messages
     for msg in st.session_state.chat_messages:
@@ -445,6 +526,7 @@ with tab2:
     # Process user input
     if prompt and remaining_interactions > 0:
         st.session_state.chat_messages.append({"role": "user", "content": prompt})
+        log_turn("user", prompt)
         with st.chat_message("user"):
             st.markdown(prompt)
         
@@ -453,7 +535,7 @@ with tab2:
             chat_history = st.session_state.chat_messages
             intent = prompt.strip().lower()
 
-            response = agent.get_response(chat_history=chat_history)
+            response = run_sync(agent.get_response(chat_history=list(chat_history), stream=True))
             
             # Check for early termination
             if remaining_interactions >= 16:  # This condition seems wrong, maybe should be <= 1?
@@ -463,12 +545,18 @@ with tab2:
             response = f"⚠️ Sorry, I encountered an error: for {intent} : {e}"
 
         if response:
-            st.session_state.chat_messages.append({"role": "assistant", "content": response})
             with st.chat_message("assistant"):
-                st.markdown(response)
+                if isinstance(response, str):
+                    st.markdown(response)
+                else:
+                    # Render tokens / report sections as they arrive
+                    response = st.write_stream(iter_sync(response))
+            st.session_state.chat_messages.append({"role": "assistant", "content": response})
+            log_turn("assistant", response)
             
             # Increment interaction count
             st.session_state.interaction_count += 1
+            save_session()
             
             # Check if limit reached after increment
             if st.session_state.interaction_count >= max_interactions:
@@ -498,6 +586,12 @@ if st.session_state.form_submitted:
     st.sidebar.markdown(f"**Remaining:** {left}")
     st.sidebar.progress(used / max_interactions)
 
+    agent = st.session_state.get("agent")
+    if agent is not None:
+        st.sidebar.markdown(f"**Screening Questions:** {'✅ Ready' if agent.questions_generated else '⏳ Preparing in background'}")
+        routing = agent.router.stats()
+        st.sidebar.markdown(f"**Turns Routed:** {routing['local']} locally / {routing['llm']} via LLM")
+
     if left <= 5 and left > 0:
         st.sidebar.warning("⚠️ Chat limit almost reached!")
     elif left == 0:
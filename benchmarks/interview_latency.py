@@ -0,0 +1,286 @@
+"""
+End-to-end latency benchmark for the interview flow.
+
+Runs scripted candidate sessions through ``HiringAgent.get_response`` the way
+the Streamlit app does (one thread per session, streamed replies drained with
+``iter_sync``) against the local mock LLM server, and reports:
+
+- time to greeting: agent creation (form submit) until the greeting is ready
+- time until the screening questions are ready (background ``init_func``)
+- p50/p95/p99 per-turn latency and time to first chunk, per interview phase
+
+Usage (from the repository root):
+
+    python -m benchmarks.interview_latency --sessions 20 --concurrency 5
+    python -m benchmarks.interview_latency --error-rate 0.2 --rate-limit-rate 0.05
+
+Pass ``--primary-url`` / ``--fallback-url`` to benchmark against servers that
+are already running instead of the in-process mock servers.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.mock_llm_server import MockLLMConfig, start_mock_server
+
+
+CASUAL_ANSWERS = [
+    "I have been building backend services in Python for about four years, mostly around data ingestion.",
+    "I enjoy owning features end to end, from design reviews to monitoring them in production.",
+]
+STRUCTURED_ANSWER = (
+    "I would start by profiling to find the bottleneck, then fix the hottest path first, "
+    "add a regression test and measure again before and after the change."
+)
+POST_INTERVIEW_SCRIPT = [
+    ("analysis", "Please share the analysis of my session."),
+    ("final_report", "Can I get the final recommendation report?"),
+    ("end", "exit"),
+]
+MAX_TURNS = 25
+
+JD_TEXT = (
+    "Software Development Engineer. Design, build and operate backend services in Python. "
+    "Requirements: 2+ years of experience, REST APIs, SQL, cloud deployment, testing and code review."
+)
+RESUME_TEXT = (
+    "Jane Doe, Backend Engineer with 4 years of experience at Acme Corp. Built Python microservices "
+    "with FastAPI and PostgreSQL, led a migration to Kubernetes, and maintained CI pipelines. "
+    "B.Tech in Computer Science. Skills: Python, SQL, Docker, Kubernetes, AWS, Redis."
+)
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100.0 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(values: list) -> dict:
+    return {
+        "n": len(values),
+        "p50": round(percentile(values, 50), 3),
+        "p95": round(percentile(values, 95), 3),
+        "p99": round(percentile(values, 99), 3),
+        "max": round(max(values), 3) if values else 0.0,
+    }
+
+
+def run_turn(agent, history: list, message: str) -> dict:
+    """Send one candidate message and drain the (possibly streamed) reply"""
+    from utils.llm_client import iter_sync, run_sync
+
+    history.append({"role": "user", "content": message})
+    started = time.perf_counter()
+    response = run_sync(agent.get_response(chat_history=list(history), stream=True))
+    first_chunk = None
+    if isinstance(response, str):
+        text = response
+        first_chunk = time.perf_counter() - started
+    else:
+        parts = []
+        for part in iter_sync(response):
+            if first_chunk is None:
+                first_chunk = time.perf_counter() - started
+            parts.append(str(part))
+        text = "".join(parts)
+    total = time.perf_counter() - started
+    history.append({"role": "assistant", "content": text})
+    return {"total": total, "first_chunk": first_chunk if first_chunk is not None else total}
+
+
+def run_session(index: int, shared_inputs: bool) -> dict:
+    """One scripted candidate session: casual chat, all structured questions, analysis, report, exit"""
+    from utils.hiring_agent import HiringAgent
+    from utils.llm_client import submit
+
+    suffix = "" if shared_inputs else f" Candidate reference #{index}."
+    started = time.perf_counter()
+    agent = HiringAgent(
+        resume_details={"resume_details": RESUME_TEXT + suffix},
+        candidate_details={
+            "first_name": f"Jane{index}", "last_name": "Doe", "position_applied": "SDE",
+            "years_experience": 4, "tech_stack": "Python, SQL, Docker", "current_location": "Bangalore",
+        },
+        jd_details={"SDE": JD_TEXT},
+        session_id=f"bench-{index}",
+    )
+    init = submit(agent.init_func())
+    questions_ready = {}
+    init.add_done_callback(lambda _: questions_ready.setdefault("t", time.perf_counter() - started))
+    history = [{"role": "assistant", "content": agent.greet_candidate()}]
+    time_to_greeting = time.perf_counter() - started
+
+    turns = []
+    casual = iter(CASUAL_ANSWERS)
+    post_interview = iter(POST_INTERVIEW_SCRIPT)
+    for _ in range(MAX_TURNS):
+        phase = agent.interview_phase
+        if phase == "post_interview":
+            step = next(post_interview, None)
+            if step is None:
+                break
+            label, message = step
+        elif phase == "casual_chat":
+            label, message = "casual_chat", next(casual, None)
+            if message is None:
+                # Out of small talk: wait for the questions instead of spinning on "still preparing" replies
+                init.result()
+                message = "Ready when you are."
+        else:
+            label, message = "structured_questions", STRUCTURED_ANSWER
+        result = run_turn(agent, history, message)
+        result["phase"] = label
+        turns.append(result)
+        if label == "end":
+            break
+
+    init.result()
+    return {
+        "time_to_greeting": time_to_greeting,
+        "questions_ready": questions_ready.get("t", time.perf_counter() - started),
+        "turns": turns,
+        "session_total": time.perf_counter() - started,
+    }
+
+
+def configure_endpoints(args) -> list:
+    """Point HiringAgent at the mock servers through the environment fallback of its settings"""
+    servers = []
+    primary_url, fallback_url = args.primary_url, args.fallback_url
+    if primary_url is None:
+        server = start_mock_server(MockLLMConfig(
+            latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, chunk_delay_ms=args.chunk_delay_ms,
+            error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, seed=args.seed,
+        ))
+        servers.append(("primary", server))
+        primary_url = server.base_url
+    if fallback_url is None:
+        server = start_mock_server(MockLLMConfig(
+            latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, chunk_delay_ms=args.chunk_delay_ms,
+            error_rate=args.fallback_error_rate, seed=args.seed,
+        ))
+        servers.append(("fallback", server))
+        fallback_url = server.base_url
+
+    # st.secrets copies root-level secrets into os.environ when first loaded; load it now so
+    # a local secrets.toml cannot overwrite the endpoints set below once the sessions start
+    import streamlit as st
+    st.secrets.load_if_toml_exists()
+    os.environ.update({
+        "primary_url": primary_url,
+        "fallback_url": fallback_url,
+        # Real keys are only sent to endpoints passed on the command line
+        "GEMINI_API_KEY": os.environ.get("GEMINI_API_KEY", "mock-key") if args.primary_url else "mock-key",
+        "HYPERBOLIC": os.environ.get("HYPERBOLIC", "mock-key") if args.fallback_url else "mock-key",
+        "primary_rpm": str(args.rpm),
+        "fallback_rpm": str(args.rpm),
+        "primary_tpm": str(args.tpm),
+        "fallback_tpm": str(args.tpm),
+    })
+    return servers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Interview flow latency benchmark against a mock LLM server")
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--jitter-ms", type=float, default=100.0)
+    parser.add_argument("--chunk-delay-ms", type=float, default=15.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="5xx rate on the primary")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="429 rate on the primary")
+    parser.add_argument("--fallback-error-rate", type=float, default=0.0)
+    parser.add_argument("--rpm", type=float, default=10_000)
+    parser.add_argument("--tpm", type=float, default=50_000_000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--primary-url", default=None)
+    parser.add_argument("--fallback-url", default=None)
+    parser.add_argument("--shared-inputs", action="store_true",
+                        help="give every session the same resume so question/resume caches are hit")
+    parser.add_argument("--json", dest="json_path", default=None, help="also write the results to this file")
+    parser.add_argument("--verbose", action="store_true", help="keep the agent's debug output")
+    args = parser.parse_args()
+
+    json_path = os.path.abspath(args.json_path) if args.json_path else None
+    servers = configure_endpoints(args)
+    # Question files, caches and memos are written relative to the working directory
+    workdir = tempfile.mkdtemp(prefix="interview_bench_")
+    os.chdir(workdir)
+
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    failures = []
+    failures_lock = threading.Lock()
+
+    def guarded(index):
+        try:
+            return run_session(index, args.shared_inputs)
+        except Exception as e:
+            with failures_lock:
+                failures.append(f"session {index}: {e!r}")
+            return None
+
+    started = time.perf_counter()
+    with output, ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        sessions = [s for s in pool.map(guarded, range(args.sessions)) if s is not None]
+    wall = time.perf_counter() - started
+
+    phases = {}
+    for session in sessions:
+        for turn in session["turns"]:
+            phases.setdefault(turn["phase"], []).append(turn)
+    all_turns = [turn for session in sessions for turn in session["turns"]]
+
+    from utils.llm_provider import _routers
+    results = {
+        "sessions": len(sessions),
+        "failed_sessions": failures,
+        "wall_time_s": round(wall, 3),
+        "time_to_greeting": summarize([s["time_to_greeting"] for s in sessions]),
+        "questions_ready": summarize([s["questions_ready"] for s in sessions]),
+        "session_total": summarize([s["session_total"] for s in sessions]),
+        "turn_latency": summarize([t["total"] for t in all_turns]),
+        "time_to_first_chunk": summarize([t["first_chunk"] for t in all_turns]),
+        "per_phase": {
+            phase: {
+                "latency": summarize([t["total"] for t in turns]),
+                "time_to_first_chunk": summarize([t["first_chunk"] for t in turns]),
+            }
+            for phase, turns in phases.items()
+        },
+        "providers": [router.stats() for router in _routers.values()],
+        "mock_servers": {name: server.stats.snapshot() for name, server in servers},
+    }
+
+    print(f"Sessions: {len(sessions)}/{args.sessions} in {wall:.1f}s (concurrency {args.concurrency}), workdir {workdir}")
+    for name in ("time_to_greeting", "questions_ready", "turn_latency", "time_to_first_chunk", "session_total"):
+        s = results[name]
+        print(f"{name:<22} n={s['n']:<4} p50={s['p50']:.3f}s p95={s['p95']:.3f}s p99={s['p99']:.3f}s max={s['max']:.3f}s")
+    for phase, s in results["per_phase"].items():
+        latency, first = s["latency"], s["time_to_first_chunk"]
+        print(f"  {phase:<20} n={latency['n']:<4} p50={latency['p50']:.3f}s p95={latency['p95']:.3f}s "
+              f"p99={latency['p99']:.3f}s first-chunk p50={first['p50']:.3f}s")
+    print(f"Mock servers: {results['mock_servers']}")
+    for failure in failures:
+        print(f"[FAILED] {failure}")
+
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+    for _, server in servers:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+PDF text backend benchmark: pdfplumber vs pdfminer vs pypdfium2.
+
+Extracts a corpus of PDFs with every available backend of ``parser`` and
+reports per backend:
+
+- throughput in pages/s and MB/s (median of ``--repeat`` passes)
+- peak RSS of a fresh interpreter that only runs that backend
+- agreement with pdfplumber's text: word-multiset F1 over the corpus, and
+  the worst file
+- files ``looks_garbled`` flags, which ``auto`` mode would retry with pdfplumber
+
+The default corpus is the PDFs in ``JDs/`` plus generated multi-page
+documents. Pass ``--corpus`` to use your own files or directories.
+
+Usage (from the repository root):
+
+    python -m benchmarks.pdf_backends
+    python -m benchmarks.pdf_backends --corpus samples/resumes --repeat 5 --json backends.json
+"""
+
+import argparse
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+from benchmarks.pdf_extraction import write_text_pdf
+from utils.parse_docsuments import PDF_BACKENDS, _pdf_page_count, looks_garbled, parser, pdf_backend_available
+
+
+REFERENCE_BACKEND = "pdfplumber"
+GENERATED_PAGES = (3, 20)
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where the resource module is missing)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def word_f1(reference: str, candidate: str) -> float:
+    """Order-insensitive agreement of the words two backends extracted"""
+    ref, cand = Counter(reference.split()), Counter(candidate.split())
+    if not ref and not cand:
+        return 1.0
+    overlap = sum((ref & cand).values())
+    if not overlap:
+        return 0.0
+    precision, recall = overlap / sum(cand.values()), overlap / sum(ref.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def run_backend(backend: str, paths: list, repeat: int, texts_path: str) -> dict:
+    """Worker mode: time one backend over the corpus in this (fresh) process"""
+    baseline_rss = peak_rss_mb()
+    extractor = parser(pdf_workers=1, pdf_backend=backend)
+    pages = sum(_pdf_page_count(path) for path in paths)
+    size_mb = sum(os.path.getsize(path) for path in paths) / (1024 * 1024)
+
+    timings, texts = [], {}
+    for _ in range(repeat):
+        started = time.perf_counter()
+        texts = {path: extractor.extract_text_from_pdf_serial(path, backend) for path in paths}
+        timings.append(time.perf_counter() - started)
+    with open(texts_path, "w", encoding="utf-8") as f:
+        json.dump(texts, f)
+
+    median = statistics.median(timings)
+    return {
+        "backend": backend,
+        "files": len(paths),
+        "pages": pages,
+        "median_s": round(median, 4),
+        "pages_per_s": round(pages / median, 1) if median else None,
+        "mb_per_s": round(size_mb / median, 2) if median else None,
+        "baseline_rss_mb": baseline_rss,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def collect_corpus(args) -> list:
+    paths = []
+    for entry in args.corpus:
+        if os.path.isdir(entry):
+            paths += sorted(glob.glob(os.path.join(entry, "**", "*.pdf"), recursive=True))
+        elif entry.lower().endswith(".pdf"):
+            paths.append(entry)
+    if not args.no_generated:
+        workdir = tempfile.mkdtemp(prefix="pdf_backends_")
+        for pages in GENERATED_PAGES:
+            path = os.path.join(workdir, f"generated_{pages}_pages.pdf")
+            write_text_pdf(path, pages)
+            paths.append(path)
+    return [os.path.abspath(path) for path in paths]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Throughput, peak RSS and text agreement of PDF backends")
+    arg_parser.add_argument("--corpus", nargs="*", default=["JDs"], help="PDF files or directories")
+    arg_parser.add_argument("--no-generated", action="store_true", help="skip the generated multi-page PDFs")
+    arg_parser.add_argument("--backends", nargs="+", default=list(PDF_BACKENDS))
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--json", dest="json_path", default=None, help="also write the results to this file")
+    arg_parser.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    arg_parser.add_argument("--texts-path", default=None, help=argparse.SUPPRESS)
+    arg_parser.add_argument("--paths-file", default=None, help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.worker:
+        with open(args.paths_file, encoding="utf-8") as f:
+            paths = json.load(f)
+        print(json.dumps(run_backend(args.worker, paths, args.repeat, args.texts_path)))
+        return
+
+    paths = collect_corpus(args)
+    if not paths:
+        arg_parser.error("no PDFs found in the corpus")
+    backends = [name for name in args.backends if pdf_backend_available(name)]
+    skipped = sorted(set(args.backends) - set(backends))
+    if REFERENCE_BACKEND not in backends:
+        backends.insert(0, REFERENCE_BACKEND)
+
+    workdir = tempfile.mkdtemp(prefix="pdf_backends_run_")
+    paths_file = os.path.join(workdir, "paths.json")
+    with open(paths_file, "w", encoding="utf-8") as f:
+        json.dump(paths, f)
+
+    rows, texts = [], {}
+    for backend in backends:
+        texts_path = os.path.join(workdir, f"{backend}.json")
+        # A fresh interpreter per backend so peak RSS is that backend's alone
+        completed = subprocess.run(
+            [sys.executable, "-m", "benchmarks.pdf_backends", "--worker", backend, "--repeat", str(args.repeat),
+             "--texts-path", texts_path, "--paths-file", paths_file],
+            capture_output=True, text=True, check=True,
+        )
+        rows.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+        with open(texts_path, encoding="utf-8") as f:
+            texts[backend] = json.load(f)
+
+    reference = texts[REFERENCE_BACKEND]
+    for row in rows:
+        backend_texts = texts[row["backend"]]
+        scores = {path: word_f1(reference[path], backend_texts[path]) for path in paths}
+        worst = min(scores, key=scores.get)
+        row["agreement_f1"] = round(word_f1("\n".join(reference.values()), "\n".join(backend_texts.values())), 4)
+        row["worst_file"] = {"file": os.path.basename(worst), "f1": round(scores[worst], 4)}
+        row["garbled_files"] = [os.path.basename(path) for path in paths if looks_garbled(backend_texts[path])]
+
+    print(f"Corpus: {len(paths)} PDFs, {rows[0]['pages']} pages; reference backend {REFERENCE_BACKEND}")
+    if skipped:
+        print(f"Not installed: {', '.join(skipped)}")
+    for row in rows:
+        print(f"{row['backend']:<11} {row['pages_per_s']:>8} pages/s {row['mb_per_s']:>7} MB/s "
+              f"peak RSS {row['peak_rss_mb']} MB  agreement F1 {row['agreement_f1']:.3f} "
+              f"(worst {row['worst_file']['file']} {row['worst_file']['f1']:.3f})  garbled {len(row['garbled_files'])}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"files": [os.path.basename(path) for path in paths], "backends": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
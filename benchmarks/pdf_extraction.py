@@ -0,0 +1,128 @@
+"""
+Serial vs parallel PDF text extraction benchmark for ``parser``.
+
+Compares ``extract_text_from_pdf_serial`` with the process-pool path
+(``parser(pdf_workers=N)``) for one text backend (``--backend``, default
+pdfplumber) on generated multi-page documents, or on real files passed with
+``--pdf``, and checks that both return the same text.
+
+Usage (from the repository root):
+
+    python -m benchmarks.pdf_extraction --pages 2 10 40 --workers 4
+    python -m benchmarks.pdf_extraction --pdf JDs/some_JD.pdf --repeat 5
+
+The first parallel run includes starting the worker pool; it is reported
+separately as ``pool_warmup`` and excluded from the timings.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from utils.parse_docsuments import parser
+
+
+LINES_PER_PAGE = 45
+LOREM = (
+    "Designed and operated Python services handling ingestion, search and reporting workloads; "
+    "led code reviews, on-call rotations and performance work across the platform team."
+).split()
+
+
+def _escape_pdf_text(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_text_pdf(path: str, pages: int, lines_per_page: int = LINES_PER_PAGE):
+    """Write a plain multi-page text PDF (Helvetica, one text stream per page) without extra dependencies"""
+    objects = {1: b"<< /Type /Catalog /Pages 2 0 R >>", 3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"}
+    page_ids = []
+    for number in range(pages):
+        lines = []
+        for line in range(lines_per_page):
+            words = [LOREM[(number * 7 + line * 3 + i) % len(LOREM)] for i in range(12)]
+            lines.append(f"({_escape_pdf_text(f'Page {number + 1} line {line + 1}: ' + ' '.join(words))}) Tj T*")
+        stream = ("BT /F1 9 Tf 11 TL 40 800 Td " + " ".join(lines) + " ET").encode("latin-1")
+        content_id, page_id = 4 + 2 * number, 5 + 2 * number
+        objects[content_id] = b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        objects[page_id] = (b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /CropBox [0 0 595 842] "
+                            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id)
+        page_ids.append(page_id)
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids).encode()
+    objects[2] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, pages)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = len(out)
+        out += b"%d 0 obj\n%s\nendobj\n" % (object_id, objects[object_id])
+    xref = len(out)
+    count = max(objects) + 1
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % count
+    out += b"".join(b"%010d 00000 n \n" % offsets[object_id] for object_id in range(1, count))
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (count, xref)
+    with open(path, "wb") as f:
+        f.write(bytes(out))
+
+
+def time_runs(func, path: str, repeat: int) -> tuple:
+    timings, text = [], ""
+    for _ in range(repeat):
+        started = time.perf_counter()
+        text = func(path)
+        timings.append(time.perf_counter() - started)
+    return timings, text
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Serial vs parallel PDF extraction benchmark")
+    arg_parser.add_argument("--pages", type=int, nargs="+", default=[2, 10, 40], help="sizes of the generated PDFs")
+    arg_parser.add_argument("--pdf", nargs="+", default=[], help="benchmark these files instead of generated ones")
+    arg_parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--backend", default="pdfplumber", help="PDF text backend used by both paths")
+    arg_parser.add_argument("--json", dest="json_path", default=None, help="also write the results to this file")
+    args = arg_parser.parse_args()
+
+    paths = list(args.pdf)
+    if not paths:
+        workdir = tempfile.mkdtemp(prefix="pdf_bench_")
+        for pages in args.pages:
+            path = os.path.join(workdir, f"generated_{pages}_pages.pdf")
+            write_text_pdf(path, pages)
+            paths.append(path)
+
+    serial = parser(pdf_workers=1, pdf_backend=args.backend)
+    parallel = parser(pdf_workers=args.workers, pdf_backend=args.backend)
+    warmup_started = time.perf_counter()
+    # Small files are read serially, so warm the pool up on the largest one
+    parallel.extract_text_from_pdf_with(max(paths, key=os.path.getsize), args.backend)
+    results = {"workers": args.workers, "pool_warmup_s": round(time.perf_counter() - warmup_started, 3), "files": []}
+
+    print(f"Parallel workers: {args.workers}, pool warm-up {results['pool_warmup_s']:.3f}s")
+    for path in paths:
+        serial_times, serial_text = time_runs(lambda p: serial.extract_text_from_pdf_serial(p, args.backend), path, args.repeat)
+        parallel_times, parallel_text = time_runs(lambda p: parallel.extract_text_from_pdf_with(p, args.backend), path, args.repeat)
+        serial_median, parallel_median = statistics.median(serial_times), statistics.median(parallel_times)
+        row = {
+            "file": os.path.basename(path),
+            "chars": len(serial_text),
+            "serial_median_s": round(serial_median, 4),
+            "parallel_median_s": round(parallel_median, 4),
+            "speedup": round(serial_median / parallel_median, 2) if parallel_median else None,
+            "identical_text": serial_text == parallel_text,
+        }
+        results["files"].append(row)
+        print(f"{row['file']:<32} serial={serial_median:.3f}s parallel={parallel_median:.3f}s "
+              f"speedup={row['speedup']}x identical={row['identical_text']}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Content-addressed store for uploaded resumes.
+
+Uploads are stored once per SHA-256 of their bytes, in sharded directories
+so no single directory grows too large:
+
+    submissions/blobs/ab/cd/abcd...ef.pdf        (or .pdf.zst when compressed)
+    submissions/blobs/ab/cd/abcd...ef.txt        extracted text
+
+A repeat upload of the same file therefore skips both the write and
+``parser.extract_text``. Compression uses zstd when ``RESUME_BLOB_COMPRESSION``
+is ``zstd`` and the optional ``zstandard`` package is installed; blobs are
+found whether they were stored compressed or not, so the setting can change
+at any time.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+RESUME_BLOB_DIR = os.path.join("submissions", "blobs")
+RESUME_BLOB_COMPRESSION = os.environ.get("RESUME_BLOB_COMPRESSION", "none")
+ZSTD_LEVEL = 10
+ZSTD_SUFFIX = ".zst"
+
+
+@dataclass(frozen=True)
+class BlobRef:
+    sha256: str
+    ext: str
+    path: str
+    size: int
+    compressed: bool
+    created: bool
+
+
+def blob_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _atomic_write(path: str, data: bytes):
+    """Write via a temporary file and rename, so readers never see a partial blob"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class BlobStore:
+    def __init__(self, root: str = RESUME_BLOB_DIR, compression: str = RESUME_BLOB_COMPRESSION):
+        self.root = root
+        self.compress = compression == "zstd"
+        if self.compress and zstandard is None:
+            print("[WARNING] RESUME_BLOB_COMPRESSION=zstd but the zstandard package is not installed; storing blobs uncompressed")
+            self.compress = False
+
+    def _base(self, sha256: str) -> str:
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+
+    def _blob_path(self, sha256: str, ext: str) -> Optional[str]:
+        """Path of an existing blob, compressed or not"""
+        path = f"{self._base(sha256)}.{ext}"
+        for candidate in (path, path + ZSTD_SUFFIX):
+            if os.path.exists(candidate):
+                return candidate
+        return None
+
+    def put(self, data: bytes, ext: str) -> BlobRef:
+        """Store the bytes unless a blob with the same hash exists"""
+        ext = ext.lower().lstrip(".")
+        sha256 = blob_hash(data)
+        existing = self._blob_path(sha256, ext)
+        if existing is not None:
+            return BlobRef(sha256, ext, existing, len(data), existing.endswith(ZSTD_SUFFIX), created=False)
+        path = f"{self._base(sha256)}.{ext}"
+        if self.compress:
+            path += ZSTD_SUFFIX
+            data_to_write = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+        else:
+            data_to_write = data
+        _atomic_write(path, data_to_write)
+        return BlobRef(sha256, ext, path, len(data), self.compress, created=True)
+
+    def read(self, sha256: str, ext: str) -> Optional[bytes]:
+        path = self._blob_path(sha256, ext.lower().lstrip("."))
+        if path is None:
+            return None
+        with open(path, "rb") as f:
+            data = f.read()
+        if path.endswith(ZSTD_SUFFIX):
+            if zstandard is None:
+                raise RuntimeError(f"Blob {path} is zstd-compressed but the zstandard package is not installed")
+            data = zstandard.ZstdDecompressor().decompress(data)
+        return data
+
+    @contextmanager
+    def open_path(self, ref: BlobRef):
+        """A file path with the original extension for parsers: the blob itself, or a decompressed temporary copy"""
+        if not ref.path.endswith(ZSTD_SUFFIX):
+            yield ref.path
+            return
+        fd, tmp_path = tempfile.mkstemp(suffix=f".{ref.ext}")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(self.read(ref.sha256, ref.ext))
+            yield tmp_path
+        finally:
+            os.remove(tmp_path)
+
+    def get_text(self, sha256: str) -> Optional[str]:
+        try:
+            with open(f"{self._base(sha256)}.txt", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put_text(self, sha256: str, text: str):
+        _atomic_write(f"{self._base(sha256)}.txt", text.encode("utf-8"))
+
+
+_blob_store = None
+_blob_store_lock = threading.Lock()
+
+
+def get_blob_store() -> BlobStore:
+    """Return the process-wide resume blob store"""
+    global _blob_store
+    with _blob_store_lock:
+        if _blob_store is None:
+            _blob_store = BlobStore()
+    return _blob_store
@@ -0,0 +1,259 @@
+"""
+SQLite store of submitted candidates.
+
+Replaces reading ``submissions/candidates.csv`` into pandas on every submit.
+The store gives:
+
+- duplicate detection through a unique index on the normalized
+  (first name, last name, email, phone) key, checked again inside the insert
+  transaction so two simultaneous submissions cannot both get through
+- O(log N) lookup of a submission by ``session_id``, and of every
+  submission of the same resume file by its ``resume_sha256`` (``blob_store``)
+- a one-shot migration of the existing ``candidates.csv`` on first open
+- ``export_csv`` for downstream tooling; by default each new row is also
+  appended to ``candidates.csv`` so the file stays current. The mirror's
+  header is brought up to ``CSV_MIRROR_COLUMNS`` once when the store opens,
+  so a submit only ever appends a line; fields outside that header stay in
+  the store and appear in ``export_csv``
+
+    python -m utils.candidate_store export submissions/candidates_export.csv
+"""
+
+import csv
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+import pandas as pd
+
+
+CANDIDATE_DB_PATH = os.path.join("submissions", "candidates.sqlite3")
+CANDIDATES_CSV = os.path.join("submissions", "candidates.csv")
+# Keep appending new rows to candidates.csv for tools that read it directly
+CSV_MIRROR = os.environ.get("CANDIDATES_CSV_MIRROR", "1").lower() in ("1", "true", "yes")
+# Columns of the candidates.csv mirror: the form fields, then what ingestion adds
+CSV_MIRROR_COLUMNS = [
+    "session_id", "first_name", "last_name", "email", "phone", "current_location", "ready_to_relocate",
+    "institute", "major", "current_company", "current_title", "years_experience", "linkedin", "github",
+    "portfolio", "position_applied", "expected_salary", "tech_stack", "submission_date", "jd_file_path",
+    "resume_path", "resume_sha256", "best_fit_position", "best_fit_score", "applied_fit_rank",
+    "applied_fit_score", "fit_mismatch",
+]
+
+
+class DuplicateCandidateError(ValueError):
+    pass
+
+
+def normalize_phone(phone) -> str:
+    digits = re.sub(r"\D", "", str(phone or ""))
+    return ("+" if str(phone or "").strip().startswith("+") else "") + digits
+
+
+def candidate_key(first_name, last_name, email, phone) -> str:
+    """Normalized identity of a candidate: case- and whitespace-insensitive names and email, digits of the phone"""
+    parts = [" ".join(str(value or "").lower().split()) for value in (first_name, last_name, email)]
+    return "|".join(parts + [normalize_phone(phone)])
+
+
+_csv_lock = threading.Lock()
+
+
+def _csv_header(csv_path: str) -> list:
+    if not os.path.exists(csv_path) or os.path.getsize(csv_path) == 0:
+        return []
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), [])
+
+
+def append_candidate_row(row: dict, csv_path: str = CANDIDATES_CSV):
+    """Append one row under the file's header; the file is never rewritten here"""
+    with _csv_lock:
+        os.makedirs(os.path.dirname(os.path.abspath(csv_path)), exist_ok=True)
+        header = _csv_header(csv_path)
+        with open(csv_path, "a", newline="", encoding="utf-8") as f:
+            if not header:
+                header = CSV_MIRROR_COLUMNS + [key for key in row if key not in CSV_MIRROR_COLUMNS]
+                csv.writer(f).writerow(header)
+            # Fields outside the header are kept in the store only (see export_csv)
+            csv.DictWriter(f, fieldnames=header, extrasaction="ignore").writerow(row)
+
+
+def upgrade_csv_header(csv_path: str, columns: list = CSV_MIRROR_COLUMNS) -> bool:
+    """Add missing mirror columns to an existing CSV, keeping every row; returns True if it was rewritten"""
+    with _csv_lock:
+        header = _csv_header(csv_path)
+        missing = [column for column in columns if column not in header]
+        if not header or not missing:
+            return False
+        df = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+        tmp_path = f"{csv_path}.{os.getpid()}.tmp"
+        df.reindex(columns=header + missing, fill_value="").to_csv(tmp_path, index=False)
+        os.replace(tmp_path, csv_path)
+        print(f"[CANDIDATES] Added columns {missing} to {csv_path}")
+        return True
+
+
+class CandidateStore:
+    def __init__(self, db_path: str = CANDIDATE_DB_PATH, csv_path: Optional[str] = CANDIDATES_CSV,
+                 csv_mirror: bool = CSV_MIRROR):
+        self.db_path = db_path
+        self.csv_path = csv_path
+        self.csv_mirror = csv_mirror and bool(csv_path)
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS candidates (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    candidate_key TEXT NOT NULL UNIQUE,
+                    session_id TEXT,
+                    position_applied TEXT,
+                    submission_date TEXT,
+                    data TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )"""
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(candidates)")}
+            if "resume_sha256" not in columns:
+                conn.execute("ALTER TABLE candidates ADD COLUMN resume_sha256 TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS candidates_session_id ON candidates (session_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS candidates_resume_sha256 ON candidates (resume_sha256)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        if csv_path:
+            self.migrate_from_csv(csv_path)
+            if self.csv_mirror:
+                self._upgrade_mirror_header()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def is_duplicate(self, first_name, last_name, email, phone) -> bool:
+        with self._connect() as conn:
+            row = conn.execute("SELECT 1 FROM candidates WHERE candidate_key = ?",
+                               (candidate_key(first_name, last_name, email, phone),)).fetchone()
+        return row is not None
+
+    def _insert(self, conn, row: dict) -> bool:
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO candidates (candidate_key, session_id, position_applied, submission_date, "
+            "resume_sha256, data, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (candidate_key(row.get("first_name"), row.get("last_name"), row.get("email"), row.get("phone")),
+             row.get("session_id"), row.get("position_applied"), row.get("submission_date"),
+             row.get("resume_sha256"), json.dumps(row, default=str), time.time()),
+        )
+        return cursor.rowcount == 1
+
+    def add(self, row: dict):
+        """Insert a submission; raises DuplicateCandidateError if the normalized key already exists"""
+        with self._connect() as conn:
+            inserted = self._insert(conn, row)
+        if not inserted:
+            raise DuplicateCandidateError("This candidate has already been submitted!")
+        if self.csv_mirror:
+            try:
+                append_candidate_row(row, self.csv_path)
+            except Exception as e:
+                print(f"[WARNING] Failed to mirror candidate to {self.csv_path}: {e}")
+
+    def get_by_session(self, session_id: str) -> Optional[dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT data FROM candidates WHERE session_id = ? ORDER BY id DESC LIMIT 1",
+                               (session_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_by_resume(self, resume_sha256: str) -> list:
+        """Every submission that uploaded the same resume file"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT data FROM candidates WHERE resume_sha256 = ? ORDER BY id",
+                                (resume_sha256,)).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def count(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+
+    def iter_rows(self):
+        with self._connect() as conn:
+            rows = conn.execute("SELECT data FROM candidates ORDER BY id").fetchall()
+        for (data,) in rows:
+            yield json.loads(data)
+
+    def migrate_from_csv(self, csv_path: str) -> int:
+        """Import an existing candidates.csv once; rows whose normalized key repeats are skipped"""
+        marker = f"migrated:{os.path.abspath(csv_path)}"
+        with self._connect() as conn:
+            if conn.execute("SELECT 1 FROM meta WHERE key = ?", (marker,)).fetchone():
+                return 0
+            imported = skipped = 0
+            if os.path.exists(csv_path) and os.path.getsize(csv_path) > 0:
+                df = pd.read_csv(csv_path, dtype={"phone": str, "session_id": str})
+                # Through JSON so values are native types and empty cells become None
+                for record in json.loads(df.to_json(orient="records")):
+                    if self._insert(conn, record):
+                        imported += 1
+                    else:
+                        skipped += 1
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES (?, ?)",
+                         (marker, json.dumps({"imported": imported, "skipped": skipped, "at": time.time()})))
+        if imported or skipped:
+            print(f"[CANDIDATES] Migrated {imported} rows from {csv_path} ({skipped} duplicates skipped)")
+        return imported
+
+    def _upgrade_mirror_header(self):
+        """Once per mirror column set: widen the mirror's header so submits never rewrite the file"""
+        marker = f"mirror_columns:{os.path.abspath(self.csv_path)}"
+        columns = json.dumps(CSV_MIRROR_COLUMNS)
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = ?", (marker,)).fetchone()
+        if row and row[0] == columns:
+            return
+        upgrade_csv_header(self.csv_path)
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (marker, columns))
+
+    def export_csv(self, csv_path: str) -> int:
+        """Write every submission to a CSV (columns in first-seen order), replacing the file atomically"""
+        rows = list(self.iter_rows())
+        columns = list(dict.fromkeys(key for row in rows for key in row))
+        os.makedirs(os.path.dirname(os.path.abspath(csv_path)), exist_ok=True)
+        tmp_path = f"{csv_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(rows)
+        os.replace(tmp_path, csv_path)
+        return len(rows)
+
+
+_candidate_store = None
+_candidate_store_lock = threading.Lock()
+
+
+def get_candidate_store() -> CandidateStore:
+    """Return the process-wide candidate store (migrating candidates.csv on first use)"""
+    global _candidate_store
+    with _candidate_store_lock:
+        if _candidate_store is None:
+            _candidate_store = CandidateStore()
+    return _candidate_store
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 3 or sys.argv[1] != "export":
+        print("Usage: python -m utils.candidate_store export <path.csv>")
+        sys.exit(2)
+    print(f"Exported {get_candidate_store().export_csv(sys.argv[2])} candidates to {sys.argv[2]}")
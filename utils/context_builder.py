@@ -0,0 +1,170 @@
+"""
+Token-budgeted prompt assembly for HiringAgent.
+
+Each kind of LLM call gets an input-token budget. The builder counts tokens
+locally, always keeps the system prompt and the current user message, packs
+the optional context sections (resume summary, JD, question list, ...) by
+priority, and then fills the rest with chat history, newest first. Turns
+that no longer fit are compacted into a rolling summary instead of being
+dropped.
+"""
+
+import hashlib
+import math
+import re
+from dataclasses import dataclass
+from typing import Dict, List
+
+
+# Input-token budgets per call type
+CALL_BUDGETS = {
+    "default": 3000,
+    "casual_chat": 2500,
+    "question": 900,
+    "routing": 1200,
+    "resume_summary": 6000,
+    "evaluation": 6000,
+    "answer_scoring": 1200,
+    "final_report": 6000,
+}
+
+# Share of the budget left after the fixed parts that is kept for chat history
+HISTORY_SHARE = {
+    "default": 0.5,
+    "casual_chat": 0.4,
+    "question": 0.6,
+    "routing": 0.8,
+    "resume_summary": 0.0,
+    "evaluation": 0.7,
+    "answer_scoring": 0.0,
+    "final_report": 0.2,
+}
+
+# Part of the history budget the rolling summary of older turns may use
+SUMMARY_SHARE = 0.25
+SUMMARY_LINE_TOKENS = 40
+MESSAGE_OVERHEAD_TOKENS = 4
+TRUNCATION_MARKER = " …[truncated]"
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def count_tokens(text: str) -> int:
+    """Estimate the token count of a text locally (about one token per 4 characters of a word)"""
+    if not text:
+        return 0
+    return sum(max(1, math.ceil(len(piece) / 4)) for piece in _TOKEN_PATTERN.findall(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text down to roughly max_tokens, keeping the beginning"""
+    if max_tokens <= 0 or not text:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    used = 0
+    end = 0
+    for match in _TOKEN_PATTERN.finditer(text):
+        used += max(1, math.ceil(len(match.group()) / 4))
+        if used > max_tokens - count_tokens(TRUNCATION_MARKER):
+            break
+        end = match.end()
+    return text[:end] + TRUNCATION_MARKER
+
+
+@dataclass
+class ContextSection:
+    """A block of optional system context; lower priority values are packed first"""
+    name: str
+    text: str
+    priority: int = 1
+    truncatable: bool = True
+
+
+class ContextBuilder:
+    def __init__(self, budgets: Dict[str, int] = None):
+        self.budgets = dict(CALL_BUDGETS, **(budgets or {}))
+        self._digests = {}
+        self.last_usage = {}
+
+    def budget_for(self, call_type: str) -> int:
+        return self.budgets.get(call_type, self.budgets["default"])
+
+    def build(self, call_type: str, system_prompt: str, user_message: str,
+              history: List[dict] = None, sections: List[ContextSection] = None) -> List[dict]:
+        """Assemble the message list for one LLM call within the call type's token budget"""
+        budget = self.budget_for(call_type)
+        history = [m for m in (history or []) if m.get("content")]
+        sections = sorted(sections or [], key=lambda s: s.priority)
+
+        fixed = count_tokens(system_prompt) + count_tokens(user_message) + 2 * MESSAGE_OVERHEAD_TOKENS
+        available = max(budget - fixed, 0)
+        history_reserve = int(available * HISTORY_SHARE.get(call_type, HISTORY_SHARE["default"])) if history else 0
+
+        # Pack context sections by priority into what is not reserved for history
+        section_budget = available - history_reserve
+        packed = []
+        for section in sections:
+            if not section.text:
+                continue
+            cost = count_tokens(section.text) + MESSAGE_OVERHEAD_TOKENS
+            if cost <= section_budget:
+                packed.append(section.text)
+                section_budget -= cost
+            elif section.truncatable and section_budget > MESSAGE_OVERHEAD_TOKENS + 20:
+                packed.append(truncate_to_tokens(section.text, section_budget - MESSAGE_OVERHEAD_TOKENS))
+                section_budget = 0
+            else:
+                print(f"[CONTEXT] Dropped section '{section.name}' for {call_type}: no budget left")
+
+        # Whatever the sections did not use goes to history
+        history_budget = history_reserve + section_budget
+        recent, summary = self._pack_history(history, history_budget)
+
+        system_content = "\n\n".join([system_prompt] + packed)
+        messages = [{"role": "system", "content": system_content}]
+        if summary:
+            messages.append({"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"})
+        messages += [{"role": m["role"], "content": m["content"]} for m in recent]
+        messages.append({"role": "user", "content": user_message})
+
+        self.last_usage = {
+            "call_type": call_type,
+            "budget": budget,
+            "used": sum(count_tokens(m["content"]) + MESSAGE_OVERHEAD_TOKENS for m in messages),
+            "history_turns": len(recent),
+            "summarized_turns": len(history) - len(recent),
+        }
+        return messages
+
+    def _pack_history(self, history: List[dict], budget: int):
+        """Keep the newest turns verbatim and fold the older ones into a rolling summary"""
+        if not history or budget <= 0:
+            return [], ""
+
+        summary_budget = int(budget * SUMMARY_SHARE) if len(history) > 1 else 0
+        verbatim_budget = budget - summary_budget
+        recent = []
+        for message in reversed(history):
+            cost = count_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+            if cost > verbatim_budget:
+                break
+            recent.append(message)
+            verbatim_budget -= cost
+        recent.reverse()
+
+        older = history[:len(history) - len(recent)]
+        summary_budget += verbatim_budget
+        lines = [self._digest(message) for message in older]
+        # Drop the oldest digest lines first until the summary fits
+        while lines and count_tokens("\n".join(lines)) > summary_budget:
+            lines.pop(0)
+        return recent, "\n".join(lines)
+
+    def _digest(self, message: dict) -> str:
+        """One-line digest of a turn, memoized so the rolling summary is cheap to rebuild"""
+        key = (message["role"], hashlib.sha1(str(message["content"]).encode("utf-8")).hexdigest())
+        if key not in self._digests:
+            text = " ".join(str(message["content"]).split())
+            self._digests[key] = f"- {message['role']}: {truncate_to_tokens(text, SUMMARY_LINE_TOKENS)}"
+        return self._digests[key]
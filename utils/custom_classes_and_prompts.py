@@ -14,6 +14,18 @@ class ScreeningQuestion(BaseModel):
 class ScreeningQuestionsResponse(BaseModel):
     screening_questions: List[ScreeningQuestion]
 
+class PresentedScreeningQuestion(ScreeningQuestion):
+    presentation: str  # one-sentence conversational lead-in, generated together with the question
+
+class PresentedScreeningQuestionsResponse(BaseModel):
+    screening_questions: List[PresentedScreeningQuestion]
+
+class QuestionScore(BaseModel):
+    score: int
+    AI_Cheat_probability: float
+    strengths: str
+    areas_for_improvement: str
+
 class TestEvaluation(BaseModel):
     score: int
     AI_Cheat_probability:float
@@ -1,32 +1,42 @@
 import os
 import glob
 
-def get_jd_options():
-    """Extract job positions from JD filenames"""
-    jd_dict = {}
+from utils.jd_store import get_jd_store
+
 
-    # Get the path to the current script (e.g., utils/)
-    base_dir = os.path.dirname(os.path.abspath(__file__))
+# The JDs folder of the main app, one level up from utils/
+JD_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "JDs")
 
-    # Move up one level to the main app folder
-    app_dir = os.path.dirname(base_dir)
 
-    # Construct the path to the JDs folder
-    jd_folder = os.path.join(app_dir, "JDs")
+def jd_position(filename: str) -> str:
+    """Job position encoded in a JD filename"""
+    # Extract part before '_talenscoutJD'
+    if 'talenscout' in filename or 'JD' in filename:
+        keys = filename.split('_')
+        return "".join(keys[:-2]) if len(keys) >= 2 else filename
+    # If no '_talenscoutJD' pattern, use filename without extension
+    return os.path.splitext(filename)[0]
+
+
+def scan_jd_folder(jd_folder: str = JD_FOLDER) -> dict:
+    """Map job positions to the JD files of a folder"""
+    jd_dict = {}
 
     # Get all files inside JDs
     jd_files = glob.glob(os.path.join(jd_folder, "*"))
 
     for file_path in jd_files:
-        filename = os.path.basename(file_path)
-        # Extract part before '_talenscoutJD'
-        if 'talenscout' in filename or 'JD' in filename:
-            keys = filename.split('_')
-            key = "".join(keys[:-2]) if len(keys) >= 2 else filename
-            jd_dict[key] = file_path
-        else:
-            # If no '_talenscoutJD' pattern, use filename without extension
-            key = os.path.splitext(filename)[0]
-            jd_dict[key] = file_path
-    
+        jd_dict[jd_position(os.path.basename(file_path))] = file_path
+
     return jd_dict
+
+
+def get_jd_options():
+    """Extract job positions from JD filenames
+
+    The process-wide JD store only rescans the folder when it changed and
+    parses new or changed files in the background.
+    """
+    jd_store = get_jd_store()
+    jd_store.sync_folder(JD_FOLDER, scan_jd_folder)
+    return jd_store.paths()
@@ -1,35 +1,91 @@
 from pydantic import BaseModel 
-from openai import OpenAI
 from typing import List, Dict, Optional
 from dotenv import load_dotenv
 import os
 import json
 from datetime import datetime
 import asyncio
-import aiofiles
+import hashlib
+import uuid
 from utils.custom_tools import tools
-from utils.custom_classes_and_prompts import ScreeningQuestion, ScreeningQuestionsResponse, TestEvaluation, FinalCandidateReport,CandidateProfile
+from utils.llm_provider import ProviderConfig, get_provider_router
+from utils.rate_limiter import PRIORITY_INTERACTIVE, PRIORITY_REPORT, PRIORITY_BACKGROUND
+from utils.intent_router import IntentRouter
+from utils.question_cache import get_question_cache, load_question_set, question_cache_key
+from utils.interview_log import get_interview_log, interview_log_ref
+from utils.resume_memo import get_resume_memo, resume_text_hash
+from utils.context_builder import ContextBuilder, ContextSection
+from utils.llm_tracing import llm_span_context
+from utils.question_templates import QuestionPresenter
+from utils.session_state import InterviewState
+from utils.custom_classes_and_prompts import ScreeningQuestion, ScreeningQuestionsResponse, TestEvaluation, FinalCandidateReport,CandidateProfile, QuestionScore, PresentedScreeningQuestionsResponse
 import streamlit as st
 
 
 load_dotenv()
 
+LLM_ERROR_MESSAGE = "I apologize, but I encountered a technical issue. Let's continue with the interview. Could you please repeat your last response?"
+
+# Models used for each kind of call on the primary (Gemini) endpoint
+PRIMARY_MODELS = {
+    "chat": "gemini-2.5-flash-preview-05-20",
+    "structured": "gemini-2.0-flash",
+    "tools": "gemini-2.0-flash",
+}
+DEFAULT_FALLBACK_MODEL = "meta-llama/Llama-3.3-70B-Instruct"
+
+# Section titles and empty-value text for list fields of FinalCandidateReport
+REPORT_SECTIONS = {
+    "jd_requirements_match": ("📋 JOB REQUIREMENTS MATCH", "No data available"),
+    "screening_test_performance": ("📊 SCREENING TEST PERFORMANCE", "No data available"),
+    "specific_scores": ("📈 SPECIFIC SCORES BREAKDOWN", "No data available"),
+    "location_logistics": ("🌍 LOCATION & LOGISTICS", "No data available"),
+    "salary_expectations": ("💰 SALARY EXPECTATIONS", "No data available"),
+    "overall_assessment": ("🔍 OVERALL ASSESSMENT", "No data available"),
+    "top_strengths": ("💪 TOP STRENGTHS", "None identified"),
+    "concerns": ("⚠️  AREAS OF CONCERN", "None identified"),
+    "recommendations": ("💡 RECOMMENDATIONS", "None identified"),
+    "next_steps": ("🚀 SUGGESTED NEXT STEPS", "None identified"),
+}
+# Order of the final report's sections: the decision and score lead, whatever order the model writes fields in
+REPORT_ORDER = (
+    "final_decision", "overall_score",
+    "jd_requirements_match", "screening_test_performance", "specific_scores",
+    "location_logistics", "salary_expectations",
+    "overall_assessment", "test_performance_impact",
+    "top_strengths", "concerns", "recommendations", "next_steps",
+    "timeline_recommendation",
+)
+
+def get_setting(name: str, default=None):
+    """Read a setting from the environment (or .env), then st.secrets, then the default"""
+    if name in os.environ:
+        return os.environ[name]
+    try:
+        return st.secrets[name]
+    except (KeyError, FileNotFoundError):
+        if default is None:
+            raise KeyError(f"Missing setting '{name}' in environment and st.secrets")
+        return default
 
 class HiringAgent:
-    def __init__(self,  resume_details:dict,candidate_details: dict, jd_details: dict, primary_llm="gemini", fallback_llm="hyperbolic", add_details: dict = None):
+    def __init__(self,  resume_details:dict,candidate_details: dict, jd_details: dict, primary_llm="gemini", fallback_llm="hyperbolic", add_details: dict = None, session_id: str = None):
+        self.session_id = session_id or uuid.uuid4().hex
         self.primary_llm = primary_llm
         self.fallback_llm = fallback_llm
-        self.primary_url =  st.secrets["primary_url"]
-        self.fallback_url =  st.secrets["fallback_url"]
-        self.primary_llm_key =  st.secrets["GEMINI_API_KEY"]
-        self.fallback_llm_key =  st.secrets["HYPERBOLIC"]
+        self.primary_url =  get_setting("primary_url")
+        self.fallback_url =  get_setting("fallback_url")
+        self.primary_llm_key =  get_setting("GEMINI_API_KEY")
+        self.fallback_llm_key =  get_setting("HYPERBOLIC")
         self.analysis_done=False
+        self.analysis_result = None
         # Validate and handle empty candidate_details
         if not candidate_details or not isinstance(candidate_details, dict):
             candidate_details = {}
 
         self.cand_details = candidate_details
         self.resume_details = resume_details['resume_details'] or ""
+        self.resume_hash = resume_text_hash(self.resume_details) if self.resume_details else None
         if not add_details:
             self.add_details = {}
         self.jd_details = jd_details or {}
@@ -51,11 +107,25 @@ class HiringAgent:
                     self.profile[field] = "General Position"
                 print(f"[WARNING] Missing required field '{field}', using default: {self.profile[field]}")
 
-        # Initialize OpenAI client with error handling
+        # Initialize the shared primary/fallback provider router with error handling
         try:
-            self.client = self.create_openai_client(self.primary_llm_key, self.primary_url)
+            fallback_model = get_setting("fallback_model", DEFAULT_FALLBACK_MODEL)
+            self.llm = get_provider_router(
+                primary=ProviderConfig(
+                    self.primary_llm, self.primary_llm_key, self.primary_url, dict(PRIMARY_MODELS),
+                    requests_per_minute=float(get_setting("primary_rpm", 60)),
+                    tokens_per_minute=float(get_setting("primary_tpm", 250_000)),
+                ),
+                fallback=ProviderConfig(
+                    self.fallback_llm, self.fallback_llm_key, self.fallback_url,
+                    {kind: fallback_model for kind in PRIMARY_MODELS},
+                    requests_per_minute=float(get_setting("fallback_rpm", 60)),
+                    tokens_per_minute=float(get_setting("fallback_tpm", 250_000)),
+                ),
+                hedge=str(get_setting("hedge_requests", False)).lower() in ("1", "true", "yes"),
+            )
         except Exception as e:
-            print(f"[ERROR] Failed to initialize OpenAI client: {e}")
+            print(f"[ERROR] Failed to initialize LLM providers: {e}")
             raise ValueError(f"Failed to initialize AI client. Please check your API configuration: {e}")
 
         # UNIFIED SYSTEM: Initialize conversation state
@@ -72,26 +142,57 @@ class HiringAgent:
         self.current_question_index = 0
         self.test_responses = []
         self.test_scores = []
+        # "parallel" scores each recorded answer concurrently; "single" sends the whole transcript in one call
+        self.evaluation_mode = "parallel"
+        self._answer_scores = {}
+        # Formatted evaluations keyed by structured-phase transcript hash, and evaluations still running
+        self._analysis_cache = {}
+        self._analysis_tasks = {}
         self.questions_generated = False
+        self.questions_cache_key = None
+        self.questions_file = None
+        self.questions_from_cache = False
         self.casual_chat_count = 0
         self.max_casual_chats = 2
+        self.router = IntentRouter()
+        self.context = ContextBuilder()
+        # "template" renders questions locally, "pregenerated" also asks for a lead-in per question when
+        # generating them, "llm" rephrases every question with a separate LLM call
+        self.question_presentation = get_setting("question_presentation", "template")
+        self.presenter = QuestionPresenter(seed=self.session_id)
         
     async def init_func(self):
+        """Generate questions and summarize the resume concurrently"""
+        await asyncio.gather(self._prepare_questions(), self.get_resume_summary())
+        if self.questions_generated:
+            # Only question generation and the summary read the raw text; resume_hash still identifies it
+            self.resume_details = ""
+
+    async def _prepare_questions(self):
         await self.generate_screening_questions_async()
-        await self.save_questions_to_file_async()
+        await self.log_questions_async()
         self.questions_generated = True
-        await self.get_resume_summary()
 
     async def get_resume_summary(self):
         try:
             if (self.resume_details is not None ) and len(self.resume_details)>100:
+                text_hash = resume_text_hash(self.resume_details)
+                # The memo is SQLite-backed; keep its I/O off the shared LLM loop
+                memoized = await asyncio.to_thread(lambda: get_resume_memo().get(text_hash))
+                if memoized is not None:
+                    self.resume_summary = memoized
+                    print(f"\n\n Resume_summary (memoized):{self.resume_summary}\n\n")
+                    return
+
                 user_message = f"""
                 Please extract the candidate's information from the following resume text. 
                 If any field is missing or unclear, just set it as `None`.
 
                 Resume:{self.resume_details}
                 """
-                self.resume_summary=self.chat_with_llm(user_message=user_message,chat_history=None,get_common_system_prompt=False,response_format=CandidateProfile,temp=0.5)
+                self.resume_summary=await self.chat_with_llm(user_message=user_message,chat_history=None,get_common_system_prompt=False,response_format=CandidateProfile,temp=0.5,call_type="resume_summary",priority=PRIORITY_BACKGROUND)
+                if isinstance(self.resume_summary, CandidateProfile):
+                    await asyncio.to_thread(lambda: get_resume_memo().put(text_hash, self.resume_summary))
                 print(f"\n\n Resume_summary:{self.resume_summary}\n\n")
             else:
                 print("Unable to read th resume provided")
@@ -99,9 +200,24 @@ class HiringAgent:
             print(f"Unable to summarize the resume due to: {e}")
 
 
+    @staticmethod
+    def _question_cache_lookup(key: str):
+        question_cache = get_question_cache()
+        cached = question_cache.get(key)
+        return cached, (question_cache.stats() if cached is not None else None)
+
     async def generate_screening_questions_async(self):
         """Asynchronously generate 5 screening questions with structured output validation"""
         try:
+            self.questions_cache_key = question_cache_key(self.current_jd, self.profile, self.resume_details)
+            # The cache is SQLite-backed; keep its I/O off the shared LLM loop
+            cached, stats = await asyncio.to_thread(self._question_cache_lookup, self.questions_cache_key)
+            if cached is not None:
+                self.screening_questions = cached.screening_questions
+                self.questions_from_cache = True
+                print(f"[DEBUG] Loaded {len(self.screening_questions)} screening questions from cache (stats: {stats})")
+                return
+
             prompt = f"""Generate exactly 5 screening test questions based on the candidate's profile and job requirements.
 
     CANDIDATE PROFILE:
@@ -126,18 +242,26 @@ class HiringAgent:
     5. Role-Specific
 
     Each question should have clear evaluation criteria and expected answer points."""
+            response_format = ScreeningQuestionsResponse
+            if self.question_presentation == "pregenerated":
+                response_format = PresentedScreeningQuestionsResponse
+                prompt += """
+    For each question also write `presentation`: one short, friendly and neutral sentence an interviewer
+    would say to introduce it. Do not restate the question or hint at the answer."""
 
             messages = [
                 {"role": "system", "content": "You are an expert technical recruiter creating screening questions."},
                 {"role": "user", "content": prompt}
             ]
 
-            response = self.client.beta.chat.completions.parse(
-                model="gemini-2.0-flash",
-                messages=messages,
-                response_format=ScreeningQuestionsResponse,
-                temperature=0.7
-            )
+            with llm_span_context(session_id=self.session_id, call_site="generate_screening_questions_async", call_type="questions"):
+                response = await self.llm.complete(
+                    "structured",
+                    priority=PRIORITY_BACKGROUND,
+                    messages=messages,
+                    response_format=response_format,
+                    temperature=0.7
+                )
 
             questions_data = response.choices[0].message.parsed
             self.screening_questions = questions_data.screening_questions
@@ -147,36 +271,119 @@ class HiringAgent:
             print(f"[ERROR] Failed to generate screening questions: {e}")
 
 
-    async def save_questions_to_file_async(self):
-        """Asynchronously save generated questions to JSON file"""
-        try:          
-            # Improved version
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_dir = os.path.join("screening_questions")  # Better than raw string path
-            os.makedirs(output_dir, exist_ok=True)  # Creates directory if doesn't exist
+    @property
+    def candidate_ref(self) -> str:
+        """Candidate key of the interview log: the email, else the name"""
+        email = str(self.profile.get('email', '')).strip().lower()
+        if email:
+            return email
+        return f"{self.profile.get('first_name', '')} {self.profile.get('last_name', '')}".strip().lower()
 
-            filename = os.path.join(
-                output_dir,
-                f"screening_questions_{self.profile.get('first_name', 'candidate')}_{timestamp}.json"
-            )
+    def log_event(self, event_type: str, payload: dict, turn: int = None):
+        """Queue an event in the interview log without waiting for the write"""
+        return get_interview_log().append(event_type, self.session_id, payload, candidate=self.candidate_ref, turn=turn)
 
+    async def log_questions_async(self):
+        """Record the session's question set in the interview log and index it in the question cache"""
+        if not self.screening_questions:
+            return
+        try:
             questions_data = {
                 "candidate_info": {
                     "name": f"{self.profile.get('first_name', '')} {self.profile.get('last_name', '')}",
                     "position": self.profile.get('position_applied', '') ,
                     "experience": self.profile.get('years_experience', 0),
-                    "generated_at": timestamp
+                    "generated_at": datetime.now().strftime("%Y%m%d_%H%M%S")
                 },
-                "questions": [q.dict() if isinstance(q, ScreeningQuestion) else q for q in self.screening_questions]
+                "questions": [q.model_dump() if isinstance(q, ScreeningQuestion) else q for q in self.screening_questions],
+                "cache_key": self.questions_cache_key,
+                "from_cache": self.questions_from_cache
             }
+            event_id = await asyncio.wrap_future(self.log_event("questions", questions_data))
+            self.questions_file = interview_log_ref(event_id)
+            print(f"[DEBUG] Questions logged as {self.questions_file}")
 
-            async with aiofiles.open(filename, 'w') as f:
-                await f.write(json.dumps(questions_data, indent=2))
-
-            print(f"[DEBUG] Questions saved to {filename}")
+            # A reused set is already indexed under the same key
+            if self.questions_cache_key and not self.questions_from_cache:
+                await asyncio.to_thread(get_question_cache().put, self.questions_cache_key, self.questions_file)
 
         except Exception as e:
-            print(f"[ERROR] Failed to save questions to file: {e}")
+            print(f"[ERROR] Failed to log questions: {e}")
+
+    def to_state(self, chat_messages: list = None, interaction_count: int = 0,
+                 session_start_time: float = None) -> InterviewState:
+        """Compact, serializable snapshot of the interview for a session store"""
+        return InterviewState(
+            session_id=self.session_id,
+            profile=dict(self.profile),
+            jd_position=self.profile.get('position_applied', ''),
+            resume_hash=self.resume_hash,
+            # The raw resume is only needed until the questions exist
+            resume_text=None if self.questions_generated else self.resume_details,
+            questions_cache_key=self.questions_cache_key,
+            questions_file=self.questions_file,
+            questions_generated=self.questions_generated,
+            interview_phase=self.interview_phase,
+            current_question_index=self.current_question_index,
+            casual_chat_count=self.casual_chat_count,
+            formal_interactions_count=self.formal_interactions_count,
+            analysis_done=self.analysis_done,
+            analysis_result=self.analysis_result if isinstance(self.analysis_result, str) else None,
+            analysis_cache={key: value for key, value in self._analysis_cache.items() if isinstance(value, str)},
+            test_responses=list(self.test_responses),
+            test_scores=list(self.test_scores),
+            chat_messages=[{"role": m["role"], "content": str(m["content"])} for m in (chat_messages or [])],
+            interaction_count=interaction_count,
+            session_start_time=session_start_time,
+        )
+
+    @classmethod
+    def from_state(cls, state: InterviewState, jd_details: dict) -> "HiringAgent":
+        """Rebuild an agent from a stored state; run init_func afterwards if questions_generated is False"""
+        agent = cls(
+            resume_details={"resume_details": state.resume_text or ""},
+            candidate_details=state.profile,
+            jd_details=jd_details,
+            session_id=state.session_id,
+        )
+        agent.resume_hash = state.resume_hash
+        agent.questions_cache_key = state.questions_cache_key
+        agent.questions_file = state.questions_file
+        agent.interview_phase = state.interview_phase
+        agent.current_question_index = state.current_question_index
+        agent.casual_chat_count = state.casual_chat_count
+        agent.formal_interactions_count = state.formal_interactions_count
+        agent.analysis_done = state.analysis_done
+        agent.analysis_result = state.analysis_result
+        agent._analysis_cache = dict(state.analysis_cache)
+        agent.test_responses = list(state.test_responses)
+        agent.test_scores = list(state.test_scores)
+
+        if state.resume_hash:
+            agent.resume_summary = get_resume_memo().get(state.resume_hash)
+        if state.questions_generated:
+            agent.screening_questions = agent._load_questions(state.questions_cache_key, state.questions_file)
+            agent.questions_generated = bool(agent.screening_questions)
+            agent.questions_from_cache = agent.questions_generated
+            if not agent.questions_generated:
+                print(f"[WARNING] Questions of session {state.session_id} are no longer available; regenerating")
+        return agent
+
+    def _load_questions(self, cache_key: str, questions_file: str) -> list:
+        """Resolve stored question references: the question cache first, then the logged set (or legacy file)
+
+        Blocking SQLite reads: call it from a script or worker thread, never from a coroutine on the shared loop.
+        """
+        if cache_key:
+            cached = get_question_cache().get(cache_key)
+            if cached is not None:
+                return cached.screening_questions
+        if questions_file:
+            try:
+                return ScreeningQuestionsResponse(screening_questions=load_question_set(questions_file)["questions"]).screening_questions
+            except Exception as e:
+                print(f"[ERROR] Failed to load questions from {questions_file}: {e}")
+        return []
 
     def get_current_jd_content(self) -> str:
         """Get JD content for the position candidate applied for"""
@@ -202,10 +409,6 @@ class HiringAgent:
         
         return filtered
 
-    def create_openai_client(self, api_key: str, base_url: str):
-        """Create OpenAI client with the specified API key and base URL"""
-        return OpenAI(api_key=api_key, base_url=base_url)
-        
     def get_common_system_prompt(self, include_jd: bool = True, include_resume: bool = True) -> str:
         """Common system prompt used across all interactions with optional JD and Resume inclusion"""
         
@@ -221,13 +424,6 @@ class HiringAgent:
     - Tech Stack: {self.profile.get('tech_stack', 'Not specified')}
     - Expected Salary: {self.profile.get('expected_salary', 'Not specified')} LPA
     """
-        resume_info=f"""Resume Summary of the Candidate: {self.resume_summary}""" if include_resume else ""
-
-        jd_info = f"""
-    JOB DESCRIPTION:
-    {self.current_jd[:1000] if self.current_jd else 'No JD available'}
-    """ if include_jd else ""
-
         return f"""You are a professional Technical Recruiter and Interviewer for TalenScout conducting a structured interview/screening process.
 
     ⚙️ CHATBOT FLOW OVERVIEW:
@@ -236,8 +432,6 @@ class HiringAgent:
     3. **Phase 3: Post-Interview** – After all questions are done, allow candidate to request an **analysis**, **recommendation**, or to **exit**.
 
     {candidate_info}
-    {resume_info}
-    {jd_info}
     INTERVIEW GUIDELINES:
     1. Stay focused on the interview/screening process ONLY
     2. Do NOT answer questions outside the interview context
@@ -260,7 +454,16 @@ class HiringAgent:
     You are the interviewer. The candidate should answer YOUR questions, not the other way around.
     """
 
-    def chat_with_llm(
+    def get_common_context_sections(self, include_jd: bool = True, include_resume: bool = True) -> list:
+        """Resume summary and JD blocks for the common system prompt, packed by the context builder"""
+        sections = []
+        if include_resume:
+            sections.append(ContextSection("resume_summary", f"Resume Summary of the Candidate: {self.resume_summary}", priority=1))
+        if include_jd:
+            sections.append(ContextSection("jd", f"JOB DESCRIPTION:\n{self.current_jd if self.current_jd else 'No JD available'}", priority=2))
+        return sections
+
+    async def chat_with_llm(
         self,
         user_message: str,
         chat_history: list,
@@ -269,7 +472,10 @@ class HiringAgent:
         custom_system_prompt: str = None,
         response_format=None,
         temp: float = 0.7,
-        max_chat_history: int = 6
+        call_type: str = "default",
+        context_sections: list = None,
+        priority: int = PRIORITY_INTERACTIVE,
+        stream: bool = False
     ) -> str:
         """
         Send message to LLM with proper context and optional structured output.
@@ -282,7 +488,11 @@ class HiringAgent:
         - custom_system_prompt: str → override the system prompt completely if provided
         - response_format: Optional BaseModel → for structured LLM outputs
         - temp: float → sampling temperature
-        - max_chat_history: int → number of most recent history turns to include
+        - call_type: str → key into the context builder's token budgets (casual_chat, question, evaluation, ...)
+        - context_sections: list[ContextSection] → extra system context packed by priority within the budget
+        - priority: int → rate-limiter queue priority (PRIORITY_INTERACTIVE / _REPORT / _BACKGROUND)
+        - stream: bool → return an async generator instead of the full reply; it yields text deltas,
+          or (field_name, value) pairs as each field completes when response_format is given
         """
 
         try:
@@ -291,47 +501,108 @@ class HiringAgent:
                 system_prompt = custom_system_prompt
             elif get_common_system_prompt:
                 system_prompt = self.get_common_system_prompt(*get_common_system_prompt_args)
+                context_sections = self.get_common_context_sections(*get_common_system_prompt_args) + (context_sections or [])
             else:
                 system_prompt = (
                     "You are a help bot. Respond appropriately to user queries. "
                     "These may involve extracting relevant information or simple Q&A."
                 )
-            if(chat_history is not None):
-                max_chat_history=max_chat_history if max_chat_history<len(chat_history) else int(len(chat_history)-1)
-            # Trim chat history to the last `max_chat_history` items
-            trimmed_history = chat_history[-max_chat_history:] if chat_history else []
-
-            # Convert chat history (already formatted with {"role": ..., "content": ...})
-            formatted_history = [{"role": msg["role"], "content": msg["content"]} for msg in trimmed_history]
+            # Pack system prompt, context sections and history into the call type's token budget
+            messages = self.context.build(
+                call_type=call_type,
+                system_prompt=system_prompt,
+                user_message=user_message,
+                history=chat_history,
+                sections=context_sections,
+            )
+            print(f"[CONTEXT] {self.context.last_usage}")
 
-            # Compose final message list
-            messages = [{"role": "system", "content": system_prompt}] + formatted_history + [
-                {"role": "user", "content": user_message}
-            ]
+            if stream:
+                if response_format:
+                    return self._stream_structured(messages, response_format, temp, priority, call_type)
+                return self._stream_text(messages, temp, priority, call_type)
 
             # Call LLM with or without structured output
-            if response_format:
-                response = self.client.beta.chat.completions.parse(
-                    model="gemini-2.0-flash",
-                    messages=messages,
-                    response_format=response_format,
-                    temperature=temp
-                )
-                return response.choices[0].message.parsed
-            else:
-                response = self.client.chat.completions.create(
-                    model="gemini-2.5-flash-preview-05-20",
+            with llm_span_context(session_id=self.session_id, call_site="chat_with_llm", call_type=call_type):
+                if response_format:
+                    response = await self.llm.complete(
+                        "structured",
+                        priority=priority,
+                        messages=messages,
+                        response_format=response_format,
+                        temperature=temp
+                    )
+                    return response.choices[0].message.parsed
+                else:
+                    response = await self.llm.complete(
+                        "chat",
+                        priority=priority,
+                        messages=messages,
+                        temperature=temp
+                    )
+                    return response.choices[0].message.content
+
+        except Exception as e:
+            print(f"[LLM ERROR]: {e}")
+            return LLM_ERROR_MESSAGE
+
+    async def _stream_text(self, messages: list, temp: float, priority: int = PRIORITY_INTERACTIVE, call_type: str = "default"):
+        """Yield completion text deltas as they arrive"""
+        started = False
+        try:
+            # Each step of the generator may run in a different task, so the span context only wraps the open
+            with llm_span_context(session_id=self.session_id, call_site="chat_with_llm", call_type=call_type):
+                response = await self.llm.open_stream(
+                    "chat",
+                    priority=priority,
                     messages=messages,
                     temperature=temp
                 )
-                return response.choices[0].message.content
-
+            async for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    started = True
+                    yield chunk.choices[0].delta.content
         except Exception as e:
             print(f"[LLM ERROR]: {e}")
-            return "I apologize, but I encountered a technical issue. Let's continue with the interview. Could you please repeat your last response?"
-
-
-    def take_interview(self, chat_history: list) -> str:
+            yield ("\n\n" if started else "") + LLM_ERROR_MESSAGE
+
+    async def _stream_structured(self, messages: list, response_format, temp: float, priority: int = PRIORITY_REPORT,
+                                 call_type: str = "default"):
+        """Yield (field_name, value) pairs of a structured output as soon as each field is complete"""
+        emitted = set()
+        with llm_span_context(session_id=self.session_id, call_site="chat_with_llm", call_type=call_type):
+            response = await self.llm.open_stream(
+                "structured",
+                priority=priority,
+                messages=messages,
+                response_format=response_format,
+                temperature=temp
+            )
+        try:
+            async for event in response:
+                if event.type != "content.delta" or not isinstance(event.parsed, dict):
+                    continue
+                # Keys arrive in order, so every key before the one still being written is final
+                for field in list(event.parsed)[:-1]:
+                    if field in response_format.model_fields and field not in emitted:
+                        emitted.add(field)
+                        yield field, event.parsed[field]
+            completion = await response.get_final_completion()
+        finally:
+            await response.close()
+
+        parsed = completion.choices[0].message.parsed
+        for field in response_format.model_fields:
+            if field not in emitted:
+                yield field, getattr(parsed, field)
+
+    async def _stream_with_suffix(self, text_stream, suffix: str):
+        """Pass a text stream through and append a fixed suffix"""
+        async for chunk in text_stream:
+            yield chunk
+        yield suffix
+
+    async def take_interview(self, chat_history: list, stream: bool = False) -> str:
         """Handle the flow between casual chat and structured questions"""
 
         # Phase 1: Casual chat while questions generate
@@ -351,7 +622,7 @@ class HiringAgent:
 
     Keep it natural, friendly, and professional. Questions are being prepared in the background."""
 
-                response = self.chat_with_llm(user_message=prompt, chat_history=chat_history,max_chat_history=2)
+                response = await self.chat_with_llm(user_message=prompt, chat_history=chat_history,call_type="casual_chat",stream=stream)
 
                 # Check if we should transition
                 if self.casual_chat_count >= self.max_casual_chats:
@@ -359,7 +630,10 @@ class HiringAgent:
                         self.interview_phase = "structured_questions"
                         return response 
                     else:
-                        return response + "\n\nI'm still preparing your customized questions. Let's chat a bit more!"
+                        suffix = "\n\nI'm still preparing your customized questions. Let's chat a bit more!"
+                        if stream:
+                            return self._stream_with_suffix(response, suffix)
+                        return response + suffix
 
                 return response
 
@@ -386,12 +660,14 @@ class HiringAgent:
             if not self.questions_generated or not self.screening_questions:
                 return "I'm still preparing your questions. Please wait a moment."
 
+            self._record_answer(chat_history)
+
             # All questions done
             if self.current_question_index >= len(self.screening_questions):
                 self.interview_phase = "post_interview"
 
-                # Trigger analysis just once upon finishing all Qs
-                self.analysis_result = self.analyze_candidate_performance(chat_history)
+                # Start the evaluation in the background so it is ready when the candidate asks for it
+                self._start_speculative_analysis(chat_history)
 
                 return """🎉 **All screening questions completed!**
 
@@ -402,6 +678,12 @@ class HiringAgent:
 
         # Ask next structured question with strict rules enforced
         q = self.screening_questions[self.current_question_index]
+        if self.question_presentation != "llm":
+            # Rendered locally: the question text is already known, so no LLM round trip is needed
+            index = self.current_question_index
+            previous_answer = self.test_responses[-1]["answer"] if index > 0 and self.test_responses else None
+            self.current_question_index += 1
+            return self.presenter.render(q, index, len(self.screening_questions), previous_answer)
 
         # The prompt sent to LLM (as user message)
         prompt = f"""Ask the following structured question in a human conversational way but quoting all 3 below info as it is:
@@ -438,24 +720,162 @@ class HiringAgent:
         self.current_question_index += 1
 
         # Send to LLM
-        return self.chat_with_llm(
+        return await self.chat_with_llm(
             user_message=prompt,
             chat_history=chat_history,
             get_common_system_prompt=False,
-            max_chat_history=2,
-            custom_system_prompt=custom_system_prompt
+            call_type="question",
+            custom_system_prompt=custom_system_prompt,
+            stream=stream
         )
 
             
-    def analyze_candidate_performance(self,chat_history:list) -> TestEvaluation:
-        """Evaluate structured interview responses and return structured feedback"""
+    def _record_answer(self, chat_history: list):
+        """Store the latest user message as the answer to the question asked last"""
+        answered = self.current_question_index
+        if answered == 0 or len(self.test_responses) >= answered:
+            return
+        q = self.screening_questions[answered - 1]
+        answer = next((m["content"] for m in reversed(chat_history or []) if m["role"] == "user"), "")
+        self.test_responses.append({
+            "question_number": q.question_number,
+            "section": q.section,
+            "question": q.question,
+            "answer": answer,
+        })
+
+    async def _score_answer(self, q: ScreeningQuestion, response: dict) -> QuestionScore:
+        """Score one answer against its question's expected points and criteria (memoized per answer)"""
+        key = hashlib.sha256(json.dumps([q.model_dump(), response["answer"]]).encode("utf-8")).hexdigest()
+        if key in self._answer_scores:
+            return self._answer_scores[key]
+
+        custom_system_prompt = f"""
+        You are a professional Technical Recruiter for TalenScout scoring ONE answer from a structured screening interview.
+        The candidate has {self.profile.get('years_experience', 0)} years of experience and applied for {self.profile.get('position_applied', 'the role')}.
+
+        Score the answer from 0 to {q.max_score} using the evaluation criteria and expected answer points.
+        Also estimate the probability (0-1) that the answer was produced with AI assistance: look for unusually perfect,
+        copied-looking or overly comprehensive answers relative to the question and the candidate's experience.
+        Keep strengths and areas for improvement to one or two sentences each.
+        """
+        user_message = f"""Section: {q.section}
+Question {q.question_number}: {q.question}
+Expected answer points: {json.dumps(q.expected_answer_points)}
+Evaluation criteria: {q.evaluation_criteria}
+Maximum score: {q.max_score}
+
+Candidate's answer:
+{response['answer']}"""
+
+        result = await self.chat_with_llm(
+            custom_system_prompt=custom_system_prompt,
+            user_message=user_message,
+            chat_history=None,
+            call_type="answer_scoring",
+            priority=PRIORITY_REPORT,
+            response_format=QuestionScore,
+            temp=0.2
+        )
+        if not isinstance(result, QuestionScore):
+            raise ValueError(f"Scoring question {q.question_number} failed: {result}")
+        result.score = max(0, min(result.score, q.max_score))
+        self._answer_scores[key] = result
+        return result
+
+    async def _evaluate_answers_in_parallel(self) -> TestEvaluation:
+        """Score every recorded answer concurrently, then aggregate the scores into a TestEvaluation"""
+        questions = {q.question_number: q for q in self.screening_questions}
+        pairs = [(questions[r["question_number"]], r) for r in self.test_responses if r["question_number"] in questions]
+        scores = await asyncio.gather(*[self._score_answer(q, r) for q, r in pairs])
+
+        self.test_scores = [
+            {
+                "question_number": q.question_number,
+                "section": q.section,
+                "score": s.score,
+                "max_score": q.max_score,
+                "AI_Cheat_probability": s.AI_Cheat_probability,
+                "strengths": s.strengths,
+                "areas_for_improvement": s.areas_for_improvement,
+            }
+            for (q, _), s in zip(pairs, scores)
+        ]
+        # Questions that were never answered count as zero
+        total_max = sum(q.max_score for q in self.screening_questions) or 1
+        total = sum(item["score"] for item in self.test_scores)
+        cheat = [self._cheat_percentage(item["AI_Cheat_probability"]) for item in self.test_scores]
+        ranked = sorted(self.test_scores, key=lambda item: item["score"] / max(item["max_score"], 1))
+
+        feedback = f"You scored {total}/{total_max} across {len(self.test_scores)} of {len(self.screening_questions)} questions."
+        if ranked:
+            feedback += (f" Strongest area: {ranked[-1]['section']} ({ranked[-1]['score']}/{ranked[-1]['max_score']});"
+                         f" weakest area: {ranked[0]['section']} ({ranked[0]['score']}/{ranked[0]['max_score']}).")
+        feedback += f" Estimated AI assistance probability averaged {sum(cheat) / len(cheat) if cheat else 0.0:.0f}%."
+
+        return TestEvaluation(
+            score=round(100 * total / total_max),
+            AI_Cheat_probability=(sum(cheat) / len(cheat) / 100.0) if cheat else 0.0,
+            strengths="\n".join(f"• Q{item['question_number']} ({item['section']}): {item['strengths']}" for item in self.test_scores),
+            areas_for_improvement="\n".join(f"• Q{item['question_number']} ({item['section']}): {item['areas_for_improvement']}" for item in self.test_scores),
+            feedback=feedback,
+        )
+
+    async def _model_fields(self, model: BaseModel):
+        """Yield (field_name, value) pairs of a finished model, like a completed structured stream"""
+        for field in type(model).model_fields:
+            yield field, getattr(model, field)
+
+    def _transcript_hash(self) -> str:
+        """Hash of the structured-phase transcript: the question set and the recorded answers"""
+        payload = [self.questions_cache_key, self.test_responses]
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def _start_speculative_analysis(self, chat_history: list):
+        """Evaluate the finished transcript in the background unless it is already evaluated or running"""
+        key = self._transcript_hash()
+        if key in self._analysis_cache or key in self._analysis_tasks:
+            return
+        task = asyncio.ensure_future(self._evaluate_performance(list(chat_history), key))
+        self._analysis_tasks[key] = task
+
+        def _done(t):
+            self._analysis_tasks.pop(key, None)
+            if t.cancelled():
+                return
+            if t.exception() is not None:
+                print(f"[WARNING] Background evaluation failed: {t.exception()}")
+                return
+            # Only a finished evaluation counts; a failed one leaves analysis to run on request
+            self.analysis_done = True
+        task.add_done_callback(_done)
+
+    async def analyze_candidate_performance(self,chat_history:list, stream: bool = False) -> TestEvaluation:
+        """Evaluate structured interview responses, reusing the evaluation of an unchanged transcript"""
         self.analysis_done=True
+        key = self._transcript_hash()
+        if key in self._analysis_cache:
+            self.analysis_result = self._analysis_cache[key]
+            return self.analysis_result
+
+        task = self._analysis_tasks.get(key)
+        if task is not None:
+            try:
+                # Shielded so an abandoned request does not cancel the shared evaluation
+                return await asyncio.shield(task)
+            except Exception as e:
+                print(f"[WARNING] Background evaluation failed, evaluating again: {e}")
+
+        return await self._evaluate_performance(chat_history, key, stream)
+
+    async def _evaluate_performance(self, chat_history: list, key: str, stream: bool = False):
+        """Run the evaluation and cache the formatted result under the transcript hash"""
         custom_system_prompt = f"""
         You are a professional Technical Recruiter and Interviewer for TalenScout conducting a structured interview screening process. You have just completed the structured phase of the interview consisting of 5-7 questions. You are now tasked with evaluating the candidate's answers.
 
         You will be given:
         - The full chat history between the candidate and the interviewer during the structured questions phase by user
-        - The original structured questions with expected answer points and evaluation criteria which is {self.screening_questions}
+        - The original structured questions with expected answer points and evaluation criteria (listed below)
 
         Please evaluate the candidate's performance using the following structure:
 
@@ -478,20 +898,32 @@ class HiringAgent:
         Provide honest, fair evaluation while being constructive and professional.
         """
         try:
-            # Request structured evaluation
-            evaluation = self.chat_with_llm(
-                custom_system_prompt=custom_system_prompt,
-                user_message="Evaluate the candidate's structured interview performance.",
-                chat_history=chat_history,
-                max_chat_history=50,
-                response_format=TestEvaluation
-            )
-
-            score = evaluation.AI_Cheat_probability
-            if score > 1.0:
-                score = score / 100.0  
+            evaluation = None
+            if self.evaluation_mode == "parallel" and self.test_responses:
+                try:
+                    evaluation = await self._evaluate_answers_in_parallel()
+                    if stream:
+                        return self._stream_evaluation(self._model_fields(evaluation), key)
+                except Exception as e:
+                    print(f"[WARNING] Parallel answer scoring failed, falling back to a single evaluation call: {e}")
+                    evaluation = None
+
+            if evaluation is None:
+                # Request structured evaluation
+                evaluation = await self.chat_with_llm(
+                    custom_system_prompt=custom_system_prompt,
+                    user_message="Evaluate the candidate's structured interview performance.",
+                    chat_history=chat_history,
+                    call_type="evaluation",
+                    priority=PRIORITY_REPORT,
+                    context_sections=[ContextSection("screening_questions", self._questions_context(), priority=0, truncatable=False)],
+                    response_format=TestEvaluation,
+                    stream=stream
+                )
+                if stream:
+                    return self._stream_evaluation(evaluation, key)
 
-            percentage = min(score * 100, 100.0)
+            percentage = self._cheat_percentage(evaluation.AI_Cheat_probability)
 
             formatted_evaluation = f"""
             📊 EVALUATION METRICS\n
@@ -516,22 +948,82 @@ class HiringAgent:
             {'═' * 80}\n\n
             You can now procees to final recommendation section where you may ask to get your final recommendation.
                     """
-                    
+
+            self._analysis_cache[key] = formatted_evaluation
+            self.analysis_result = formatted_evaluation
+            self.log_event("evaluation", {"evaluation": evaluation.model_dump(), "question_scores": self.test_scores,
+                                          "report": formatted_evaluation})
             return formatted_evaluation
         
         except Exception as e:
             print("Evaluation failed:", e)
             raise
 
+    def _questions_context(self) -> str:
+        """Compact JSON of the screening questions for evaluation prompts"""
+        questions = [q.model_dump() if isinstance(q, ScreeningQuestion) else q for q in self.screening_questions]
+        return "SCREENING QUESTIONS:\n" + json.dumps(questions, separators=(",", ":"))
+
+    def _question_scores_context(self) -> str:
+        """Per-question scores from the parallel evaluation, reused by the final report"""
+        if not self.test_scores:
+            return ""
+        lines = [f"- Q{item['question_number']} ({item['section']}): {item['score']}/{item['max_score']}" for item in self.test_scores]
+        return "Per-question screening scores:\n" + "\n".join(lines)
+
+    def _cheat_percentage(self, score: float) -> float:
+        """Normalize the AI cheat probability (0-1 or 0-100) to a percentage"""
+        if score > 1.0:
+            score = score / 100.0
+        return min(score * 100, 100.0)
+
+    def _render_evaluation_section(self, field: str, value) -> str:
+        """Render one TestEvaluation field as it arrives from the stream"""
+        if field == "score":
+            return f"📊 EVALUATION METRICS\n\n{'─' * 80}\n\n• Overall Score: {value}/100\n\n"
+        if field == "AI_Cheat_probability":
+            return f"• AI Assistance Probability: {self._cheat_percentage(value or 0.0):.2f}%\n\n"
+        titles = {
+            "strengths": "💪 STRENGTHS",
+            "areas_for_improvement": "🔧 AREAS FOR IMPROVEMENT",
+            "feedback": "📝 OVERALL FEEDBACK",
+        }
+        return f"{titles.get(field, field)}\n\n{'─' * 80}\n\n{value}\n\n"
+
+    async def _stream_evaluation(self, fields, key: str = None):
+        """Stream the evaluation report section by section, caching the full text once complete"""
+        sections = []
+        try:
+            async for field, value in fields:
+                section = self._render_evaluation_section(field, value)
+                sections.append(section)
+                yield section
+        except Exception as e:
+            print("Evaluation failed:", e)
+            yield LLM_ERROR_MESSAGE
+            return
+
+        footer = f"""{'═' * 80}\n
+Report Generated: {self._get_timestamp()}\n
+Interviewer: TalenScout AI Screening System\n
+{'═' * 80}\n\n
+You can now procees to final recommendation section where you may ask to get your final recommendation."""
+        self.analysis_result = "".join(sections) + footer
+        if key is not None:
+            self._analysis_cache[key] = self.analysis_result
+        self.log_event("evaluation", {"question_scores": self.test_scores, "report": self.analysis_result})
+        yield footer
+
     def _get_timestamp(self):
         """Helper method to get current timestamp"""
         from datetime import datetime
         return datetime.now().strftime("%Y-%m-%d %H:%M:%S")       
 
 
-    def generate_final_recommendation(
+    async def generate_final_recommendation(
         self,
         chat_history: list,
+        stream: bool = False,
     ) -> FinalCandidateReport:
         """Analyze the candidate's overall profile and test performance to generate a final hiring report."""
         
@@ -540,11 +1032,9 @@ class HiringAgent:
 
     You are tasked with generating a final hiring recommendation report for a candidate, based on:
 
-    1.Resume Summary:
-    {self.resume_summary}
+    1. Resume Summary (below)
 
-    2. Job Description (JD):
-    {self.current_jd}
+    2. Job Description (JD) (below)
 
     3. Candidate Profile:
     - Name: {self.profile.get('first_name', '')} {self.profile.get('last_name', '')}
@@ -555,12 +1045,11 @@ class HiringAgent:
     - Tech Stack: {self.profile.get('tech_stack', 'Not Specified')}
     - Expected Salary: {self.profile.get('expected_salary', 'Not Specified')} LPA
 
-    4. Structured Interview Evaluation Summary:
+    4. Structured Interview Evaluation Summary (below)
         -This is the summary based on 5 total questions asked from candidate
-        {self.analysis_result}
 
 
-    Your objective is to analyze the above information and return a detailed hiring recommendation using the following structure (conform to the class `FinalCandidateReport`):
+    Your objective is to analyze this information and return a detailed hiring recommendation using the following structure (conform to the class `FinalCandidateReport`):
 
     - jd_requirements_match: Skill-wise fit between resume and JD
     - screening_test_performance: Total test score and insights
@@ -581,66 +1070,44 @@ class HiringAgent:
     """
 
         try:
-            final_report = self.chat_with_llm(
+            # Reuses the cached (or still running) evaluation; only evaluates if nothing exists yet
+            if self.screening_questions:
+                try:
+                    await self.analyze_candidate_performance(chat_history)
+                except Exception as e:
+                    print(f"[WARNING] No evaluation available for the final report: {e}")
+
+            final_report = await self.chat_with_llm(
                 user_message="Generate the final candidate recommendation based on all provided information.",
                 chat_history=chat_history,
                 custom_system_prompt=custom_system_prompt,
                 response_format=FinalCandidateReport,
-                max_chat_history=2,
+                call_type="final_report",
+                priority=PRIORITY_REPORT,
+                context_sections=[
+                    ContextSection("evaluation", f"Structured Interview Evaluation Summary:\n{self.analysis_result}", priority=0),
+                    ContextSection("question_scores", self._question_scores_context(), priority=0),
+                    ContextSection("resume_summary", f"Resume Summary:\n{self.resume_summary}", priority=1),
+                    ContextSection("jd", f"Job Description (JD):\n{self.current_jd}", priority=2),
+                ],
                 temp=0.5,
+                stream=stream,
             )
-            return f"""
-
-    🎯 FINAL DECISION: {final_report.final_decision.upper()}
-    Overall Score: {final_report.overall_score}/100
-
-    📋 JOB REQUIREMENTS MATCH
-    {'─' * 80}
-    {chr(10).join([f"• {item}" for item in final_report.jd_requirements_match]) if final_report.jd_requirements_match else "No data available"}
-
-    📊 SCREENING TEST PERFORMANCE
-    {'─' * 80}
-    {chr(10).join([f"• {item}" for item in final_report.screening_test_performance]) if final_report.screening_test_performance else "No data available"}
-
-    📈 SPECIFIC SCORES BREAKDOWN
-    {'─' * 80}
-    {chr(10).join([f"• {item}" for item in final_report.specific_scores]) if final_report.specific_scores else "No data available"}
-
-    🌍 LOCATION & LOGISTICS
-    {'─' * 80}
-    {chr(10).join([f"• {item}" for item in final_report.location_logistics]) if final_report.location_logistics else "No data available"}
-
-    💰 SALARY EXPECTATIONS
-    {'─' * 80}
-    {chr(10).join([f"• {item}" for item in final_report.salary_expectations]) if final_report.salary_expectations else "No data available"}
-
-    🔍 OVERALL ASSESSMENT
-    {'─' * 80}
-    {chr(10).join([f"• {item}" for item in final_report.overall_assessment]) if final_report.overall_assessment else "No data available"}
-
-    Test Performance Impact: {final_report.test_performance_impact}
-
-    💪 TOP STRENGTHS
-    {'─' * 80}
-    {chr(10).join([f"• {item}" for item in final_report.top_strengths]) if final_report.top_strengths else "None identified"}
+            if stream:
+                return self._stream_final_report(final_report)
+            # Same sections, in the same order, as the streamed report
+            report = "".join(self._render_report_section(field, getattr(final_report, field))
+                             for field in REPORT_ORDER) + self._final_report_footer()
+            self.log_event("final_report", {"final_report": final_report.model_dump(), "report": report})
+            return report
 
-    ⚠️  AREAS OF CONCERN
-    {'─' * 80}
-    {chr(10).join([f"• {item}" for item in final_report.concerns]) if final_report.concerns else "None identified"}
-
-    💡 RECOMMENDATIONS
-    {'─' * 80}
-    {chr(10).join([f"• {item}" for item in final_report.recommendations]) if final_report.recommendations else "None identified"}
-
-    🚀 SUGGESTED NEXT STEPS
-    {'─' * 80}
-    {chr(10).join([f"• {item}" for item in final_report.next_steps]) if final_report.next_steps else "None identified"}
-
-    ⏰ TIMELINE RECOMMENDATION
-    {'─' * 80}
-    {final_report.timeline_recommendation}
+        except Exception as e:
+            print("Failed to generate final recommendation:", e)
+            raise
 
-    {'═' * 80}
+    def _final_report_footer(self) -> str:
+        """Process completion notice appended to every final report"""
+        return f"""{'═' * 80}
 
     🎉 PROCESS COMPLETION NOTICE
     {'─' * 80}
@@ -658,12 +1125,46 @@ class HiringAgent:
     {'═' * 80}
     Thank you for your participation! We appreciate your time and effort.
     Report Generated: {self._get_timestamp()}
-    {'═' * 80}
-        """.strip()
-
+    {'═' * 80}"""
+
+    def _render_report_section(self, field: str, value) -> str:
+        """Render one FinalCandidateReport field as it arrives from the stream"""
+        if field == "final_decision":
+            return f"🎯 FINAL DECISION: {str(value).upper()}\n\n"
+        if field == "overall_score":
+            return f"Overall Score: {value}/100\n\n"
+        if field == "test_performance_impact":
+            return f"Test Performance Impact: {value}\n\n"
+        if field == "timeline_recommendation":
+            return f"⏰ TIMELINE RECOMMENDATION\n\n{'─' * 80}\n\n{value}\n\n"
+
+        title, empty = REPORT_SECTIONS.get(field, (field, "No data available"))
+        items = "\n".join([f"• {item}" for item in value]) if value else empty
+        return f"{title}\n\n{'─' * 80}\n\n{items}\n\n"
+
+    async def _stream_final_report(self, fields):
+        """Stream the final report section by section in REPORT_ORDER
+
+        Fields arrive in schema order, so sections that arrive ahead of their
+        turn (everything before the decision and score) are held back until
+        the sections preceding them have been sent.
+        """
+        report, pending, sections = {}, {}, []
+        try:
+            async for field, value in fields:
+                report[field] = value
+                pending[field] = self._render_report_section(field, value)
+                while len(sections) < len(REPORT_ORDER) and REPORT_ORDER[len(sections)] in pending:
+                    section = pending.pop(REPORT_ORDER[len(sections)])
+                    sections.append(section)
+                    yield section
         except Exception as e:
             print("Failed to generate final recommendation:", e)
-            raise
+            yield LLM_ERROR_MESSAGE
+            return
+        footer = self._final_report_footer()
+        self.log_event("final_report", {"final_report": report, "report": "".join(sections) + footer})
+        yield footer
 
 
     def greet_candidate(self) -> str:
@@ -711,7 +1212,8 @@ class HiringAgent:
         except Exception as e:
             return f"⚠️ Error ending conversation: {e}"
         
-    def get_response(self, chat_history: list):
+    async def get_response(self, chat_history: list, stream: bool = False):
+        """Route the turn to a tool; with stream=True long replies come back as an async text generator"""
         system_prompt = f"""
 You are an advanced AI Interview Assistant for TalenScout.
 
@@ -742,7 +1244,7 @@ You will now continue the session using the correct tool.
 
 chat_history:
 """
-        def _make_llm_call(messages, is_retry=False):
+        async def _make_llm_call(messages, is_retry=False):
             """Helper function to make LLM call with retry logic"""
             retry_suffix = """
 
@@ -752,27 +1254,40 @@ chat_history:
                 # Add explicit instruction for retry
                 messages[-1]["content"] += retry_suffix
 
-            response = self.client.beta.chat.completions.parse(
-                model="gemini-2.0-flash",
-                messages=messages,
-                tools=tools,
-                tool_choice="required"
-            )
+            call_site = "get_response._make_llm_call.retry" if is_retry else "get_response"
+            with llm_span_context(session_id=self.session_id, call_site=call_site, call_type="routing"):
+                response = await self.llm.complete(
+                    "tools",
+                    priority=PRIORITY_INTERACTIVE,
+                    messages=messages,
+                    tools=tools,
+                    tool_choice="required"
+                )
             return response
 
         try:
-            max_chat_history = 4
-            if chat_history is not None:
-                max_chat_history = max_chat_history if max_chat_history < len(chat_history) else int(len(chat_history) - 1)
-            
-            # Add actual chat history here
-            messages = [{"role": "system", "content": system_prompt}] + chat_history[-max_chat_history:]
-
-            # Add optional message if needed
-            messages.append({"role": "user", "content": "Please continue the interview based on the previous conversation."})
+            last_user_message = next((m["content"] for m in reversed(chat_history or []) if m["role"] == "user"), "")
+            tool_name = self.router.route(
+                interview_phase=self.interview_phase,
+                current_question_index=self.current_question_index,
+                total_questions=len(self.screening_questions),
+                analysis_done=self.analysis_done,
+                last_user_message=last_user_message,
+            )
+            if tool_name:
+                print(f"\ntool selected locally: {tool_name} (router stats: {self.router.stats()})\n")
+                return await self._run_tool(tool_name, chat_history, stream)
+
+            # Add actual chat history here, within the routing token budget
+            messages = self.context.build(
+                call_type="routing",
+                system_prompt=system_prompt,
+                user_message="Please continue the interview based on the previous conversation.",
+                history=chat_history,
+            )
 
             # First attempt
-            response = _make_llm_call(messages, is_retry=False)
+            response = await _make_llm_call(messages, is_retry=False)
 
             # Defensive check
             if not response.choices:
@@ -785,7 +1300,7 @@ chat_history:
             if not tool_calls:
                 print("⚠️ No tool selected on first attempt. Retrying with explicit instructions...")
                 try:
-                    response = _make_llm_call(messages, is_retry=True)
+                    response = await _make_llm_call(messages, is_retry=True)
                     message = response.choices[0].message
                     tool_calls = getattr(message, "tool_calls", [])
                     
@@ -794,24 +1309,23 @@ chat_history:
                 except Exception as retry_error:
                     return f"⚠️ Retry failed: {retry_error}"
 
-            print(f"\ntool called by LLM: {tool_calls}\n")
+            print(f"\ntool called by LLM: {tool_calls} (router stats: {self.router.stats()})\n")
             tool_call = tool_calls[0]
             tool_name = tool_call.function.name
-            tool_args = json.loads(tool_call.function.arguments)
-
-            # Handle tool execution
-            if tool_name == "take_interview":
-                result = self.take_interview(chat_history=chat_history)
-            elif tool_name == "analyze_candidate_performance":
-                result = self.analyze_candidate_performance(chat_history=chat_history)
-            elif tool_name == "generate_final_recommendation":
-                result = self.generate_final_recommendation(chat_history=chat_history)
-            elif tool_name == "end_conversation":
-                result = self.end_conversation()
-            else:
-                result = f"⚠️ Unknown tool selected: {tool_name}. Available tools: take_interview, analyze_candidate_performance, generate_final_recommendation, end_conversation"
 
-            return result
+            return await self._run_tool(tool_name, chat_history, stream)
 
         except Exception as e:
             return f"⚠️ Internal Error in get_response: {e}"
+
+    async def _run_tool(self, tool_name: str, chat_history: list, stream: bool = False):
+        """Execute the tool chosen by the router or the LLM"""
+        if tool_name == "take_interview":
+            return await self.take_interview(chat_history=chat_history, stream=stream)
+        elif tool_name == "analyze_candidate_performance":
+            return await self.analyze_candidate_performance(chat_history=chat_history, stream=stream)
+        elif tool_name == "generate_final_recommendation":
+            return await self.generate_final_recommendation(chat_history=chat_history, stream=stream)
+        elif tool_name == "end_conversation":
+            return self.end_conversation()
+        return f"⚠️ Unknown tool selected: {tool_name}. Available tools: take_interview, analyze_candidate_performance, generate_final_recommendation, end_conversation"
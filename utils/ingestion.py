@@ -0,0 +1,206 @@
+"""
+Background ingestion of candidate submissions.
+
+Submitting the form used to save the resume, parse it, rewrite
+the candidates CSV and wait for the balloons on the Streamlit script thread,
+freezing the candidate's browser meanwhile. The form now only queues a job;
+a small worker pool runs the stages and the chat tab polls the job:
+
+1. ``save``: store the uploaded resume in the content-addressed blob store
+   (``blob_store``); a file uploaded before is not written again
+2. ``parse``: extract the resume text (``parser.extract_text``), or reuse the
+   text stored next to the blob
+3. ``match``: rank every open position for the resume and tech stack with the
+   local BM25 matcher (``jd_matcher``); the best position, the applied
+   position's fit and a mismatch flag are stored with the candidate
+4. ``persist``: insert the candidate into the candidate store (``candidate_store``)
+5. ``prewarm``: create the ``HiringAgent`` and start its resume summary and
+   question generation on the shared LLM loop
+
+Jobs are keyed by session id and kept in memory for ``JOB_TTL_SECONDS``.
+"""
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional
+
+from utils.blob_store import BlobRef, get_blob_store
+from utils.candidate_store import get_candidate_store
+from utils.jd_matcher import fit_summary, get_jd_matcher
+from utils.parse_docsuments import parser
+
+
+INGESTION_WORKERS = int(os.environ.get("INGESTION_WORKERS", 4))
+JOB_TTL_SECONDS = 3600
+
+STAGES = ("queued", "save", "parse", "match", "persist", "prewarm", "done")
+STAGE_LABELS = {
+    "queued": "Waiting for a worker",
+    "save": "Saving the resume",
+    "parse": "Reading the resume",
+    "match": "Matching open positions",
+    "persist": "Recording the submission",
+    "prewarm": "Preparing the interview",
+    "done": "Ready",
+}
+
+
+@dataclass
+class IngestionJob:
+    job_id: str
+    candidate_data: dict
+    resume_bytes: bytes
+    resume_ext: str
+    add_data: dict = field(default_factory=dict)
+    jd_details: object = None
+    stage: str = "queued"
+    status: str = "queued"
+    error: Optional[str] = None
+    resume_path: Optional[str] = None
+    resume_blob: Optional[BlobRef] = None
+    resume_text: str = ""
+    parse_cached: bool = False
+    jd_matches: list = field(default_factory=list)
+    agent: object = None
+    agent_init: object = None
+    timings: dict = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    @property
+    def progress(self) -> float:
+        return STAGES.index(self.stage) / (len(STAGES) - 1)
+
+    @property
+    def label(self) -> str:
+        return STAGE_LABELS.get(self.stage, self.stage)
+
+
+class IngestionPipeline:
+    def __init__(self, workers: int = INGESTION_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingestion")
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._parser = parser()
+
+    def submit(self, candidate_data: dict, resume_bytes: bytes, resume_ext: str, add_data: dict = None,
+               jd_details=None, job_id: str = None) -> IngestionJob:
+        """Queue a submission and return its job right away"""
+        job = IngestionJob(
+            job_id=job_id or candidate_data.get("session_id") or uuid.uuid4().hex,
+            candidate_data=dict(candidate_data),
+            resume_bytes=resume_bytes,
+            resume_ext=resume_ext,
+            add_data=add_data or {},
+            jd_details=jd_details,
+        )
+        with self._lock:
+            self._expire()
+            self._jobs[job.job_id] = job
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _expire(self):
+        cutoff = time.time() - JOB_TTL_SECONDS
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished and job.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def _stage(self, job: IngestionJob, stage: str, func):
+        job.stage = stage
+        started = time.perf_counter()
+        func(job)
+        job.timings[stage] = round(time.perf_counter() - started, 3)
+
+    def _run(self, job: IngestionJob):
+        job.status = "running"
+        try:
+            self._stage(job, "save", self._save)
+            self._stage(job, "parse", self._parse)
+            self._stage(job, "match", self._match)
+            self._stage(job, "persist", self._persist)
+            self._stage(job, "prewarm", self._prewarm)
+            job.stage, job.status = "done", "done"
+            print(f"[INGESTION] Job {job.job_id} done: {job.timings}")
+        except Exception as e:
+            job.status, job.error = "failed", f"{type(e).__name__}: {e}"
+            print(f"[ERROR] Ingestion job {job.job_id} failed at '{job.stage}': {e}")
+        finally:
+            # The upload is on disk now; do not keep it in memory with the job
+            job.resume_bytes = b""
+            job.finished_at = time.time()
+
+    def _save(self, job: IngestionJob):
+        job.resume_blob = get_blob_store().put(job.resume_bytes, job.resume_ext)
+        job.resume_path = job.resume_blob.path
+        job.candidate_data["resume_path"] = job.resume_path
+        job.candidate_data["resume_sha256"] = job.resume_blob.sha256
+
+    def _parse(self, job: IngestionJob):
+        blob_store = get_blob_store()
+        cached = blob_store.get_text(job.resume_blob.sha256)
+        if cached is not None:
+            job.resume_text, job.parse_cached = cached, True
+            print(f"[INGESTION] Reusing extracted text of resume {job.resume_blob.sha256[:12]}")
+            return
+        with blob_store.open_path(job.resume_blob) as path:
+            job.resume_text = self._parser.extract_text(doc_path=path)
+        # Empty text usually means a failed read; leave it to be tried again on the next upload
+        if job.resume_text.strip():
+            blob_store.put_text(job.resume_blob.sha256, job.resume_text)
+        print(f"\nparsed_resume_data: \n {job.resume_text}")
+
+    def _match(self, job: IngestionJob):
+        # Pre-scoring only informs recruiters; a failure here must not block the interview
+        try:
+            job.jd_matches = get_jd_matcher().rank(job.resume_text, job.candidate_data.get("tech_stack", ""))
+        except Exception as e:
+            print(f"[WARNING] JD pre-scoring failed for job {job.job_id}: {e}")
+            return
+        summary = fit_summary(job.jd_matches, job.candidate_data.get("position_applied"))
+        job.candidate_data.update(summary)
+        if summary["fit_mismatch"]:
+            print(f"[INGESTION] Job {job.job_id} applied for {job.candidate_data.get('position_applied')} "
+                  f"(fit {summary['applied_fit_score']}) but fits {summary['best_fit_position']} best "
+                  f"(fit {summary['best_fit_score']})")
+
+    def _persist(self, job: IngestionJob):
+        get_candidate_store().add(job.candidate_data)
+
+    def _prewarm(self, job: IngestionJob):
+        from utils.hiring_agent import HiringAgent
+        from utils.llm_client import submit
+
+        job.agent = HiringAgent(
+            candidate_details=job.candidate_data,
+            resume_details={"resume_details": str(job.resume_text)},
+            add_details=job.add_data,
+            jd_details=job.jd_details,
+            session_id=job.job_id,
+        )
+        # Resume summary and question generation run on the shared loop; the job does not wait for them
+        job.agent_init = submit(job.agent.init_func())
+
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def get_ingestion_pipeline() -> IngestionPipeline:
+    """Return the process-wide ingestion pipeline"""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = IngestionPipeline()
+    return _pipeline
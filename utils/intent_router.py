@@ -0,0 +1,92 @@
+"""
+Local, deterministic tool routing for HiringAgent.get_response.
+
+Most turns can be routed from the interview state alone (phase, question
+index, analysis status) plus simple keyword matching on the candidate's last
+message. Only genuinely ambiguous input is left for the tool-calling LLM.
+"""
+
+import re
+import threading
+from typing import Optional
+
+
+END_PATTERN = re.compile(
+    r"^\s*(?:end_chat|end_conversation|exit|quit|stop|bye|goodbye"
+    r"|(?:please\s+)?(?:end|stop|finish|close|terminate)\s+(?:the\s+|this\s+)?(?:chat|interview|conversation|session)"
+    r"|no\s+more\s+questions)\s*[.!]*\s*$",
+    re.IGNORECASE,
+)
+ANALYSIS_PATTERN = re.compile(
+    r"\b(?:analy[sz]e|analy[sz]is|analy[sz]ing|performance|evaluat(?:e|ion)|feedback|score|how\s+did\s+i\s+do)\b",
+    re.IGNORECASE,
+)
+RECOMMENDATION_PATTERN = re.compile(
+    r"\b(?:recommend(?:ation)?|final\s+(?:decision|report|verdict)|hiring\s+decision|verdict|report|summary|decision)\b",
+    re.IGNORECASE,
+)
+
+
+class IntentRouter:
+    """Pick the get_response tool locally whenever the interview state makes the choice unambiguous"""
+
+    TOOLS = ("take_interview", "analyze_candidate_performance", "generate_final_recommendation", "end_conversation")
+
+    # Process-wide totals across every session's router
+    _totals = {"local": 0, "llm": 0}
+    _totals_lock = threading.Lock()
+
+    def __init__(self):
+        self.local_routes = 0
+        self.llm_routes = 0
+
+    def route(self, interview_phase: str, current_question_index: int, total_questions: int,
+              analysis_done: bool, last_user_message: str) -> Optional[str]:
+        """Return the tool name for this turn, or None when the LLM should decide"""
+        message = (last_user_message or "").strip()
+        tool = self._decide(interview_phase, current_question_index, total_questions, analysis_done, message)
+        if tool is None:
+            print(f"[ROUTER] Ambiguous input in phase '{interview_phase}' "
+                  f"(question {current_question_index}/{total_questions}), deferring to LLM")
+        self._record(tool is not None)
+        return tool
+
+    def _decide(self, phase, index, total, analysis_done, message):
+        if END_PATTERN.match(message):
+            return "end_conversation"
+
+        if phase in ("casual_chat", "structured_questions"):
+            # Until the last answer is in, every message is an answer or a nudge to continue
+            return "take_interview"
+
+        if phase == "post_interview":
+            wants_analysis = bool(ANALYSIS_PATTERN.search(message))
+            wants_recommendation = bool(RECOMMENDATION_PATTERN.search(message))
+            if wants_recommendation and not wants_analysis:
+                return "generate_final_recommendation"
+            if wants_analysis and not wants_recommendation:
+                return "analyze_candidate_performance"
+            if wants_analysis and wants_recommendation:
+                # Asked for both: the final report already folds in a finished analysis
+                return "generate_final_recommendation" if analysis_done else "analyze_candidate_performance"
+        return None
+
+    def _record(self, resolved_locally: bool):
+        key = "local" if resolved_locally else "llm"
+        if resolved_locally:
+            self.local_routes += 1
+        else:
+            self.llm_routes += 1
+        with self._totals_lock:
+            self._totals[key] += 1
+
+    def stats(self) -> dict:
+        """Routing counts for this router and across the process"""
+        with self._totals_lock:
+            totals = dict(self._totals)
+        return {
+            "local": self.local_routes,
+            "llm": self.llm_routes,
+            "process_local": totals["local"],
+            "process_llm": totals["llm"],
+        }
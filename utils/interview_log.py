@@ -0,0 +1,185 @@
+"""
+Append-only event log of interviews.
+
+One SQLite table holds everything a recruiter may want to look back at:
+
+- ``questions``: the screening question set generated (or reused) for a session
+- ``turn``: every chat message, candidate and assistant, in order
+- ``evaluation``: per-question scores and the formatted evaluation
+- ``final_report``: the final recommendation
+
+Rows are never updated. Events are indexed by session id and by candidate
+(email, else name), so past sessions can be queried without globbing a
+directory of per-session files:
+
+    python -m utils.interview_log session <session_id>
+    python -m utils.interview_log candidate <email>
+
+``append`` only enqueues the event; a background thread writes queued events
+in one transaction per batch, so logging a turn adds no latency to the chat.
+The returned future resolves to the event id once the batch is committed.
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Optional
+
+
+INTERVIEW_LOG_PATH = os.path.join("submissions", "interview_log.sqlite3")
+INTERVIEW_LOG_REF = "interview_log:"
+BATCH_SIZE = 200
+
+
+def interview_log_ref(event_id: int) -> str:
+    """Reference to a logged event, usable wherever a question file path was stored"""
+    return f"{INTERVIEW_LOG_REF}{event_id}"
+
+
+def parse_interview_log_ref(ref: str) -> Optional[int]:
+    if ref and str(ref).startswith(INTERVIEW_LOG_REF):
+        return int(str(ref)[len(INTERVIEW_LOG_REF):])
+    return None
+
+
+class InterviewLog:
+    def __init__(self, db_path: str = INTERVIEW_LOG_PATH, batch_size: int = BATCH_SIZE):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT NOT NULL,
+                    candidate TEXT,
+                    event_type TEXT NOT NULL,
+                    turn INTEGER,
+                    created_at REAL NOT NULL,
+                    payload TEXT NOT NULL
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS events_session ON events (session_id, id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS events_candidate ON events (candidate, id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS events_type ON events (event_type, created_at)")
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="interview-log-writer", daemon=True)
+        self._writer.start()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def append(self, event_type: str, session_id: str, payload: dict, candidate: str = None,
+               turn: int = None) -> Future:
+        """Queue an event; the future resolves to its id once written"""
+        future = Future()
+        self._queue.put((session_id, candidate, event_type, turn, time.time(),
+                         json.dumps(payload, default=str), future))
+        return future
+
+    def flush(self, timeout: float = 10.0):
+        """Wait until everything queued so far is written"""
+        marker = Future()
+        self._queue.put(marker)
+        marker.result(timeout=timeout)
+
+    def _write_loop(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            events = [item for item in batch if not isinstance(item, Future)]
+            written = []
+            try:
+                with conn:
+                    for *row, future in events:
+                        cursor = conn.execute(
+                            "INSERT INTO events (session_id, candidate, event_type, turn, created_at, payload) "
+                            "VALUES (?, ?, ?, ?, ?, ?)", row)
+                        written.append((future, cursor.lastrowid))
+                for future, event_id in written:
+                    future.set_result(event_id)
+            except Exception as e:
+                print(f"[ERROR] Failed to write {len(events)} interview log events: {e}")
+                for *_, future in events:
+                    if not future.done():
+                        future.set_exception(e)
+            for item in batch:
+                if isinstance(item, Future):
+                    item.set_result(None)
+
+    def _rows(self, query: str, params: tuple) -> list:
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [
+            {"id": row[0], "session_id": row[1], "candidate": row[2], "event_type": row[3], "turn": row[4],
+             "created_at": row[5], "payload": json.loads(row[6])}
+            for row in rows
+        ]
+
+    def get_event(self, event_id: int) -> Optional[dict]:
+        rows = self._rows("SELECT * FROM events WHERE id = ?", (event_id,))
+        return rows[0] if rows else None
+
+    def session_events(self, session_id: str, event_type: str = None) -> list:
+        """A session's events in order, optionally of one type"""
+        if event_type:
+            return self._rows("SELECT * FROM events WHERE session_id = ? AND event_type = ? ORDER BY id",
+                              (session_id, event_type))
+        return self._rows("SELECT * FROM events WHERE session_id = ? ORDER BY id", (session_id,))
+
+    def transcript(self, session_id: str) -> list:
+        return [event["payload"] for event in self.session_events(session_id, "turn")]
+
+    def candidate_sessions(self, candidate: str) -> list:
+        """Sessions of a candidate, newest first, with their event counts and time span"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT session_id, MIN(created_at), MAX(created_at), COUNT(*), "
+                "SUM(event_type = 'turn'), MAX(event_type = 'final_report') "
+                "FROM events WHERE candidate = ? GROUP BY session_id ORDER BY MAX(id) DESC",
+                (candidate,),
+            ).fetchall()
+        return [
+            {"session_id": row[0], "started_at": row[1], "last_event_at": row[2], "events": row[3],
+             "turns": row[4], "has_final_report": bool(row[5])}
+            for row in rows
+        ]
+
+
+_interview_log = None
+_interview_log_lock = threading.Lock()
+
+
+def get_interview_log() -> InterviewLog:
+    """Return the process-wide interview log"""
+    global _interview_log
+    with _interview_log_lock:
+        if _interview_log is None:
+            _interview_log = InterviewLog()
+    return _interview_log
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 3 or sys.argv[1] not in ("session", "candidate"):
+        print("Usage: python -m utils.interview_log session <session_id> | candidate <email or name>")
+        sys.exit(2)
+    log = get_interview_log()
+    result = log.session_events(sys.argv[2]) if sys.argv[1] == "session" else log.candidate_sessions(sys.argv[2].lower())
+    print(json.dumps(result, indent=2, ensure_ascii=False))
@@ -0,0 +1,290 @@
+"""
+Local resume-to-JD fit scoring across every open position.
+
+Fit used to be judged only by the LLM in ``generate_final_recommendation``,
+for the one position the candidate picked. ``JDMatcher`` scores a resume
+(plus the form's ``tech_stack``) against all JDs at once, with no LLM call:
+
+- every JD in the JD store is tokenized into unigrams and bigrams, and the
+  JD x term matrix is weighted with BM25 (``k1``, ``b``) as a SciPy CSR matrix
+- a resume becomes a sparse query row: 1 per term it contains, plus
+  ``TECH_STACK_WEIGHT`` per term of its tech stack
+- ``scores = W @ q`` scores every position in one sparse product; ``fit``,
+  the share (0-100) of a JD's total BM25 weight the resume covers, ranks them
+- matched skills are the shared terms with the largest contributions
+
+``rank_many`` scores a batch with a single product, and ``score_candidates``
+runs over the whole candidate store using the extracted text kept by the
+blob store:
+
+    python -m utils.jd_matcher resume path/to/resume.pdf --tech-stack "Python, SQL"
+    python -m utils.jd_matcher batch --csv submissions/jd_fit.csv
+
+The matcher is rebuilt only when a JD is added, removed or changed.
+"""
+
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+from scipy import sparse
+
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+TECH_STACK_WEIGHT = 2.0
+MATCHED_SKILLS = 8
+# A candidate is flagged when the applied position's fit is below MISMATCH_RATIO of the best position's fit,
+# or below MISMATCH_FIT
+MISMATCH_RATIO = 0.5
+MISMATCH_FIT = 2.0
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+# Bigrams never span list separators or sentence ends
+SEGMENT_PATTERN = re.compile(r"[,;:|()\[\]\n\u2022]|\.\s")
+SHORT_TERMS = {"c", "r", "go", "ai", "ml", "ui", "ux", "qa", "bi", "c#", "c++"}
+TERM_ALIASES = {
+    "cpp": "c++", "golang": "go", "js": "javascript", "ts": "typescript", "k8s": "kubernetes",
+    "postgres": "postgresql", "nodejs": "node.js", "reactjs": "react", "py": "python",
+}
+STOPWORDS = set("""
+a about above after again all also am an and any are as at be been being below between both but by can could
+did do does doing during each etc few for from further had has have having he her here hers him his how i if in
+into is it its itself just me more most my no nor not now of off on once only or other our ours out over own per
+same she should so some such than that the their theirs them then there these they this those through to too
+under until up us very via was we were what when where which while who whom why will with within without would
+you your yours
+able ability across candidate candidates company degree equivalent etc experience good great job looking must
+plus preferred required requirements responsibilities role strong team work working years year skills skill
+knowledge understanding including using use well new join talentscout talenscout
+""".split())
+
+
+def tokenize(text: str) -> list:
+    """Lowercase terms of a text: tech tokens such as c++, c# and node.js are kept whole"""
+    tokens = []
+    for token in TOKEN_PATTERN.findall((text or "").lower()):
+        token = token.rstrip(".")
+        token = TERM_ALIASES.get(token, token)
+        if token in STOPWORDS or token.isdigit() or (len(token) < 3 and token not in SHORT_TERMS):
+            tokens.append(None)
+        else:
+            tokens.append(token)
+    return tokens
+
+
+def extract_terms(text: str) -> Counter:
+    """Unigram and adjacent-bigram counts; stopwords and punctuation break bigrams"""
+    terms = Counter()
+    for segment in SEGMENT_PATTERN.split(text or ""):
+        tokens = tokenize(segment)
+        terms.update(token for token in tokens if token)
+        terms.update(f"{left} {right}" for left, right in zip(tokens, tokens[1:]) if left and right)
+    return terms
+
+
+def tech_stack_terms(tech_stack: str) -> set:
+    """Terms of the comma-separated tech stack field, each entry tokenized on its own"""
+    terms = set()
+    for entry in re.split(r"[,;/\n]", tech_stack or ""):
+        terms.update(extract_terms(entry))
+    return terms
+
+
+@dataclass(frozen=True)
+class JDMatch:
+    position: str
+    rank: int
+    score: float
+    fit: float
+    matched_skills: tuple
+
+
+class JDMatcher:
+    def __init__(self, jd_texts: dict, k1: float = BM25_K1, b: float = BM25_B, signature: tuple = ()):
+        """Build the BM25 JD x term matrix from position -> JD text"""
+        self.positions = list(jd_texts)
+        self.signature = signature
+        counts = [extract_terms(jd_texts[position]) for position in self.positions]
+        self.vocabulary = {term: index for index, term in enumerate(sorted(set().union(*counts)))}
+        self.terms = np.array(sorted(self.vocabulary, key=self.vocabulary.get), dtype=object)
+
+        rows, cols, data = [], [], []
+        for row, terms in enumerate(counts):
+            rows += [row] * len(terms)
+            cols += [self.vocabulary[term] for term in terms]
+            data += list(terms.values())
+        tf = sparse.csr_matrix((data, (rows, cols)), shape=(len(self.positions), len(self.vocabulary)), dtype=np.float64)
+
+        n_docs = max(len(self.positions), 1)
+        doc_freq = np.bincount(tf.indices, minlength=len(self.vocabulary))
+        idf = np.log(1.0 + (n_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+        doc_len = np.asarray(tf.sum(axis=1)).ravel()
+        norm = k1 * (1 - b + b * doc_len / (doc_len.mean() if doc_len.size and doc_len.mean() else 1.0))
+
+        # BM25 term weight per (JD, term), computed on the stored non-zeros only
+        weights = tf.copy()
+        row_norm = np.repeat(norm, np.diff(tf.indptr))
+        weights.data = idf[tf.indices] * tf.data * (k1 + 1) / (tf.data + row_norm)
+        self.weights = weights
+        self.max_scores = np.asarray(weights.sum(axis=1)).ravel()
+
+    def query_matrix(self, items: list) -> sparse.csr_matrix:
+        """Sparse rows of (resume text, tech stack) pairs over the JD vocabulary"""
+        rows, cols, data = [], [], []
+        for row, (resume_text, tech_stack) in enumerate(items):
+            query = {}
+            for term in extract_terms(resume_text):
+                if term in self.vocabulary:
+                    query[self.vocabulary[term]] = 1.0
+            for term in tech_stack_terms(tech_stack):
+                if term in self.vocabulary:
+                    query[self.vocabulary[term]] = query.get(self.vocabulary[term], 0.0) + TECH_STACK_WEIGHT
+            rows += [row] * len(query)
+            cols += list(query)
+            data += list(query.values())
+        return sparse.csr_matrix((data, (rows, cols)), shape=(len(items), len(self.vocabulary)), dtype=np.float64)
+
+    def rank_many(self, items: list, top_k: Optional[int] = None, skills: int = MATCHED_SKILLS) -> list:
+        """Rank every position for each (resume text, tech stack) pair with one sparse product"""
+        if not items or not self.positions:
+            return [[] for _ in items]
+        queries = self.query_matrix(items)
+        scores = (queries @ self.weights.T).toarray()
+        # Tech stack terms weigh more than 1, so a query can exceed a JD's own total weight
+        fits = np.minimum(100.0 * scores / np.where(self.max_scores > 0, self.max_scores, 1.0), 100.0)
+
+        results = []
+        for row in range(len(items)):
+            # By fit, so long JDs do not outrank on raw BM25 score alone; ties by score
+            order = np.lexsort((-scores[row], -fits[row]))[:top_k]
+            # Per-term contributions to every JD's score: W scaled column-wise by the query row
+            contributions = (self.weights @ sparse.diags(queries.getrow(row).toarray().ravel())).tocsr()
+            contributions.eliminate_zeros()
+            matches = []
+            for rank, jd_row in enumerate(order, start=1):
+                start, end = contributions.indptr[jd_row], contributions.indptr[jd_row + 1]
+                ranked = contributions.indices[start:end][np.argsort(-contributions.data[start:end], kind="stable")]
+                matches.append(JDMatch(
+                    position=self.positions[jd_row],
+                    rank=rank,
+                    score=round(float(scores[row, jd_row]), 3),
+                    fit=round(float(fits[row, jd_row]), 1),
+                    matched_skills=self._skill_names(ranked, skills),
+                ))
+            results.append(matches)
+        return results
+
+    def _skill_names(self, term_indices, limit: int) -> tuple:
+        """Top terms by contribution, preferring a matched bigram over its single words"""
+        terms = self.terms[term_indices]
+        in_bigrams = {word for term in terms if " " in term for word in term.split()}
+        return tuple([term for term in terms if " " in term or term not in in_bigrams][:limit])
+
+    def rank(self, resume_text: str, tech_stack: str = "", top_k: Optional[int] = None) -> list:
+        """Positions ranked by fit for one resume, best first"""
+        return self.rank_many([(resume_text, tech_stack)], top_k=top_k)[0]
+
+
+def fit_summary(matches: list, position_applied: str) -> dict:
+    """Applied-position rank and fit next to the best position, with a mismatch flag"""
+    applied = next((match for match in matches if match.position == position_applied), None)
+    best = matches[0] if matches else None
+    return {
+        "best_fit_position": best.position if best else None,
+        "best_fit_score": best.fit if best else None,
+        "applied_fit_rank": applied.rank if applied else None,
+        "applied_fit_score": applied.fit if applied else None,
+        "fit_mismatch": bool(applied and (applied.fit < MISMATCH_RATIO * best.fit or applied.fit < MISMATCH_FIT)),
+    }
+
+
+def score_candidates(matcher: "JDMatcher" = None, top_k: int = 3) -> list:
+    """Rank the JDs for every stored candidate whose extracted resume text is available"""
+    from utils.blob_store import get_blob_store
+    from utils.candidate_store import get_candidate_store
+
+    matcher = matcher or get_jd_matcher()
+    blob_store = get_blob_store()
+    rows, items = [], []
+    for row in get_candidate_store().iter_rows():
+        resume_text = blob_store.get_text(row["resume_sha256"]) if row.get("resume_sha256") else None
+        if resume_text is None:
+            continue
+        rows.append(row)
+        items.append((resume_text, row.get("tech_stack") or ""))
+
+    results = []
+    for row, matches in zip(rows, matcher.rank_many(items)):
+        results.append({
+            "session_id": row.get("session_id"),
+            "name": f"{row.get('first_name', '')} {row.get('last_name', '')}".strip(),
+            "email": row.get("email"),
+            "position_applied": row.get("position_applied"),
+            **fit_summary(matches, row.get("position_applied")),
+            "top_matches": [
+                {"position": match.position, "fit": match.fit, "matched_skills": list(match.matched_skills)}
+                for match in matches[:top_k]
+            ],
+        })
+    return results
+
+
+_jd_matcher = None
+_jd_matcher_lock = threading.Lock()
+
+
+def get_jd_matcher() -> JDMatcher:
+    """Return a matcher over the current JDs, rebuilt only when one was added, removed or changed"""
+    from utils.get_JDs import get_jd_options
+    from utils.jd_store import get_jd_store
+
+    global _jd_matcher
+    get_jd_options()
+    jd_store = get_jd_store()
+    documents = [jd_store.get(position) for position in jd_store.positions()]
+    documents = [document for document in documents if document is not None and document.content_hash]
+    signature = tuple(sorted((document.position, document.content_hash) for document in documents))
+    with _jd_matcher_lock:
+        if _jd_matcher is None or _jd_matcher.signature != signature:
+            _jd_matcher = JDMatcher({document.position: document.text for document in documents}, signature=signature)
+    return _jd_matcher
+
+
+if __name__ == "__main__":
+    import argparse
+    import csv
+    import json
+
+    arg_parser = argparse.ArgumentParser(description="Rank open positions for resumes without an LLM")
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+    resume_command = commands.add_parser("resume", help="rank the JDs for one resume file")
+    resume_command.add_argument("path")
+    resume_command.add_argument("--tech-stack", default="")
+    resume_command.add_argument("--top", type=int, default=5)
+    batch_command = commands.add_parser("batch", help="rank the JDs for every stored candidate")
+    batch_command.add_argument("--top", type=int, default=3)
+    batch_command.add_argument("--csv", dest="csv_path", default=None, help="write the summary to this CSV")
+    args = arg_parser.parse_args()
+
+    if args.command == "resume":
+        from utils.parse_docsuments import parser
+
+        for match in get_jd_matcher().rank(parser().extract_text(doc_path=args.path), args.tech_stack, top_k=args.top):
+            print(f"{match.rank}. {match.position:<20} fit {match.fit:>5.1f}  score {match.score:>7.3f}  "
+                  f"{', '.join(match.matched_skills)}")
+    else:
+        results = score_candidates(top_k=args.top)
+        if args.csv_path:
+            columns = ["session_id", "name", "email", "position_applied", "best_fit_position", "best_fit_score",
+                       "applied_fit_rank", "applied_fit_score", "fit_mismatch"]
+            with open(args.csv_path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+                writer.writeheader()
+                writer.writerows(results)
+            print(f"Scored {len(results)} candidates to {args.csv_path}")
+        else:
+            print(json.dumps(results, indent=2, ensure_ascii=False))
@@ -0,0 +1,195 @@
+"""
+Process-wide store of parsed job descriptions.
+
+Every browser session used to parse every JD file into its own
+``jd_content_dict`` and hand the whole dict to its ``HiringAgent``. The store
+parses each file once per process and shares the immutable result:
+
+- an entry is revalidated with a ``stat`` on access; only when the mtime or
+  size changed is the file hashed, and only when the SHA-256 changed is it
+  parsed again
+- concurrent sessions asking for the same file wait for a single parse
+- sessions get ``JDView``, a read-only mapping of position to JD text that
+  resolves through the store, so no session holds its own copy
+- ``sync_folder`` rescans the JD folder only when its mtime changed (a file
+  was added, removed or renamed), so a Streamlit rerun costs one ``stat``
+  instead of a glob and filename parsing; new and changed files are then
+  parsed in the background
+
+``JDDocument.jd_id`` is derived from the file content, so it stays the same
+across processes and restarts as long as the file does not change.
+"""
+
+import hashlib
+import os
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Optional
+
+from utils.parse_docsuments import parser
+
+
+@dataclass(frozen=True)
+class JDDocument:
+    jd_id: str
+    position: str
+    path: str
+    text: str
+    content_hash: str
+    mtime: float
+    size: int
+
+
+def _file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class JDStore:
+    def __init__(self):
+        self._paths = {}
+        self._documents = {}
+        self._lock = threading.Lock()
+        self._parse_locks = {}
+        self._parser = parser()
+        self._folder = None
+        self._folder_mtime = None
+        self._scan_lock = threading.Lock()
+        self.parses = 0
+        self.scans = 0
+
+    def register(self, jd_files: dict, warm: bool = True):
+        """Set the position -> file path mapping (e.g. from ``get_jd_options``)
+
+        With `warm`, files not parsed yet or changed since their last parse are
+        parsed on a background thread so the first session for a position does
+        not wait for it; up-to-date files only cost a ``stat`` there.
+        """
+        with self._lock:
+            self._paths = dict(jd_files or {})
+            for position in list(self._documents):
+                if position not in self._paths:
+                    del self._documents[position]
+            pending = list(self._paths)
+        if warm and pending:
+            threading.Thread(target=self._warm, args=(pending,), name="jd-store-warm", daemon=True).start()
+
+    def sync_folder(self, folder: str, scan, warm: bool = True) -> bool:
+        """Register the files `scan(folder)` maps to positions, rescanning only when the folder changed
+
+        Returns True when the folder was scanned.
+        """
+        with self._scan_lock:
+            try:
+                mtime = os.stat(folder).st_mtime_ns
+            except OSError:
+                mtime = None
+            if folder == self._folder and mtime == self._folder_mtime:
+                return False
+            # Taken before the scan, so a change during the scan is picked up by the next call
+            self._folder, self._folder_mtime = folder, mtime
+            self.register(scan(folder), warm=warm)
+            self.scans += 1
+            return True
+
+    def _warm(self, positions: list):
+        for position in positions:
+            self.get(position)
+
+    def positions(self) -> list:
+        with self._lock:
+            return list(self._paths)
+
+    def paths(self) -> dict:
+        """Position -> JD file path"""
+        with self._lock:
+            return dict(self._paths)
+
+    def get(self, position: str) -> Optional[JDDocument]:
+        """Return the parsed JD for a position, reparsing only if the file changed"""
+        with self._lock:
+            path = self._paths.get(position)
+            if path is None:
+                return None
+            parse_lock = self._parse_locks.setdefault(path, threading.Lock())
+
+        with parse_lock:
+            with self._lock:
+                current = self._documents.get(position)
+            try:
+                stat = os.stat(path)
+            except (OSError, TypeError):
+                return self._store(position, JDDocument("", position, path or "", "JD file not found or path is empty", "", 0.0, 0))
+
+            if current is not None and current.path == path and (current.mtime, current.size) == (stat.st_mtime, stat.st_size):
+                return current
+            content_hash = _file_hash(path)
+            if current is not None and current.path == path and current.content_hash == content_hash:
+                # Touched but unchanged: keep the parsed text
+                return self._store(position, JDDocument(current.jd_id, position, path, current.text, content_hash,
+                                                        stat.st_mtime, stat.st_size))
+
+            try:
+                text = self._parser.extract_text(doc_path=path)
+            except Exception as e:
+                print(f"Error parsing JD file {path}: {str(e)}")
+                text = f"Error parsing JD: {str(e)}"
+            self.parses += 1
+            return self._store(position, JDDocument(content_hash[:16], position, path, text, content_hash,
+                                                    stat.st_mtime, stat.st_size))
+
+    def _store(self, position: str, document: JDDocument) -> JDDocument:
+        with self._lock:
+            if self._paths.get(position) == document.path or not document.path:
+                self._documents[position] = document
+        return document
+
+    def view(self) -> "JDView":
+        return JDView(self)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"positions": len(self._paths), "parsed": len(self._documents), "parses": self.parses,
+                    "scans": self.scans}
+
+
+class JDView(Mapping):
+    """Read-only position -> JD text mapping backed by the shared store"""
+
+    def __init__(self, store: JDStore):
+        self._store = store
+
+    def __getitem__(self, position):
+        document = self._store.get(position)
+        if document is None:
+            raise KeyError(position)
+        return document.text
+
+    def __contains__(self, position):
+        return position in self._store.positions()
+
+    def __iter__(self):
+        return iter(self._store.positions())
+
+    def __len__(self):
+        return len(self._store.positions())
+
+    def document(self, position: str) -> Optional[JDDocument]:
+        return self._store.get(position)
+
+
+_jd_store = None
+_jd_store_lock = threading.Lock()
+
+
+def get_jd_store() -> JDStore:
+    """Return the process-wide JD store"""
+    global _jd_store
+    with _jd_store_lock:
+        if _jd_store is None:
+            _jd_store = JDStore()
+    return _jd_store
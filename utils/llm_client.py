@@ -0,0 +1,98 @@
+"""
+Process-wide async LLM client plumbing.
+
+Every HiringAgent shares one background event loop and one pooled
+``httpx.AsyncClient``, so TCP/TLS connections to the LLM endpoints are kept
+alive across sessions instead of being re-established for each candidate.
+Streamlit script threads hand coroutines to that loop with ``run_sync`` (wait
+for the result) or ``submit`` (fire and forget).
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+
+import httpx
+from openai import AsyncOpenAI
+
+
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE_CONNECTIONS = 20
+KEEPALIVE_EXPIRY = 120.0
+REQUEST_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+
+_lock = threading.Lock()
+_loop = None
+_http_client = None
+_clients = {}
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Return the shared background event loop, starting it on first use"""
+    global _loop
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="llm-event-loop", daemon=True)
+            thread.start()
+            _loop = loop
+    return _loop
+
+
+def submit(coro) -> Future:
+    """Schedule a coroutine on the shared loop and return a concurrent Future"""
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop())
+
+
+def run_sync(coro, timeout: float = None):
+    """Run a coroutine on the shared loop and block the calling thread until it finishes"""
+    loop = get_event_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_sync() cannot be called from the shared LLM event loop; await the coroutine instead")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the process-wide keep-alive connection pool"""
+    global _http_client
+    with _lock:
+        if _http_client is None or _http_client.is_closed:
+            _http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=KEEPALIVE_EXPIRY,
+                ),
+                timeout=REQUEST_TIMEOUT,
+            )
+    return _http_client
+
+
+def get_async_client(api_key: str, base_url: str) -> AsyncOpenAI:
+    """Return a cached AsyncOpenAI client for an endpoint, backed by the shared pool"""
+    http_client = get_http_client()
+    key = (api_key, base_url)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            # Retries are scheduled by utils.rate_limiter, so the SDK's own retry loop is disabled
+            client = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client, max_retries=0)
+            _clients[key] = client
+    return client
+
+
+def iter_sync(agen, timeout: float = None):
+    """Drive an async iterator on the shared loop from synchronous code such as st.write_stream"""
+    async def _next():
+        return await agen.__anext__()
+
+    while True:
+        try:
+            yield run_sync(_next(), timeout)
+        except StopAsyncIteration:
+            break
@@ -0,0 +1,338 @@
+"""
+Primary/fallback LLM provider layer.
+
+``ProviderRouter`` sends every call to the primary provider and fails over to
+the fallback on errors or timeouts. Each provider has a circuit breaker that
+opens after repeated failures so a dead endpoint is skipped instead of being
+waited on by every session. With hedging enabled, a call that has not come
+back from the primary within its observed p95 latency is also sent to the
+fallback and the first answer wins.
+
+Routers are shared process-wide so breaker state and latency statistics are
+pooled across sessions.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from utils.context_builder import count_tokens
+from utils.llm_client import get_async_client
+from utils.llm_tracing import get_tracer
+from utils.rate_limiter import PRIORITY_INTERACTIVE, RateLimiter
+
+
+# Per-kind request timeouts in seconds; "chat" and "structured" streams use them for opening the stream
+REQUEST_TIMEOUTS = {
+    "chat": 45.0,
+    "structured": 60.0,
+    "tools": 20.0,
+}
+# Rough completion sizes used to reserve tokens-per-minute before the real usage is known
+EXPECTED_OUTPUT_TOKENS = {
+    "chat": 300,
+    "structured": 1200,
+    "tools": 50,
+}
+LATENCY_WINDOW = 200
+MIN_SAMPLES_FOR_HEDGE = 20
+
+
+@dataclass
+class ProviderConfig:
+    name: str
+    api_key: str
+    base_url: str
+    models: Dict[str, str]
+    timeouts: Dict[str, float] = field(default_factory=lambda: dict(REQUEST_TIMEOUTS))
+    requests_per_minute: float = 60
+    tokens_per_minute: float = 250_000
+
+
+class CircuitBreaker:
+    """Closed → open after `failure_threshold` consecutive failures → half-open after `reset_timeout`"""
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow_request(self) -> bool:
+        # Half-open lets requests through as probes: one success closes the breaker, a failure re-opens it
+        return self.state != "open"
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.opened_at is not None or self.consecutive_failures >= self.failure_threshold:
+            if self.opened_at is None:
+                self.times_opened += 1
+            self.opened_at = time.monotonic()
+
+
+class LLMProvider:
+    def __init__(self, config: ProviderConfig, breaker: CircuitBreaker = None):
+        self.name = config.name
+        self.models = config.models
+        self.timeouts = config.timeouts
+        self.client = get_async_client(api_key=config.api_key, base_url=config.base_url)
+        self.breaker = breaker or CircuitBreaker()
+        self.limiter = RateLimiter(config.name, config.requests_per_minute, config.tokens_per_minute)
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.calls = 0
+        self.failures = 0
+        self.timeouts_hit = 0
+
+    def p95(self) -> Optional[float]:
+        """p95 latency of recent successful calls, or None until enough samples exist"""
+        if len(self.latencies) < MIN_SAMPLES_FOR_HEDGE:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def _request(self, kind: str, kwargs: dict):
+        """Build the client coroutine for a call kind"""
+        if kind == "chat":
+            return self.client.chat.completions.create(model=self.models["chat"], **kwargs)
+        if kind in ("structured", "tools"):
+            return self.client.beta.chat.completions.parse(model=self.models[kind], **kwargs)
+        raise ValueError(f"Unknown LLM call kind: {kind}")
+
+    def _estimate_tokens(self, kind: str, kwargs: dict) -> int:
+        prompt = sum(count_tokens(str(m.get("content", ""))) for m in kwargs.get("messages", []))
+        return prompt + EXPECTED_OUTPUT_TOKENS.get(kind, 300)
+
+    def _trace(self, kind: str, priority: int, kwargs: dict, started_at: float, started: float, attempts: int,
+               outcome: str, error: Exception = None, usage=None, stream: bool = False):
+        """Record the request as an LLM span; without usage the prompt size is the local estimate"""
+        prompt_tokens = getattr(usage, "prompt_tokens", None)
+        if prompt_tokens is None:
+            prompt_tokens = self._estimate_tokens(kind, kwargs) - EXPECTED_OUTPUT_TOKENS.get(kind, 300)
+        get_tracer().record(
+            provider=self.name,
+            model=self.models.get(kind, ""),
+            kind=kind,
+            started_at=started_at,
+            latency=time.monotonic() - started,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=getattr(usage, "completion_tokens", None),
+            retries=max(attempts - 1, 0),
+            outcome=outcome,
+            error=repr(error) if error is not None else None,
+            stream=stream,
+            priority=priority,
+        )
+
+    async def call(self, kind: str, priority: int = PRIORITY_INTERACTIVE, **kwargs):
+        """Run one request against this provider through its rate limiter, recording latency and breaker outcome"""
+        self.calls += 1
+        estimated_tokens = self._estimate_tokens(kind, kwargs)
+        started_at, started = time.time(), time.monotonic()
+        attempts = 0
+
+        async def attempt():
+            nonlocal attempts
+            attempts += 1
+            attempt_started = time.monotonic()
+            response = await asyncio.wait_for(self._request(kind, kwargs), self.timeouts.get(kind))
+            self.latencies.append(time.monotonic() - attempt_started)
+            return response
+
+        try:
+            response = await self.limiter.run(priority, estimated_tokens, attempt)
+        except asyncio.TimeoutError as e:
+            self.timeouts_hit += 1
+            self.failures += 1
+            self.breaker.record_failure()
+            self._trace(kind, priority, kwargs, started_at, started, attempts, "timeout", e)
+            raise
+        except asyncio.CancelledError:
+            # Lost a hedged race or the caller went away
+            self._trace(kind, priority, kwargs, started_at, started, attempts, "cancelled")
+            raise
+        except Exception as e:
+            self.failures += 1
+            self.breaker.record_failure()
+            self._trace(kind, priority, kwargs, started_at, started, attempts, "error", e)
+            raise
+        usage = getattr(response, "usage", None)
+        self.limiter.record_usage(estimated_tokens, getattr(usage, "total_tokens", None))
+        self.breaker.record_success()
+        self._trace(kind, priority, kwargs, started_at, started, attempts, "ok", usage=usage)
+        return response
+
+    async def open_stream(self, kind: str, priority: int = PRIORITY_INTERACTIVE, **kwargs):
+        """Open a streaming response; only the time to open the stream is bounded by the timeout"""
+        self.calls += 1
+        started_at, started = time.time(), time.monotonic()
+        attempts = 0
+
+        async def attempt():
+            nonlocal attempts
+            attempts += 1
+            if kind == "chat":
+                return await asyncio.wait_for(
+                    self.client.chat.completions.create(model=self.models["chat"], stream=True, **kwargs),
+                    self.timeouts.get(kind),
+                )
+            if kind == "structured":
+                manager = self.client.beta.chat.completions.stream(model=self.models["structured"], **kwargs)
+                return await asyncio.wait_for(manager.__aenter__(), self.timeouts.get(kind))
+            raise ValueError(f"Streaming is not supported for call kind: {kind}")
+
+        try:
+            stream = await self.limiter.run(priority, self._estimate_tokens(kind, kwargs), attempt)
+        except asyncio.TimeoutError as e:
+            self.timeouts_hit += 1
+            self.failures += 1
+            self.breaker.record_failure()
+            self._trace(kind, priority, kwargs, started_at, started, attempts, "timeout", e, stream=True)
+            raise
+        except asyncio.CancelledError:
+            self._trace(kind, priority, kwargs, started_at, started, attempts, "cancelled", stream=True)
+            raise
+        except Exception as e:
+            self.failures += 1
+            self.breaker.record_failure()
+            self._trace(kind, priority, kwargs, started_at, started, attempts, "error", e, stream=True)
+            raise
+        self.breaker.record_success()
+        # For streams the span covers the time to open the stream; completion tokens are not known yet
+        self._trace(kind, priority, kwargs, started_at, started, attempts, "ok", stream=True)
+        return stream
+
+    def stats(self) -> dict:
+        p95 = self.p95()
+        return {
+            "state": self.breaker.state,
+            "calls": self.calls,
+            "failures": self.failures,
+            "timeouts": self.timeouts_hit,
+            "times_opened": self.breaker.times_opened,
+            "p95_latency_s": round(p95, 3) if p95 is not None else None,
+            "rate_limiter": self.limiter.stats(),
+        }
+
+
+class ProviderRouter:
+    def __init__(self, primary: LLMProvider, fallback: LLMProvider = None, hedge: bool = False):
+        self.primary = primary
+        self.fallback = fallback
+        self.hedge = hedge
+        self.switches = 0
+        self.hedged_requests = 0
+        self.hedge_wins = 0
+
+    def _available(self):
+        return [p for p in (self.primary, self.fallback) if p is not None and p.breaker.allow_request()]
+
+    async def complete(self, kind: str, priority: int = PRIORITY_INTERACTIVE, **kwargs):
+        """Send a non-streaming request, failing over (or hedging) to the fallback"""
+        providers = self._available()
+        if not providers:
+            raise RuntimeError("No LLM provider available: all circuit breakers are open")
+
+        if self.hedge and len(providers) == 2 and providers[0].p95() is not None:
+            return await self._hedged(providers[0], providers[1], kind, priority, kwargs)
+
+        last_error = None
+        for provider in providers:
+            if provider is not providers[0]:
+                self.switches += 1
+                print(f"[LLM FAILOVER] {providers[0].name} failed ({last_error!r}), switching to {provider.name}")
+            try:
+                return await provider.call(kind, priority=priority, **kwargs)
+            except Exception as e:
+                last_error = e
+        raise last_error
+
+    async def _hedged(self, first: LLMProvider, second: LLMProvider, kind: str, priority: int, kwargs: dict):
+        """Start on the first provider; after its p95 also ask the second and keep whichever answers first"""
+        first_task = asyncio.ensure_future(first.call(kind, priority=priority, **kwargs))
+        done, _ = await asyncio.wait({first_task}, timeout=first.p95())
+        if first_task in done and first_task.exception() is None:
+            return first_task.result()
+
+        self.hedged_requests += 1
+        pending = {asyncio.ensure_future(second.call(kind, priority=priority, **kwargs))}
+        if first_task not in done:
+            pending.add(first_task)
+        else:
+            self.switches += 1
+        last_error = first_task.exception() if first_task in done else None
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    if task is not first_task:
+                        self.hedge_wins += 1
+                    return task.result()
+                last_error = task.exception()
+        raise last_error
+
+    async def open_stream(self, kind: str, priority: int = PRIORITY_INTERACTIVE, **kwargs):
+        """Open a streaming response, failing over if the primary cannot start the stream"""
+        providers = self._available()
+        if not providers:
+            raise RuntimeError("No LLM provider available: all circuit breakers are open")
+        last_error = None
+        for provider in providers:
+            if provider is not providers[0]:
+                self.switches += 1
+                print(f"[LLM FAILOVER] {providers[0].name} stream failed ({last_error!r}), switching to {provider.name}")
+            try:
+                return await provider.open_stream(kind, priority=priority, **kwargs)
+            except Exception as e:
+                last_error = e
+        raise last_error
+
+    def stats(self) -> dict:
+        """Provider health and switch counts"""
+        return {
+            "providers": {p.name: p.stats() for p in (self.primary, self.fallback) if p is not None},
+            "switches": self.switches,
+            "hedged_requests": self.hedged_requests,
+            "hedge_wins": self.hedge_wins,
+        }
+
+
+_routers = {}
+_routers_lock = threading.Lock()
+
+
+def get_provider_router(primary: ProviderConfig, fallback: ProviderConfig = None, hedge: bool = False) -> ProviderRouter:
+    """Return the process-wide router for a primary/fallback pair"""
+    key = (
+        primary.name, primary.base_url, primary.api_key, tuple(sorted(primary.models.items())),
+        fallback and (fallback.name, fallback.base_url, fallback.api_key, tuple(sorted(fallback.models.items()))),
+    )
+    with _routers_lock:
+        router = _routers.get(key)
+        if router is None:
+            router = ProviderRouter(
+                LLMProvider(primary),
+                LLMProvider(fallback) if fallback else None,
+                hedge=hedge,
+            )
+            _routers[key] = router
+        router.hedge = hedge
+    return router
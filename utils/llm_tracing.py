@@ -0,0 +1,283 @@
+"""
+Per-call LLM tracing and metrics.
+
+Every request a provider sends (see ``llm_provider``) is recorded as a span
+with the session id, call site, call type, provider, model, prompt and
+completion tokens, latency, retry count and outcome. Call sites attach the
+session and call-site attributes with ``llm_span_context``; they are carried
+in a ContextVar, so they follow the call through the router, the rate
+limiter and concurrent tasks.
+
+Spans go to two sinks:
+
+- a JSONL file with one OpenTelemetry-style span per line (``LLM_TRACE_PATH``)
+- Prometheus metrics, written as a textfile for the node_exporter textfile
+  collector (``LLM_METRICS_TEXTFILE``) and optionally served on
+  ``http://0.0.0.0:<LLM_METRICS_PORT>/metrics``
+
+Set ``LLM_TRACE_PATH`` or ``LLM_METRICS_TEXTFILE`` to an empty string to
+turn that sink off. Both default to ``logs/`` under the working directory.
+A sink that cannot be written is counted in
+``llm_trace_export_errors_total`` and reported once per run of failures; the
+writer thread keeps going.
+"""
+
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+DEFAULT_TRACE_PATH = os.path.join("logs", "llm_spans.jsonl")
+DEFAULT_METRICS_TEXTFILE = os.path.join("logs", "llm_metrics.prom")
+TEXTFILE_INTERVAL = 5.0
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_span_attributes: ContextVar[dict] = ContextVar("llm_span_attributes", default={})
+
+
+@contextmanager
+def llm_span_context(**attributes):
+    """Attach attributes (session_id, call_site, call_type, ...) to LLM spans started inside the block"""
+    token = _span_attributes.set({**_span_attributes.get(), **attributes})
+    try:
+        yield
+    finally:
+        _span_attributes.reset(token)
+
+
+def current_span_attributes() -> dict:
+    return dict(_span_attributes.get())
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+class LLMMetrics:
+    """In-process Prometheus counters and a latency histogram, aggregated from spans"""
+
+    CALL_LABELS = ("call_site", "call_type", "provider", "model", "outcome")
+    LATENCY_LABELS = ("call_site", "call_type", "provider")
+    TOKEN_LABELS = ("call_site", "call_type", "model", "type")
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.calls = {}
+        self.retries = {}
+        self.tokens = {}
+        self.latency = {}
+        self.export_errors = {}
+
+    def observe_export_error(self, sink: str):
+        with self._lock:
+            self.export_errors[sink] = self.export_errors.get(sink, 0) + 1
+
+    def observe(self, span: dict):
+        attrs = span["attributes"]
+        call_site = attrs.get("llm.call_site", "unknown")
+        call_type = attrs.get("llm.call_type", "")
+        provider = attrs.get("gen_ai.system", "")
+        model = attrs.get("gen_ai.request.model", "")
+        latency = (span["end_time_unix_nano"] - span["start_time_unix_nano"]) / 1e9
+
+        with self._lock:
+            call_key = (call_site, call_type, provider, model, attrs.get("llm.outcome", "ok"))
+            self.calls[call_key] = self.calls.get(call_key, 0) + 1
+            self.retries[call_key] = self.retries.get(call_key, 0) + attrs.get("llm.retries", 0)
+            for kind, attr in (("prompt", "gen_ai.usage.input_tokens"), ("completion", "gen_ai.usage.output_tokens")):
+                if attrs.get(attr):
+                    token_key = (call_site, call_type, model, kind)
+                    self.tokens[token_key] = self.tokens.get(token_key, 0) + attrs[attr]
+
+            hist = self.latency.setdefault((call_site, call_type, provider), [[0] * len(self.buckets), 0, 0.0])
+            for i, bound in enumerate(self.buckets):
+                if latency <= bound:
+                    hist[0][i] += 1
+            hist[1] += 1
+            hist[2] += latency
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            lines += ["# HELP llm_calls_total LLM requests by call site and outcome", "# TYPE llm_calls_total counter"]
+            lines += [f"llm_calls_total{{{_labels(self.CALL_LABELS, key)}}} {value}" for key, value in sorted(self.calls.items())]
+            lines += ["# HELP llm_retries_total Retries made by the rate limiter", "# TYPE llm_retries_total counter"]
+            lines += [f"llm_retries_total{{{_labels(self.CALL_LABELS, key)}}} {value}" for key, value in sorted(self.retries.items())]
+            lines += ["# HELP llm_tokens_total Prompt and completion tokens", "# TYPE llm_tokens_total counter"]
+            lines += [f"llm_tokens_total{{{_labels(self.TOKEN_LABELS, key)}}} {value}" for key, value in sorted(self.tokens.items())]
+            lines += ["# HELP llm_call_latency_seconds LLM request latency (time to open for streams)",
+                      "# TYPE llm_call_latency_seconds histogram"]
+            for key, (counts, count, total) in sorted(self.latency.items()):
+                labels = _labels(self.LATENCY_LABELS, key)
+                for bound, bucket_count in zip(self.buckets, counts):
+                    lines.append(f'llm_call_latency_seconds_bucket{{{labels},le="{bound}"}} {bucket_count}')
+                lines.append(f'llm_call_latency_seconds_bucket{{{labels},le="+Inf"}} {count}')
+                lines.append(f"llm_call_latency_seconds_sum{{{labels}}} {total:.6f}")
+                lines.append(f"llm_call_latency_seconds_count{{{labels}}} {count}")
+            lines += ["# HELP llm_trace_export_errors_total Failed writes of the span and metrics sinks",
+                      "# TYPE llm_trace_export_errors_total counter"]
+            lines += [f"llm_trace_export_errors_total{{{_labels(('sink',), (sink,))}}} {value}"
+                      for sink, value in sorted(self.export_errors.items())]
+        return "\n".join(lines) + "\n"
+
+
+class LLMTracer:
+    """Builds spans and hands them to a background thread that writes the JSONL and textfile sinks"""
+
+    def __init__(self, trace_path: Optional[str] = DEFAULT_TRACE_PATH,
+                 metrics_textfile: Optional[str] = DEFAULT_METRICS_TEXTFILE):
+        self.trace_path = trace_path or None
+        self.metrics_textfile = metrics_textfile or None
+        self.metrics = LLMMetrics()
+        self.last_export_error = {}
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="llm-trace-writer", daemon=True)
+        self._writer.start()
+
+    def record(self, provider: str, model: str, kind: str, started_at: float, latency: float,
+               prompt_tokens: Optional[int], completion_tokens: Optional[int], retries: int,
+               outcome: str, error: str = None, stream: bool = False, priority: int = None) -> dict:
+        """Record one provider request; `started_at` is wall-clock seconds"""
+        context = current_span_attributes()
+        session_id = str(context.pop("session_id", "") or "")
+        call_site = context.pop("call_site", "unknown")
+        attributes = {
+            "session.id": session_id,
+            "llm.call_site": call_site,
+            "llm.kind": kind,
+            "llm.stream": stream,
+            "llm.retries": retries,
+            "llm.outcome": outcome,
+            "gen_ai.system": provider,
+            "gen_ai.request.model": model,
+            "gen_ai.usage.input_tokens": prompt_tokens,
+            "gen_ai.usage.output_tokens": completion_tokens,
+        }
+        if priority is not None:
+            attributes["llm.priority"] = priority
+        attributes.update({f"llm.{key}": value for key, value in context.items()})
+
+        span = {
+            # One trace per interview session, one span per provider request
+            "trace_id": hashlib.md5(session_id.encode("utf-8")).hexdigest() if session_id else uuid.uuid4().hex,
+            "span_id": uuid.uuid4().hex[:16],
+            "name": f"llm.{call_site}",
+            "kind": "CLIENT",
+            "start_time_unix_nano": int(started_at * 1e9),
+            "end_time_unix_nano": int((started_at + latency) * 1e9),
+            "attributes": attributes,
+            "status": {"code": "OK"} if outcome == "ok" else {"code": "ERROR", "message": error or outcome},
+        }
+        self.metrics.observe(span)
+        self._queue.put(span)
+        return span
+
+    def _write_loop(self):
+        last_textfile = 0.0
+        dirty = False
+        while True:
+            try:
+                spans = [self._queue.get(timeout=TEXTFILE_INTERVAL)]
+                while not self._queue.empty():
+                    spans.append(self._queue.get_nowait())
+            except queue.Empty:
+                spans = []
+            if spans and self.trace_path:
+                self._export("spans", self._write_spans, spans)
+            dirty = dirty or bool(spans)
+            if dirty and self.metrics_textfile and time.monotonic() - last_textfile >= TEXTFILE_INTERVAL:
+                self._export("textfile", self.write_textfile)
+                last_textfile = time.monotonic()
+                dirty = False
+
+    def _export(self, sink: str, func, *args):
+        """Run one sink write; failures are counted in the metrics and reported when a sink starts failing"""
+        try:
+            func(*args)
+        except Exception as e:
+            self.metrics.observe_export_error(sink)
+            if sink not in self.last_export_error:
+                print(f"[TRACE ERROR] Failed to export LLM {sink}: {e}")
+            self.last_export_error[sink] = f"{type(e).__name__}: {e}"
+        else:
+            if self.last_export_error.pop(sink, None) is not None:
+                print(f"[TRACE] LLM {sink} export recovered")
+
+    def _write_spans(self, spans: list):
+        os.makedirs(os.path.dirname(os.path.abspath(self.trace_path)), exist_ok=True)
+        with open(self.trace_path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(span, default=str) + "\n" for span in spans))
+
+    def write_textfile(self):
+        """Write the metrics atomically so a collector never reads a half-written file"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.metrics_textfile)), exist_ok=True)
+        tmp_path = f"{self.metrics_textfile}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.metrics.render())
+        os.replace(tmp_path, self.metrics_textfile)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    tracer: LLMTracer = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0].rstrip("/") != "/metrics":
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        data = self.tracer.metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_metrics_server(tracer: LLMTracer, port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Serve the tracer's metrics at /metrics on a background thread"""
+    handler = type("MetricsHandler", (_MetricsHandler,), {"tracer": tracer})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="llm-metrics-server", daemon=True).start()
+    return server
+
+
+_tracer = None
+_metrics_server = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> LLMTracer:
+    """Return the process-wide tracer, configured from the environment on first use"""
+    global _tracer, _metrics_server
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = LLMTracer(
+                trace_path=os.environ.get("LLM_TRACE_PATH", DEFAULT_TRACE_PATH),
+                metrics_textfile=os.environ.get("LLM_METRICS_TEXTFILE", DEFAULT_METRICS_TEXTFILE),
+            )
+            port = os.environ.get("LLM_METRICS_PORT")
+            if port:
+                try:
+                    _metrics_server = start_metrics_server(_tracer, int(port))
+                except (OSError, ValueError) as e:
+                    print(f"[TRACE ERROR] Could not start the metrics endpoint on port {port}: {e}")
+    return _tracer
@@ -0,0 +1,343 @@
+"""
+Local OpenAI-compatible mock LLM server for load tests and benchmarks.
+
+Serves ``POST .../chat/completions`` the way the Gemini and Hyperbolic
+OpenAI-compatible endpoints do, so ``HiringAgent`` can run against it by
+pointing ``primary_url`` / ``fallback_url`` at it:
+
+- plain chat completions, streamed (SSE) or not
+- structured outputs (``response_format`` of type ``json_schema``, as sent by
+  ``beta.chat.completions.parse`` / ``.stream``) filled with schema-valid values
+- tool calls against ``custom_tools.tools``, picked from the candidate's last message
+
+Latency and failures are injectable: a base latency with jitter, a per-chunk
+delay for streams, and rates for 5xx errors, 429s with ``Retry-After`` and
+hung requests. Settings can be changed at runtime with ``POST /mock/config``
+and counters are available at ``GET /mock/stats``.
+
+Run standalone with ``python -m utils.mock_llm_server --port 8001`` or
+in-process with ``start_mock_server()``.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, fields
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from utils.context_builder import count_tokens
+
+
+@dataclass
+class MockLLMConfig:
+    latency_ms: float = 300.0          # time before the first byte of a response
+    jitter_ms: float = 100.0           # uniform extra latency added on top
+    chunk_delay_ms: float = 15.0       # delay between streamed chunks
+    chunk_chars: int = 12              # characters per streamed chunk
+    reply_words: int = 40              # length of plain chat replies
+    error_rate: float = 0.0            # share of requests answered with error_status
+    error_status: int = 500
+    rate_limit_rate: float = 0.0       # share of requests answered with 429
+    retry_after_s: float = 1.0         # Retry-After sent with 429s
+    hang_rate: float = 0.0             # share of requests that stall for hang_s (client timeouts fire)
+    hang_s: float = 120.0
+    seed: Optional[int] = None
+
+
+# Candidate phrases that make the mock pick a tool, checked in order
+TOOL_KEYWORDS = [
+    ("end_conversation", ("end_chat", "end_conversation", "exit", "quit", "stop")),
+    ("generate_final_recommendation", ("recommend", "report", "decision", "verdict")),
+    ("analyze_candidate_performance", ("analy", "feedback", "evaluat", "score")),
+]
+DEFAULT_TOOL = "take_interview"
+
+_WORDS = (
+    "thanks for sharing that let us continue with the interview could you tell me more about "
+    "how you approached the problem and what you learned from the experience in your recent role"
+).split()
+
+
+class MockLLMStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {}
+
+    def incr(self, name: str):
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self.counts)
+
+
+def _resolve(schema: dict, root: dict) -> dict:
+    while "$ref" in schema:
+        name = schema["$ref"].split("/")[-1]
+        schema = root.get("$defs", root.get("definitions", {}))[name]
+    return schema
+
+
+def fake_from_schema(schema: dict, rng: random.Random, name: str = "", root: dict = None, index: int = 0):
+    """Build a value that validates against a (strict) JSON schema, using field names as hints"""
+    root = root if root is not None else schema
+    schema = _resolve(schema, root)
+    if "anyOf" in schema:
+        # Optional[...] comes as anyOf [..., null]: fill in the non-null branch
+        options = [s for s in schema["anyOf"] if _resolve(s, root).get("type") != "null"] or schema["anyOf"]
+        return fake_from_schema(options[0], rng, name, root, index)
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "null")
+    if kind == "object":
+        return {
+            key: fake_from_schema(sub, rng, key, root, index)
+            for key, sub in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        item_schema = _resolve(schema.get("items", {}), root)
+        size = 5 if item_schema.get("type") == "object" else 3
+        return [fake_from_schema(item_schema, rng, name, root, i) for i in range(size)]
+    if kind == "integer":
+        if name.endswith("_number"):
+            return index + 1
+        if name == "max_score":
+            return 10
+        if "year" in name:
+            return rng.randint(2015, 2025)
+        return rng.randint(5, 10) if name == "score" else rng.randint(40, 95)
+    if kind == "number":
+        return round(rng.uniform(0.0, 1.0), 2)
+    if kind == "boolean":
+        return rng.random() < 0.5
+    if kind == "null":
+        return None
+    label = name.replace("_", " ") or "value"
+    return f"Mock {label} {index + 1}: " + " ".join(rng.sample(_WORDS, 6))
+
+
+def pick_tool(messages: list) -> str:
+    """Choose a tool the way a routing model would, from the candidate's latest message"""
+    user_messages = [str(m.get("content", "")) for m in messages if m.get("role") == "user"]
+    # The routing call ends with a fixed instruction; the candidate's message is the one before it
+    text = (user_messages[-2] if len(user_messages) > 1 else "".join(user_messages[-1:])).lower()
+    for tool_name, keywords in TOOL_KEYWORDS:
+        if any(keyword in text for keyword in keywords):
+            return tool_name
+    return DEFAULT_TOOL
+
+
+def build_completion(body: dict, rng: random.Random, config: MockLLMConfig) -> dict:
+    """Non-streaming chat.completion payload for a request body"""
+    messages = body.get("messages", [])
+    message = {"role": "assistant", "content": None}
+    finish_reason = "stop"
+
+    if body.get("tools"):
+        tool_name = pick_tool(messages)
+        tool = next((t for t in body["tools"] if t["function"]["name"] == tool_name), body["tools"][0])
+        arguments = {"chat_history": []} if "chat_history" in tool["function"]["parameters"].get("properties", {}) else {}
+        message["tool_calls"] = [{
+            "id": f"call_{uuid.uuid4().hex[:12]}",
+            "type": "function",
+            "function": {"name": tool["function"]["name"], "arguments": json.dumps(arguments)},
+        }]
+        finish_reason = "tool_calls"
+    elif (body.get("response_format") or {}).get("type") == "json_schema":
+        schema = body["response_format"]["json_schema"]["schema"]
+        message["content"] = json.dumps(fake_from_schema(schema, rng))
+    else:
+        message["content"] = " ".join(rng.choice(_WORDS) for _ in range(config.reply_words)).capitalize() + "."
+
+    prompt_tokens = sum(count_tokens(str(m.get("content") or "")) for m in messages)
+    completion_tokens = count_tokens(message["content"] or json.dumps(message.get("tool_calls")))
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "mock"),
+        "choices": [{"index": 0, "message": message, "finish_reason": finish_reason, "logprobs": None}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def stream_chunks(completion: dict, config: MockLLMConfig, include_usage: bool):
+    """Split a completion into chat.completion.chunk payloads"""
+    base = {"id": completion["id"], "object": "chat.completion.chunk",
+            "created": completion["created"], "model": completion["model"]}
+    message = completion["choices"][0]["message"]
+    content = message["content"] or ""
+
+    yield dict(base, choices=[{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+    if message.get("tool_calls"):
+        calls = [dict(call, index=i) for i, call in enumerate(message["tool_calls"])]
+        yield dict(base, choices=[{"index": 0, "delta": {"tool_calls": calls}, "finish_reason": None}])
+    for start in range(0, len(content), config.chunk_chars):
+        yield dict(base, choices=[{"index": 0, "delta": {"content": content[start:start + config.chunk_chars]},
+                                   "finish_reason": None}])
+    yield dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": completion["choices"][0]["finish_reason"]}])
+    if include_usage:
+        yield dict(base, choices=[], usage=completion["usage"])
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "MockLLMServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: dict, headers: dict = None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _read_body(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/mock/stats":
+            self._send_json(200, self.server.stats.snapshot())
+        elif self.path.rstrip("/") == "/mock/config":
+            self._send_json(200, asdict(self.server.config))
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+    def do_POST(self):
+        body = self._read_body()
+        if self.path.rstrip("/") == "/mock/config":
+            try:
+                self.server.update_config(**body)
+            except (TypeError, ValueError) as e:
+                self._send_json(400, {"error": {"message": str(e)}})
+                return
+            self._send_json(200, asdict(self.server.config))
+            return
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        config = self.server.config
+        stats = self.server.stats
+        rng = self.server.rng
+        stats.incr("requests")
+        time.sleep((config.latency_ms + rng.uniform(0, config.jitter_ms)) / 1000.0)
+
+        roll = rng.random()
+        if roll < config.hang_rate:
+            stats.incr("hung")
+            time.sleep(config.hang_s)
+        elif roll < config.hang_rate + config.rate_limit_rate:
+            stats.incr("rate_limited")
+            self._send_json(429, {"error": {"message": "Mock rate limit", "type": "rate_limit_exceeded"}},
+                            headers={"retry-after": str(config.retry_after_s)})
+            return
+        elif roll < config.hang_rate + config.rate_limit_rate + config.error_rate:
+            stats.incr("errors")
+            self._send_json(config.error_status, {"error": {"message": "Mock server error", "type": "server_error"}})
+            return
+
+        completion = build_completion(body, rng, config)
+        kind = "tools" if body.get("tools") else "structured" if body.get("response_format") else "chat"
+        stats.incr(kind)
+
+        if not body.get("stream"):
+            self._send_json(200, completion)
+            return
+
+        stats.incr("streams")
+        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for chunk in stream_chunks(completion, config, include_usage):
+                self._write_chunk(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                time.sleep(config.chunk_delay_ms / 1000.0)
+            self._write_chunk(b"data: [DONE]\n\n")
+            self._write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped reading (e.g. a hedged or cancelled request)
+            stats.incr("aborted_streams")
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config: MockLLMConfig = None):
+        super().__init__(address, MockLLMHandler)
+        self.config = config or MockLLMConfig()
+        self.stats = MockLLMStats()
+        self.rng = random.Random(self.config.seed)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1/"
+
+    def update_config(self, **changes):
+        """Change latency/error settings while the server is running"""
+        known = {f.name for f in fields(MockLLMConfig)}
+        unknown = set(changes) - known
+        if unknown:
+            raise ValueError(f"Unknown mock config fields: {sorted(unknown)}")
+        values = dict(asdict(self.config), **changes)
+        self.config = MockLLMConfig(**values)
+
+
+def start_mock_server(config: MockLLMConfig = None, host: str = "127.0.0.1", port: int = 0) -> MockLLMServer:
+    """Start a mock server on a background thread (port 0 picks a free port)"""
+    server = MockLLMServer((host, port), config)
+    threading.Thread(target=server.serve_forever, name="mock-llm-server", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible mock LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    for f in fields(MockLLMConfig):
+        option = "--" + f.name.replace("_", "-")
+        if f.name == "seed":
+            parser.add_argument(option, type=int, default=None)
+        else:
+            parser.add_argument(option, type=type(f.default), default=f.default)
+    args = vars(parser.parse_args())
+    host, port = args.pop("host"), args.pop("port")
+
+    server = MockLLMServer((host, port), MockLLMConfig(**args))
+    print(f"Mock LLM server listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,449 @@
+import io
 import os
+import re
+import math
+import signal
+import threading
+import time
+import importlib.util
+import multiprocessing
+import unicodedata
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
 import pdfplumber
-from docx import Document
+
+
+# Parallel PDF extraction: PDF_WORKERS > 1 splits the pages of a document across a process pool
+PDF_WORKERS = int(os.environ.get("PDF_WORKERS", 1))
+# Per-page timeout in seconds, off (0) by default. Off the main thread a timeout needs a worker process,
+# so without one (and with PDF_WORKERS=1) every document is read serially in-process
+PDF_PAGE_TIMEOUT = float(os.environ.get("PDF_PAGE_TIMEOUT", 0))
+PARALLEL_MIN_PAGES = 4
+# Worker start-up (interpreter + pdfplumber import) allowance on top of the per-page timeouts
+POOL_STARTUP_ALLOWANCE = 15.0
+# With a page timeout, serial extraction off the main thread runs in this pool too; keep room for
+# concurrent uploads even with PDF_WORKERS=1
+MIN_POOL_WORKERS = 2
+
+# PDF text backend: pdfplumber | auto | pypdfium2 | pdfminer. pdfplumber is the default; "auto" opts in to the
+# faster backends, whose text can differ from pdfplumber's (compare with benchmarks/pdf_backends.py first)
+PDF_BACKEND = os.environ.get("PDF_BACKEND", "pdfplumber")
+# Fastest first (see benchmarks/pdf_backends.py); pdfplumber's layout analysis is the accurate fallback
+AUTO_BACKEND_ORDER = ("pypdfium2", "pdfminer")
+GARBLED_CHAR_RATIO = 0.05
+MIN_ALNUM_RATIO = 0.5
+
+_pdf_pool = None
+_pdf_pool_workers = 0
+_pdf_pool_lock = threading.Lock()
+# PDFium is not thread-safe: one document at a time per process
+_pdfium_lock = threading.Lock()
+
+# WordprocessingML elements read by the streaming DOCX extractor
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+W_P, W_R, W_T, W_TAB, W_BR, W_CR = (W_NS + name for name in ("p", "r", "t", "tab", "br", "cr"))
+W_TR, W_TC, W_NO_BREAK_HYPHEN = W_NS + "tr", W_NS + "tc", W_NS + "noBreakHyphen"
+# Text boxes are stored twice (DrawingML choice + VML fallback); only the choice is read
+MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+DOCX_CELL_SEPARATOR = " | "
+DOCX_HEADER_PART = re.compile(r"word/header(\d*)\.xml")
+DOCX_FOOTER_PART = re.compile(r"word/footer(\d*)\.xml")
+
+
+class PageTimeout(BaseException):
+    """BaseException so pdfminer's own broad except clauses cannot swallow it"""
+
+
+def _raise_page_timeout(signum, frame):
+    raise PageTimeout()
+
+
+def _pdfplumber_pages(pdf_path, start=0, end=None):
+    """Text of pages [start, end) with pdfplumber's character clustering (slow, most faithful layout)"""
+    pages = list(range(start + 1, end + 1)) if end is not None else None
+    with pdfplumber.open(pdf_path, pages=pages) as pdf:
+        for page in pdf.pages[start if pages is None else 0:]:
+            try:
+                yield page.extract_text() or ""
+            finally:
+                # Free the page's parsed objects before moving on
+                page.close()
+
+
+def _pdfminer_pages(pdf_path, start=0, end=None):
+    """Text of pages [start, end) straight from pdfminer's text converter, without pdfplumber's object model"""
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LAParams
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+
+    manager = PDFResourceManager(caching=True)
+    output = io.StringIO()
+    converter = TextConverter(manager, output, laparams=LAParams())
+    interpreter = PDFPageInterpreter(manager, converter)
+    pagenos = set(range(start, end)) if end is not None else None
+    try:
+        with open(pdf_path, "rb") as f:
+            for index, page in enumerate(PDFPage.get_pages(f, pagenos=pagenos)):
+                if pagenos is None and index < start:
+                    continue
+                interpreter.process_page(page)
+                text = output.getvalue()
+                output.seek(0)
+                output.truncate(0)
+                yield text.replace("\x0c", "").strip()
+    finally:
+        converter.close()
+
+
+def _pypdfium2_pages(pdf_path, start=0, end=None):
+    """Text of pages [start, end) from PDFium's native text extraction (fastest, optional dependency)"""
+    import pypdfium2
+
+    with _pdfium_lock:
+        pdf = pypdfium2.PdfDocument(pdf_path)
+        try:
+            for index in range(start, len(pdf) if end is None else min(end, len(pdf))):
+                page = pdf[index]
+                textpage = page.get_textpage()
+                try:
+                    yield textpage.get_text_bounded().replace("\r\n", "\n").replace("\r", "\n").strip()
+                finally:
+                    textpage.close()
+                    page.close()
+        finally:
+            pdf.close()
+
+
+PDF_BACKENDS = {
+    "pdfplumber": _pdfplumber_pages,
+    "pdfminer": _pdfminer_pages,
+    "pypdfium2": _pypdfium2_pages,
+}
+
+
+def pdf_backend_available(name: str) -> bool:
+    return name in PDF_BACKENDS and importlib.util.find_spec(name) is not None
+
+
+def looks_garbled(text: str) -> bool:
+    """Empty text, or text dominated by replacement/control characters or unmapped glyphs"""
+    stripped = "".join(text.split())
+    if not stripped:
+        return True
+    bad = sum(1 for c in stripped if c == "\ufffd" or unicodedata.category(c) in ("Cc", "Co", "Cs", "Cn"))
+    bad += 5 * text.count("(cid:")
+    alnum = sum(1 for c in stripped if c.isalnum())
+    return bad / len(stripped) > GARBLED_CHAR_RATIO or alnum / len(stripped) < MIN_ALNUM_RATIO
+
+
+def _pdf_page_count(pdf_path) -> int:
+    if pdf_backend_available("pypdfium2"):
+        import pypdfium2
+        with _pdfium_lock:
+            pdf = pypdfium2.PdfDocument(pdf_path)
+            try:
+                return len(pdf)
+            finally:
+                pdf.close()
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+
+def _docx_part_lines(stream):
+    """Lines of one WordprocessingML part in document order: one per paragraph, one per table row
+
+    Parsed incrementally with every element cleared once handled, so memory
+    stays flat however long the document is. Table cells are joined with
+    ``DOCX_CELL_SEPARATOR``; paragraphs of a text box are emitted where the
+    text box is anchored.
+    """
+    paragraphs = []  # open paragraphs (text boxes nest them): lists of text pieces
+    rows = []  # open table rows (tables nest too): lists of cell texts
+    cells = []  # open table cells: lists of paragraph texts
+    run_depth = 0
+    fallback_depth = 0
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        tag = elem.tag
+        if tag == MC_FALLBACK:
+            fallback_depth += 1 if event == "start" else -1
+        elif fallback_depth:
+            pass
+        elif event == "start":
+            if tag == W_P:
+                paragraphs.append([])
+            elif tag == W_R:
+                run_depth += 1
+            elif tag == W_TR:
+                rows.append([])
+            elif tag == W_TC:
+                cells.append([])
+            continue
+        elif tag == W_T:
+            if paragraphs:
+                paragraphs[-1].append(elem.text or "")
+        elif tag == W_R:
+            run_depth -= 1
+        # w:tab also defines tab stops in paragraph properties; only tabs inside runs are text
+        elif run_depth and paragraphs and tag in (W_TAB, W_BR, W_CR, W_NO_BREAK_HYPHEN):
+            paragraphs[-1].append("\t" if tag == W_TAB else "-" if tag == W_NO_BREAK_HYPHEN else "\n")
+        elif tag == W_P:
+            text = "".join(paragraphs.pop())
+            if cells:
+                cells[-1].append(text)
+            else:
+                yield text
+        elif tag == W_TC:
+            cell = " ".join(text.strip() for text in cells.pop() if text.strip())
+            if rows:
+                rows[-1].append(cell)
+        elif tag == W_TR:
+            row = rows.pop()
+            if any(row):
+                line = DOCX_CELL_SEPARATOR.join(row)
+                if cells:
+                    cells[-1].append(line)
+                else:
+                    yield line
+        if event == "end":
+            elem.clear()
+
+
+def _docx_part_order(names: list, pattern) -> list:
+    matches = [(int(m.group(1) or 0), name) for name in names for m in [pattern.fullmatch(name)] if m]
+    return [name for _, name in sorted(matches)]
+
+
+def iter_docx_lines(docx_path):
+    """Header lines, body lines and footer lines of a .docx, streamed from the zip without python-docx"""
+    with zipfile.ZipFile(docx_path) as archive:
+        names = archive.namelist()
+        for part in _docx_part_order(names, DOCX_HEADER_PART):
+            with archive.open(part) as stream:
+                yield from (line for line in _docx_part_lines(stream) if line.strip())
+        with archive.open("word/document.xml") as stream:
+            yield from _docx_part_lines(stream)
+        for part in _docx_part_order(names, DOCX_FOOTER_PART):
+            with archive.open(part) as stream:
+                yield from (line for line in _docx_part_lines(stream) if line.strip())
+
+
+def _extract_pdf_page_range(pdf_path, start, end, page_timeout, backend="pdfplumber"):
+    """Pool worker: extract pages [start, end); a page running past `page_timeout` seconds yields no text"""
+    # Pool tasks run on the worker's main thread, so SIGALRM can interrupt a single page (not on Windows)
+    use_alarm = bool(page_timeout) and hasattr(signal, "setitimer")
+    previous_handler = signal.signal(signal.SIGALRM, _raise_page_timeout) if use_alarm else None
+    texts, timed_out = [], []
+    position = start
+    try:
+        while position < end:
+            pages = PDF_BACKENDS[backend](pdf_path, position, end)
+            try:
+                while position < end:
+                    try:
+                        if use_alarm:
+                            signal.setitimer(signal.ITIMER_REAL, page_timeout)
+                        text = next(pages)
+                    finally:
+                        if use_alarm:
+                            signal.setitimer(signal.ITIMER_REAL, 0)
+                    texts.append(text)
+                    position += 1
+            except StopIteration:
+                break
+            except PageTimeout:
+                # The interrupted page is lost; reopen the document after it
+                texts.append("")
+                timed_out.append(position + 1)
+                position += 1
+            finally:
+                pages.close()
+    finally:
+        if use_alarm:
+            signal.signal(signal.SIGALRM, previous_handler)
+    return texts, timed_out
+
+
+if "forkserver" in multiprocessing.get_all_start_methods():
+    from multiprocessing import forkserver, popen_forkserver, reduction, spawn, util
+    from multiprocessing.context import ForkServerContext, ForkServerProcess, set_spawning_popen
+
+    class _PdfWorkerPopen(popen_forkserver.Popen):
+        """Forkserver launch that leaves out the parent's ``__main__``
+
+        Workers normally re-run the parent's main script before their first task;
+        under Streamlit that is app.py, which would load the JDs (and start pools)
+        in every worker. The tasks only need this module, so the main-module
+        entries are dropped from the preparation data sent to each worker.
+        """
+
+        def _launch(self, process_obj):
+            prep_data = spawn.get_preparation_data(process_obj._name)
+            prep_data.pop("init_main_from_path", None)
+            prep_data.pop("init_main_from_name", None)
+            buf = io.BytesIO()
+            set_spawning_popen(self)
+            try:
+                reduction.dump(prep_data, buf)
+                reduction.dump(process_obj, buf)
+            finally:
+                set_spawning_popen(None)
+            self.sentinel, w = forkserver.connect_to_new_process(self._fds)
+            _parent_w = os.dup(w)
+            self.finalizer = util.Finalize(self, util.close_fds, (_parent_w, self.sentinel))
+            with open(w, "wb", closefd=True) as f:
+                f.write(buf.getbuffer())
+            self.pid = forkserver.read_signed(self.sentinel)
+
+    class _PdfWorkerProcess(ForkServerProcess):
+        @staticmethod
+        def _Popen(process_obj):
+            return _PdfWorkerPopen(process_obj)
+
+    class _PdfWorkerContext(ForkServerContext):
+        Process = _PdfWorkerProcess
+
+    _pdf_pool_context = _PdfWorkerContext()
+else:
+    _pdf_pool_context = None
+
+
+def _get_pdf_pool(workers):
+    global _pdf_pool, _pdf_pool_workers
+    with _pdf_pool_lock:
+        if _pdf_pool is None or _pdf_pool_workers != workers:
+            if _pdf_pool is not None:
+                _pdf_pool.shutdown(wait=False, cancel_futures=True)
+            # Never fork the (multi-threaded) app process itself
+            if _pdf_pool_context is not None:
+                # The fork server preloads the extractor instead of the app script (nothing else here uses it)
+                _pdf_pool_context.set_forkserver_preload([__name__])
+                context = _pdf_pool_context
+            else:
+                context = multiprocessing.get_context("spawn")
+            _pdf_pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+            _pdf_pool_workers = workers
+        return _pdf_pool
+
+
+def _discard_pdf_pool(pool):
+    """Kill the workers of a pool with a stuck task; the next extraction starts a fresh pool"""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is pool:
+            _pdf_pool = None
+    for process in list((getattr(pool, "_processes", None) or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
 
 
 class parser():
-    def __init__(self, store_in_db: bool = False):
+    def __init__(self, store_in_db: bool = False, pdf_workers: int = None, page_timeout: float = None,
+                 pdf_backend: str = None):
         self.store_db = store_in_db
-    
+        self.pdf_workers = max(1, pdf_workers if pdf_workers is not None else PDF_WORKERS)
+        self.page_timeout = page_timeout if page_timeout is not None else PDF_PAGE_TIMEOUT
+        self.pdf_backend = pdf_backend or PDF_BACKEND
+
+    def pdf_backend_chain(self) -> list:
+        """Backends to try in order; pdfplumber always comes last as the fallback"""
+        if self.pdf_backend == "auto":
+            chain = [name for name in AUTO_BACKEND_ORDER if pdf_backend_available(name)]
+        elif pdf_backend_available(self.pdf_backend):
+            chain = [self.pdf_backend]
+        else:
+            print(f"⚠️ PDF backend '{self.pdf_backend}' is not available, using pdfplumber")
+            chain = []
+        return [name for name in chain if name != "pdfplumber"] + ["pdfplumber"]
+
     def extract_text_from_pdf(self, pdf_path):
         text = ""
+        for backend in self.pdf_backend_chain():
+            text = self.extract_text_from_pdf_with(pdf_path, backend)
+            if backend == "pdfplumber" or not looks_garbled(text):
+                return text
+            print(f"⚠️ {backend} returned empty or garbled text for {pdf_path}, falling back")
+        return text
+
+    def extract_text_from_pdf_with(self, pdf_path, backend):
+        if self.pdf_workers > 1:
+            try:
+                page_count = _pdf_page_count(pdf_path)
+                if page_count >= PARALLEL_MIN_PAGES:
+                    return self.extract_text_from_pdf_parallel(pdf_path, page_count, backend)
+            except Exception as e:
+                print(f"❌ Parallel extraction failed for {pdf_path}, reading it serially: {e}")
+        if self.page_timeout:
+            try:
+                return self.extract_text_from_pdf_timed(pdf_path, backend)
+            except Exception as e:
+                print(f"❌ Timed extraction failed for {pdf_path}, reading it without a page timeout: {e}")
+        return self.extract_text_from_pdf_serial(pdf_path, backend)
+
+    def extract_text_from_pdf_timed(self, pdf_path, backend="pdfplumber"):
+        """Serial extraction with the per-page timeout
+
+        SIGALRM only works on the main thread; elsewhere (ingestion workers,
+        Streamlit script threads) the pages go to one worker of the process pool.
+        """
+        page_count = _pdf_page_count(pdf_path)
+        if threading.current_thread() is not threading.main_thread() or not hasattr(signal, "setitimer"):
+            return self.extract_text_from_pdf_parallel(pdf_path, page_count, backend, workers=1)
+        texts, timed_out = _extract_pdf_page_range(pdf_path, 0, page_count, self.page_timeout, backend)
+        if timed_out:
+            print(f"⚠️ Skipped PDF pages {timed_out} of {pdf_path}: extraction timed out")
+        return "".join(text + "\n" for text in texts if text)
+
+    def extract_text_from_pdf_serial(self, pdf_path, backend="pdfplumber"):
+        texts = []
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
+            for page_text in PDF_BACKENDS[backend](pdf_path):
+                if page_text:
+                    texts.append(page_text + "\n")
         except Exception as e:
-            print(f"❌ Error reading PDF {pdf_path}: {e}")
-        return text
+            print(f"❌ Error reading PDF {pdf_path} with {backend}: {e}")
+        return "".join(texts)
+
+    def extract_text_from_pdf_parallel(self, pdf_path, page_count, backend="pdfplumber", workers=None):
+        """Extract contiguous page ranges in a process pool and join them in page order"""
+        workers = max(1, min(workers or self.pdf_workers, page_count))
+        chunk_size = math.ceil(page_count / workers) if page_count else 1
+        ranges = [(start, min(start + chunk_size, page_count)) for start in range(0, page_count, chunk_size)]
+        pool = _get_pdf_pool(max(self.pdf_workers, MIN_POOL_WORKERS))
+        futures = [pool.submit(_extract_pdf_page_range, pdf_path, start, end, self.page_timeout, backend)
+                   for start, end in ranges]
+
+        # Backstop for pages SIGALRM cannot interrupt: every chunk gets its per-page budget
+        deadline = time.monotonic() + POOL_STARTUP_ALLOWANCE + (self.page_timeout or 60) * chunk_size
+        texts, timed_out, stuck = [], [], False
+        for (start, end), future in zip(ranges, futures):
+            try:
+                chunk_texts, chunk_timed_out = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                texts.extend(chunk_texts)
+                timed_out.extend(chunk_timed_out)
+            except FutureTimeoutError:
+                stuck = True
+                texts.extend([""] * (end - start))
+                timed_out.extend(range(start + 1, end + 1))
+            except BrokenProcessPool:
+                _discard_pdf_pool(pool)
+                raise
+        if stuck:
+            _discard_pdf_pool(pool)
+        if timed_out:
+            print(f"⚠️ Skipped PDF pages {timed_out} of {pdf_path}: extraction timed out")
+        return "".join(text + "\n" for text in texts if text)
 
     def extract_text_from_docx(self, docx_path):
-        text = ""
+        lines = []
         try:
-            doc = Document(docx_path)
-            for para in doc.paragraphs:
-                text += para.text + "\n"
+            for line in iter_docx_lines(docx_path):
+                lines.append(line + "\n")
         except Exception as e:
             print(f"❌ Error reading DOCX {docx_path}: {e}")
-        return text
+        return "".join(lines)
 
     def extract_text(self, doc_path):
         if doc_path.endswith(".pdf"):
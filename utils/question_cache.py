@@ -0,0 +1,106 @@
+"""
+Content-addressed cache for generated screening questions.
+
+The key is a SHA-256 of everything that goes into the question-generation
+prompt (JD text, profile fields and resume text). The cache only indexes the
+question sets already recorded by ``HiringAgent.log_questions_async`` in the
+interview log (``interview_log``), so a hit costs one indexed row read and no
+extra write on a miss. Entries pointing at the JSON files of older versions
+still resolve.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Optional
+
+from pydantic import ValidationError
+
+from utils.custom_classes_and_prompts import PresentedScreeningQuestion, ScreeningQuestion, ScreeningQuestionsResponse
+from utils.disk_cache import DiskLRUCache
+from utils.interview_log import get_interview_log, parse_interview_log_ref
+
+
+QUESTION_CACHE_PATH = os.path.join("screening_questions", ".question_cache.sqlite3")
+QUESTION_CACHE_MAX_ENTRIES = 500
+QUESTION_CACHE_TTL_SECONDS = 7 * 24 * 3600
+
+# Profile fields that appear in the question-generation prompt
+PROMPT_PROFILE_FIELDS = [
+    "first_name", "last_name", "position_applied", "years_experience",
+    "tech_stack", "current_company", "major",
+]
+
+
+def question_cache_key(jd_content: str, profile: dict, resume_text: str) -> str:
+    """Hash the question-generation prompt inputs"""
+    payload = {
+        "jd": jd_content or "",
+        "profile": {field: str(profile.get(field, "")) for field in PROMPT_PROFILE_FIELDS},
+        "resume": resume_text or "",
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def load_question_set(ref: str) -> dict:
+    """Read a question set by reference: an interview log event or a legacy JSON file"""
+    event_id = parse_interview_log_ref(ref)
+    if event_id is None:
+        with open(ref, "r") as f:
+            return json.load(f)
+    event = get_interview_log().get_event(event_id)
+    if event is None or event["event_type"] != "questions":
+        raise KeyError(f"no question set logged as {ref}")
+    return event["payload"]
+
+
+class QuestionCache:
+    """Maps prompt-input hashes to logged question sets"""
+
+    def __init__(self, db_path: str = QUESTION_CACHE_PATH, max_entries: int = QUESTION_CACHE_MAX_ENTRIES,
+                 ttl_seconds: Optional[float] = QUESTION_CACHE_TTL_SECONDS):
+        self.index = DiskLRUCache(db_path, max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+    def get(self, key: str) -> Optional[ScreeningQuestionsResponse]:
+        """Return the validated questions for a key, or None on a miss"""
+        ref = self.index.get(key)
+        if ref is None:
+            return None
+        try:
+            data = load_question_set(ref)
+            if data.get("cache_key") != key:
+                raise ValueError("question set was recorded for another key")
+            # Keep pre-generated presentation lead-ins when the set has them
+            questions = [
+                PresentedScreeningQuestion(**q) if q.get("presentation") else ScreeningQuestion(**q)
+                for q in data["questions"]
+            ]
+            return ScreeningQuestionsResponse(screening_questions=questions)
+        except (OSError, KeyError, TypeError, ValueError, ValidationError) as e:
+            # The set was removed or is unusable: drop the entry and count it as a miss
+            print(f"[WARNING] Dropping stale question cache entry {key[:12]}: {e}")
+            self.index.delete(key)
+            self.index.hits -= 1
+            self.index.misses += 1
+            return None
+
+    def put(self, key: str, questions_ref: str):
+        """Record the question set logged for a key"""
+        self.index.set(key, questions_ref)
+
+    def stats(self) -> dict:
+        return self.index.stats()
+
+
+_question_cache = None
+_question_cache_lock = threading.Lock()
+
+
+def get_question_cache() -> QuestionCache:
+    """Return the process-wide question cache"""
+    global _question_cache
+    with _question_cache_lock:
+        if _question_cache is None:
+            _question_cache = QuestionCache()
+    return _question_cache
@@ -0,0 +1,108 @@
+"""
+Local rendering of structured screening questions.
+
+Presenting a question used to be a full LLM round trip whose only job was to
+restate the section, number and question text conversationally. The
+presenter builds the same message locally from pools of pre-written
+acknowledgements, lead-ins and transitions, and always keeps the exact
+required format. Wording is picked deterministically per session and
+question, so a re-rendered question reads the same.
+
+If the question-generation call also produced a ``presentation`` lead-in for
+each question (see ``PresentedScreeningQuestion``), that lead-in is used
+instead of the pooled ones.
+"""
+
+import random
+import re
+from typing import Optional
+
+from utils.custom_classes_and_prompts import ScreeningQuestion
+
+
+# Neutral acknowledgements of the previous answer: the interview gives no feedback on answers
+ACKNOWLEDGEMENTS = [
+    "Thank you, I've noted your answer.",
+    "Thanks for that response.",
+    "Got it, thank you.",
+    "Thank you, your answer has been recorded.",
+    "Noted, thanks for your answer.",
+]
+DONT_KNOW_ACKNOWLEDGEMENTS = [
+    "Understood, thank you for being upfront. Let's move on.",
+    "That's fine, thank you for your honesty. Moving on.",
+]
+HELP_WARNING = (
+    "⚠️ **Formal notice:** hints or help cannot be provided during the screening. "
+    "Please answer based on your own knowledge, or say \"I don't know\"."
+)
+
+FIRST_LEAD_INS = [
+    "Let's begin with the first question.",
+    "Here is your first question.",
+    "To start things off, here's the first question.",
+]
+LEAD_INS = [
+    "Here's the next question.",
+    "Moving on to the next question.",
+    "Let's continue with the next one.",
+    "On to the next question.",
+    "Next up, a question from a different area.",
+]
+LAST_LEAD_INS = [
+    "Here is the final question.",
+    "We've reached the last question.",
+    "One more to go, this is the final question.",
+]
+SECTION_TRANSITIONS = [
+    "This one is from the {section} section.",
+    "We're now moving to {section}.",
+    "This question covers {section}.",
+]
+
+QUESTION_FORMAT = """- Section: {section}\n
+- Question Number: {number}\n\n
+- Question: {question}"""
+
+SHORT_REPLY_CHARS = 80
+DONT_KNOW_PATTERN = re.compile(r"\b(i\s+(do\s*n[o']?t|dont)\s+know|no\s+idea|not\s+sure)\b", re.IGNORECASE)
+HELP_PATTERN = re.compile(r"\b(hint|help\s+me|give\s+me\s+the\s+answer|tell\s+me\s+the\s+answer|what\s+is\s+the\s+answer)\b",
+                          re.IGNORECASE)
+
+
+class QuestionPresenter:
+    def __init__(self, seed: str = ""):
+        self.seed = seed
+        self.rendered = 0
+
+    def _pick(self, pool: list, question_number: int, salt: str) -> str:
+        return random.Random(f"{self.seed}:{question_number}:{salt}").choice(pool)
+
+    def acknowledgement(self, previous_answer: str, question_number: int) -> str:
+        """Neutral acknowledgement of the answer just given (or the formal notice for help requests)"""
+        # Only short replies count as a help request or a pass; longer ones are real answers
+        short = len(previous_answer.strip()) <= SHORT_REPLY_CHARS
+        if short and HELP_PATTERN.search(previous_answer):
+            return HELP_WARNING
+        if short and DONT_KNOW_PATTERN.search(previous_answer):
+            return self._pick(DONT_KNOW_ACKNOWLEDGEMENTS, question_number, "dont_know")
+        return self._pick(ACKNOWLEDGEMENTS, question_number, "ack")
+
+    def render(self, q: ScreeningQuestion, index: int, total: int, previous_answer: Optional[str] = None) -> str:
+        """Render question `index` (0-based) of `total` in the required structured format"""
+        parts = []
+        if index > 0 and previous_answer:
+            parts.append(self.acknowledgement(previous_answer, q.question_number))
+
+        presentation = getattr(q, "presentation", None)
+        if presentation:
+            parts.append(presentation.strip())
+        else:
+            pool = FIRST_LEAD_INS if index == 0 else LAST_LEAD_INS if index == total - 1 else LEAD_INS
+            parts.append(self._pick(pool, q.question_number, "lead_in"))
+            parts.append(self._pick(SECTION_TRANSITIONS, q.question_number, "section").format(section=q.section))
+
+        self.rendered += 1
+        return " ".join(parts) + "\n\n" + QUESTION_FORMAT.format(
+            section=q.section, number=q.question_number, question=q.question
+        )
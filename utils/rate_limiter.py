@@ -0,0 +1,189 @@
+"""
+Process-wide LLM rate limiting and retry scheduling.
+
+Each provider gets a ``RateLimiter`` with two token buckets, requests per
+minute and tokens per minute. Callers wait in a priority queue, so live
+interview turns are let through ahead of background work such as question
+generation or report writing. Failed calls are retried with jittered
+exponential backoff. A ``Retry-After`` from the provider pauses the whole
+queue for that long.
+
+All waiting happens on the shared LLM event loop (see ``llm_client``).
+"""
+
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import openai
+
+
+PRIORITY_INTERACTIVE = 0   # get_response turns the candidate is waiting on
+PRIORITY_REPORT = 1        # analysis and final report
+PRIORITY_BACKGROUND = 2    # question generation, resume summary, speculative work
+
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8.0
+# A Retry-After longer than this is not waited out; the call fails so the router can fail over
+MAX_RETRY_AFTER = 10.0
+WAIT_WINDOW = 500
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount: float) -> float:
+        """Seconds until `amount` can be taken (requests larger than the bucket only need a full bucket)"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float):
+        self._refill()
+        self.level -= amount
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    """Read Retry-After / retry-after-ms from an API error response, if any"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    retry_ms = headers.get("retry-after-ms")
+    if retry_ms:
+        try:
+            return float(retry_ms) / 1000.0
+        except ValueError:
+            pass
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+def _is_retryable(error: Exception) -> bool:
+    # Timeouts are not retried here: the provider router fails over instead of waiting again
+    if isinstance(error, (openai.APITimeoutError, asyncio.TimeoutError)):
+        return False
+    return isinstance(error, (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError))
+
+
+class RateLimiter:
+    def __init__(self, name: str, requests_per_minute: float = 60, tokens_per_minute: float = 250_000,
+                 max_retries: int = MAX_RETRIES):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self._waiters = []
+        self._seq = itertools.count()
+        self._dispatcher = None
+        self._paused_until = 0.0
+
+        self.granted = 0
+        self.retries = 0
+        self.throttled = 0
+        self.max_queue_depth = 0
+        self.wait_times = deque(maxlen=WAIT_WINDOW)
+
+    async def acquire(self, priority: int, estimated_tokens: int):
+        """Wait in the priority queue until both buckets have room for this call"""
+        future = asyncio.get_running_loop().create_future()
+        enqueued = time.monotonic()
+        heapq.heappush(self._waiters, (priority, next(self._seq), estimated_tokens, future))
+        self.max_queue_depth = max(self.max_queue_depth, len(self._waiters))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+        await future
+        self.wait_times.append(time.monotonic() - enqueued)
+
+    async def _dispatch(self):
+        """Release waiters in priority order as capacity becomes available"""
+        while self._waiters:
+            priority, _, estimated_tokens, future = self._waiters[0]
+            if future.cancelled():
+                heapq.heappop(self._waiters)
+                continue
+            wait = max(
+                self._paused_until - time.monotonic(),
+                self.requests.time_until(1),
+                self.tokens.time_until(estimated_tokens),
+            )
+            if wait > 0:
+                # Sleep, then re-check the head: a higher-priority caller may have arrived meanwhile
+                await asyncio.sleep(wait)
+                continue
+            heapq.heappop(self._waiters)
+            self.requests.take(1)
+            self.tokens.take(estimated_tokens)
+            self.granted += 1
+            future.set_result(None)
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """Correct the token bucket once the real usage of a call is known"""
+        if actual_tokens is not None:
+            self.tokens.take(actual_tokens - estimated_tokens)
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff"""
+        return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+
+    async def run(self, priority: int, estimated_tokens: int, make_call):
+        """Acquire capacity and run `make_call()`, retrying transient failures with backoff"""
+        attempt = 0
+        while True:
+            await self.acquire(priority, estimated_tokens)
+            try:
+                return await make_call()
+            except Exception as e:
+                if not _is_retryable(e) or attempt >= self.max_retries:
+                    raise
+                retry_after = _retry_after_seconds(e)
+                if isinstance(e, openai.RateLimitError):
+                    self.throttled += 1
+                    if retry_after is not None:
+                        if retry_after > MAX_RETRY_AFTER:
+                            raise
+                        # The provider told us when capacity returns: hold the whole queue until then
+                        self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+                delay = retry_after if retry_after is not None else self.backoff(attempt)
+                attempt += 1
+                self.retries += 1
+                print(f"[RATE LIMIT] {self.name}: {type(e).__name__}, retry {attempt}/{self.max_retries} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    def stats(self) -> dict:
+        """Queue depth, wait-time and retry metrics"""
+        waits = sorted(self.wait_times)
+        return {
+            "queue_depth": sum(1 for w in self._waiters if not w[3].done()),
+            "max_queue_depth": self.max_queue_depth,
+            "granted": self.granted,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "avg_wait_s": round(sum(waits) / len(waits), 3) if waits else 0.0,
+            "p95_wait_s": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 3) if waits else 0.0,
+        }
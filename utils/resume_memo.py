@@ -0,0 +1,63 @@
+"""
+Disk-backed memo of parsed resume summaries.
+
+``HiringAgent.get_resume_summary`` extracts a ``CandidateProfile`` from the
+resume text with a structured-output LLM call. The same file is often
+uploaded several times, so results are memoized by the SHA-256 of the
+extracted text in a SQLite LRU shared by every session and process.
+"""
+
+import hashlib
+import os
+import threading
+from typing import Optional
+
+from pydantic import ValidationError
+
+from utils.custom_classes_and_prompts import CandidateProfile
+from utils.disk_cache import DiskLRUCache
+
+
+RESUME_MEMO_PATH = os.path.join("submissions", ".resume_memo.sqlite3")
+RESUME_MEMO_MAX_ENTRIES = 2000
+
+
+def resume_text_hash(resume_text: str) -> str:
+    """SHA-256 of the extracted resume text"""
+    return hashlib.sha256((resume_text or "").encode("utf-8")).hexdigest()
+
+
+class ResumeMemo:
+    def __init__(self, db_path: str = RESUME_MEMO_PATH, max_entries: int = RESUME_MEMO_MAX_ENTRIES):
+        self.cache = DiskLRUCache(db_path, max_entries=max_entries)
+
+    def get(self, text_hash: str) -> Optional[CandidateProfile]:
+        """Return the memoized profile for a resume hash, or None"""
+        value = self.cache.get(text_hash)
+        if value is None:
+            return None
+        try:
+            return CandidateProfile.model_validate_json(value)
+        except ValidationError as e:
+            print(f"[WARNING] Dropping unreadable resume memo entry {text_hash[:12]}: {e}")
+            self.cache.delete(text_hash)
+            return None
+
+    def put(self, text_hash: str, profile: CandidateProfile):
+        self.cache.set(text_hash, profile.model_dump_json())
+
+    def stats(self) -> dict:
+        return self.cache.stats()
+
+
+_resume_memo = None
+_resume_memo_lock = threading.Lock()
+
+
+def get_resume_memo() -> ResumeMemo:
+    """Return the process-wide resume memo"""
+    global _resume_memo
+    with _resume_memo_lock:
+        if _resume_memo is None:
+            _resume_memo = ResumeMemo()
+    return _resume_memo
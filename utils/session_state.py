@@ -0,0 +1,310 @@
+"""
+Compact, serializable interview state and pluggable session stores.
+
+``InterviewState`` holds only what is needed to resume an interview on any
+replica: phase and counters, the recorded answers and scores, the chat
+messages, and references to the heavier objects instead of the objects
+themselves. Questions are referenced by question-cache key or file, the
+resume summary by resume hash (see ``resume_memo``), and the JD by position.
+The raw resume text is carried only until the questions exist.
+
+A session is resumed from its URL only with the secret token issued with it
+(``issue_resume_token``); the store keeps just the token's SHA-256, and the
+app rotates the token on every resume so an old link stops working.
+
+References resolve through the question cache and resume memo, so replicas
+that should resume each other's sessions need to share the
+``screening_questions/`` and ``submissions/`` directories.
+
+The state is a snapshot for resuming, not a replacement for the live agent:
+while a browser session lasts, its ``HiringAgent`` stays in
+``st.session_state`` because it owns in-flight work (question generation,
+speculative evaluation) that a rebuilt agent would lose. What the state does
+save is memory: the agent and the app drop the raw resume text once the
+questions and summary exist, and the default ``sqlite`` store keeps states on
+disk instead of a second in-process copy of every chat.
+
+Stores, selected with the ``SESSION_STORE`` setting:
+
+- ``sqlite`` (default) or ``sqlite:/path/to/sessions.sqlite3``: shared by processes on one host
+- ``memory``: this process only; keeps a serialized copy of each session in memory
+- ``redis://[:password@]host:port/db``: any server speaking the Redis protocol (RESP)
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, fields
+from typing import Optional
+from urllib.parse import urlparse
+
+
+STATE_VERSION = 1
+SESSION_TTL_SECONDS = 24 * 3600
+DEFAULT_SQLITE_PATH = os.path.join("submissions", ".sessions.sqlite3")
+
+
+@dataclass(slots=True)
+class InterviewState:
+    session_id: str
+    profile: dict = field(default_factory=dict)
+    jd_position: str = ""
+    resume_hash: Optional[str] = None
+    resume_text: Optional[str] = None
+    questions_cache_key: Optional[str] = None
+    questions_file: Optional[str] = None
+    questions_generated: bool = False
+    interview_phase: str = "casual_chat"
+    current_question_index: int = 0
+    casual_chat_count: int = 0
+    formal_interactions_count: int = 0
+    analysis_done: bool = False
+    analysis_result: Optional[str] = None
+    # Formatted evaluations by transcript hash, so a restored session returns the same analysis
+    analysis_cache: dict = field(default_factory=dict)
+    test_responses: list = field(default_factory=list)
+    test_scores: list = field(default_factory=list)
+    chat_messages: list = field(default_factory=list)
+    interaction_count: int = 0
+    session_start_time: Optional[float] = None
+    resume_token_hash: Optional[str] = None
+    updated_at: float = 0.0
+    version: int = STATE_VERSION
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), separators=(",", ":"), default=str)
+
+    @classmethod
+    def from_json(cls, data: str) -> "InterviewState":
+        values = json.loads(data)
+        known = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in values.items() if key in known})
+
+
+def _token_hash(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def issue_resume_token() -> tuple:
+    """A new secret for resuming a session and the hash to store with its state"""
+    token = secrets.token_urlsafe(24)
+    return token, _token_hash(token)
+
+
+def check_resume_token(state: InterviewState, token: Optional[str]) -> bool:
+    """Whether a token presented with ?session= was issued for this state"""
+    if not token or not state.resume_token_hash:
+        return False
+    return hmac.compare_digest(_token_hash(token), state.resume_token_hash)
+
+
+class SessionStore(ABC):
+    """Interface: states are stored as JSON so every backend behaves the same"""
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[InterviewState]:
+        ...
+
+    @abstractmethod
+    def put(self, state: InterviewState):
+        ...
+
+    @abstractmethod
+    def delete(self, session_id: str):
+        ...
+
+
+class MemorySessionStore(SessionStore):
+    def __init__(self, ttl_seconds: float = SESSION_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Optional[InterviewState]:
+        with self._lock:
+            entry = self._states.get(session_id)
+            if entry is None:
+                return None
+            if time.time() - entry[1] > self.ttl_seconds:
+                del self._states[session_id]
+                return None
+            return InterviewState.from_json(entry[0])
+
+    def put(self, state: InterviewState):
+        state.updated_at = time.time()
+        with self._lock:
+            self._states[state.session_id] = (state.to_json(), state.updated_at)
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._states.pop(session_id, None)
+
+
+class SQLiteSessionStore(SessionStore):
+    def __init__(self, db_path: str = DEFAULT_SQLITE_PATH, ttl_seconds: float = SESSION_TTL_SECONDS):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS sessions (
+                    session_id TEXT PRIMARY KEY,
+                    state TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )"""
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, session_id: str) -> Optional[InterviewState]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT state FROM sessions WHERE session_id = ? AND updated_at >= ?",
+                (session_id, time.time() - self.ttl_seconds),
+            ).fetchone()
+        return InterviewState.from_json(row[0]) if row else None
+
+    def put(self, state: InterviewState):
+        state.updated_at = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, state, updated_at) VALUES (?, ?, ?)",
+                (state.session_id, state.to_json(), state.updated_at),
+            )
+            conn.execute("DELETE FROM sessions WHERE updated_at < ?", (time.time() - self.ttl_seconds,))
+
+    def delete(self, session_id: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+
+class RespError(Exception):
+    pass
+
+
+class RespSessionStore(SessionStore):
+    """Stores states in any Redis-protocol server with SET/GET/DEL and key expiry"""
+
+    def __init__(self, url: str, ttl_seconds: float = SESSION_TTL_SECONDS, prefix: str = "interview:"):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.strip("/") or 0)
+        self.ttl_seconds = int(ttl_seconds)
+        self.prefix = prefix
+        self._sock = None
+        self._reader = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=5)
+        self._reader = self._sock.makefile("rb")
+        if self.password:
+            self._send("AUTH", self.password)
+        if self.db:
+            self._send("SELECT", str(self.db))
+
+    def _close(self):
+        for resource in (self._reader, self._sock):
+            try:
+                if resource is not None:
+                    resource.close()
+            except OSError:
+                pass
+        self._sock = self._reader = None
+
+    def _send(self, *args):
+        payload = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            payload.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._sock.sendall(b"".join(payload))
+        return self._read_reply()
+
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("RESP server closed the connection")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise RespError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(rest)
+            return None if count < 0 else [self._read_reply() for _ in range(count)]
+        raise RespError(f"Unexpected RESP reply: {line!r}")
+
+    def _command(self, *args):
+        """Run one command, reconnecting once if the connection went stale"""
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return self._send(*args)
+                except (OSError, ConnectionError):
+                    self._close()
+                    if attempt:
+                        raise
+
+    def get(self, session_id: str) -> Optional[InterviewState]:
+        data = self._command("GET", self.prefix + session_id)
+        return InterviewState.from_json(data.decode("utf-8")) if data else None
+
+    def put(self, state: InterviewState):
+        state.updated_at = time.time()
+        self._command("SET", self.prefix + state.session_id, state.to_json(), "EX", str(self.ttl_seconds))
+
+    def delete(self, session_id: str):
+        self._command("DEL", self.prefix + session_id)
+
+
+def create_session_store(spec: str) -> SessionStore:
+    """Build a store from a SESSION_STORE value"""
+    spec = (spec or "sqlite").strip()
+    if spec == "memory":
+        return MemorySessionStore()
+    if spec == "sqlite" or spec.startswith("sqlite:"):
+        return SQLiteSessionStore(spec.partition(":")[2] or DEFAULT_SQLITE_PATH)
+    if spec.startswith(("redis://", "resp://")):
+        return RespSessionStore(spec)
+    raise ValueError(f"Unknown SESSION_STORE '{spec}': use memory, sqlite[:path] or redis://host:port/db")
+
+
+_session_store = None
+_session_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionStore:
+    """Return the process-wide session store configured by SESSION_STORE"""
+    global _session_store
+    with _session_store_lock:
+        if _session_store is None:
+            _session_store = create_session_store(os.environ.get("SESSION_STORE", "sqlite"))
+    return _session_store